@@ -0,0 +1,56 @@
+import timeit
+
+from src import entities
+from src.api import fast_json
+from src.api.handlers_models import CurrentStateResponse, CompletedTasksPageResponse
+
+# Сравнение кодирования ответов через Pydantic-модели и через fast_json.
+# Запуск из корня репозитория: python -m benchmarks.json_encoding
+SIZES = (100, 1000, 5000)
+REPEATS = 5
+
+
+def _make_state(completed_count: int) -> dict:
+    day = entities.Day(1, 'spring', 1, True, 1)
+    day_tasks = [entities.Task(f'Задача дня {i}', 1, 'one-time', 'active', i, 1, 1) for i in range(1, 21)]
+    day_tasks += [entities.Task(f'Ежедневная задача {i}', 1, 'daily', 'active', 20 + i, None, None) for i in range(1, 6)]
+    completed_tasks = [entities.Task(f'Выполненная задача {i}', 1, 'one-time', 'completed', 100 + i, 1, 1)
+                       for i in range(completed_count)]
+    return {
+        'current_day': day,
+        'day_tasks': day_tasks,
+        'completed_tasks': completed_tasks,
+        'completed_tasks_count': completed_count,
+        'done_daily_task_ids': {21, 23},
+        'changes_cursor': 42,
+    }
+
+
+def _best_time(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=REPEATS)) / number
+
+
+def main():
+    print(f'{"response":<16}{"tasks":>8}{"pydantic, ms":>16}{"fast_json, ms":>16}{"speedup":>10}')
+    for size in SIZES:
+        state = _make_state(size)
+        page = {'tasks': state['completed_tasks'], 'next_cursor': None}
+        number = max(1, 20000 // size)
+        cases = [
+            ('/day/current',
+             lambda: CurrentStateResponse.from_entities(**state).model_dump_json().encode(),
+             lambda: fast_json.dumps(fast_json.current_state_to_dict(**state))),
+            ('/task/completed',
+             lambda: CompletedTasksPageResponse.from_entities(**page).model_dump_json().encode(),
+             lambda: fast_json.dumps(fast_json.completed_tasks_page_to_dict(**page))),
+        ]
+        for name, model_encode, fast_encode in cases:
+            assert model_encode() == fast_encode(), f'{name}: encodings differ'
+            model_time = _best_time(model_encode, number)
+            fast_time = _best_time(fast_encode, number)
+            print(f'{name:<16}{size:>8}{model_time * 1000:>16.3f}{fast_time * 1000:>16.3f}'
+                  f'{model_time / fast_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
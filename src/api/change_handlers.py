@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from .handlers_models import *
+from .. import config
+from ..dependencies import get_change_log_service, get_db_executor
+from ..repository.db_executor import DbExecutor
+from ..services.change_log_service import ChangeLogService
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["changes"]
+)
+
+
+# Инкрементальная синхронизация: клиент берет changes_cursor из GET /day/current и дальше запрашивает только
+# изменения после него, пока has_more = true
+@router.get("/", status_code=200)
+async def get_changes_handle(
+        cursor: int = Query(default=0, ge=0),
+        limit: int = Query(default=config.CHANGES_PAGE_SIZE, ge=1, le=config.CHANGES_MAX_PAGE_SIZE),
+        change_log_service: ChangeLogService = Depends(get_change_log_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> ChangesPageResponse:
+    changes, next_cursor, has_more = await db_executor.run(change_log_service.get_changes, cursor, limit)
+    return ChangesPageResponse.from_entities(changes, next_cursor, has_more)
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends
+import json
+
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from . import fast_json
 from .handlers_models import *
-from ..dependencies import get_day_service, get_task_service
+from .. import config
+from ..dependencies import (get_change_log_service, get_db_executor, get_day_service, get_state_broadcaster,
+                            get_task_service)
+from ..repository.db_executor import DbExecutor
+from ..services.change_log_service import ChangeLogService
 from ..services.day_service import DayService
+from ..services.state_broadcaster import StateBroadcaster
 from ..services.task_service import TaskService
 
 router = APIRouter(
@@ -13,36 +22,132 @@ router = APIRouter(
 # С помощью Depends(get_day_service) передается заранее созданный объект сервиса - экземпляр DayService из app.state
 # При app.dependency_overrides Depends(get_day_service) вместо вызова функции get_day_service() вызовет get_mock_day_service()
 
-def _get_current_day_details(day_service: DayService, task_service: TaskService) -> CurrentStateResponse:
+# completed_tasks=page: первая страница завершенных задач и курсор следующей, completed_tasks=count: только их количество.
+# Курсор журнала читается до данных: изменения, попавшие между ними, клиент получит повторно, но не потеряет.
+# Возвращает аргументы для CurrentStateResponse.from_entities и fast_json.current_state_to_dict
+def _read_current_day_details(day_service: DayService, task_service: TaskService, change_log_service: ChangeLogService,
+                              completed_tasks_mode: CompletedTasksMode = CompletedTasksMode.page) -> dict:
+    changes_cursor = change_log_service.get_last_seq()
     current_day = day_service.get_active()
-    day_tasks = task_service.get_all_by_day_id(current_day.id)
-    active_day_tasks = [task for task in day_tasks if task.status == 'active']
-    completed_tasks = task_service.get_all_completed()
-    return CurrentStateResponse.from_entities(current_day, active_day_tasks, completed_tasks)
+    details = {
+        'current_day': current_day,
+        'day_tasks': task_service.get_active_by_day_id(current_day.id),
+        'done_daily_task_ids': set(task_service.get_completed_daily_ids(current_day.id)),
+        'changes_cursor': changes_cursor,
+    }
+    if completed_tasks_mode == CompletedTasksMode.count:
+        details['completed_tasks'] = []
+        details['completed_tasks_count'] = task_service.count_completed()
+    else:
+        details['completed_tasks'], details['completed_tasks_next_cursor'] = task_service.get_completed_page(
+            None, config.COMPLETED_TASKS_PAGE_SIZE)
+    return details
+
+
+def _encode_current_day_details(day_service: DayService, task_service: TaskService,
+                                change_log_service: ChangeLogService, completed_tasks_mode: CompletedTasksMode) -> bytes:
+    details = _read_current_day_details(day_service, task_service, change_log_service, completed_tasks_mode)
+    if config.API_FAST_JSON:
+        return fast_json.dumps(fast_json.current_state_to_dict(**details))
+    return CurrentStateResponse.from_entities(**details).model_dump_json().encode()
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    # If-None-Match сравнивается слабо: префикс W/ не учитывается
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+
+# Закодированный ответ кэшируется для текущей версии состояния: пока нет записей, повторные запросы не ходят в БД.
+# Если клиент прислал ETag текущей версии, возвращается 304 без тела и без обращения к БД.
+# Оба этих случая обслуживаются прямо в цикле событий, в поток БД уходит только построение нового снимка
+async def _get_current_state_response(day_service: DayService, task_service: TaskService,
+                                      change_log_service: ChangeLogService, db_executor: DbExecutor,
+                                      completed_tasks_mode: CompletedTasksMode,
+                                      if_none_match: str | None = None) -> Response:
+    state_version = day_service.state_version
+    version = state_version.value
+    headers = {'ETag': state_version.etag(version), 'Cache-Control': 'no-cache'}
+    if _etag_matches(if_none_match, headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    payload = state_version.get_snapshot(completed_tasks_mode.value, version)
+    if payload is None:
+        payload = await db_executor.run(_encode_current_day_details, day_service, task_service, change_log_service,
+                                        completed_tasks_mode)
+        state_version.store_snapshot(completed_tasks_mode.value, version, payload)
+    return Response(content=payload, media_type='application/json', headers=headers)
 
 
-@router.get("/current", response_model=CurrentStateResponse, status_code=200)
-def get_current_day_info_handle(
+@router.get("/current", response_model=CurrentStateResponse, status_code=200,
+            responses={304: {'description': 'State has not changed since the version in If-None-Match'}})
+async def get_current_day_info_handle(
+        completed_tasks: CompletedTasksMode = CompletedTasksMode.page,
+        if_none_match: str | None = Header(default=None),
         day_service: DayService = Depends(get_day_service),
-        task_service: TaskService = Depends(get_task_service)
-) -> CurrentStateResponse:
-    return _get_current_day_details(day_service, task_service)
+        task_service: TaskService = Depends(get_task_service),
+        change_log_service: ChangeLogService = Depends(get_change_log_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> Response:
+    return await _get_current_state_response(day_service, task_service, change_log_service, db_executor, completed_tasks,
+                                             if_none_match)
+
+
+def _format_state_event(day_service: DayService, version: int) -> str:
+    data = json.dumps({'version': version, 'etag': day_service.state_version.etag(version)})
+    return f'event: state\nid: {version}\ndata: {data}\n\n'
+
+
+# Server-Sent Events: сразу после подключения и после каждой зафиксированной записи клиент получает событие
+# с версией и ETag состояния, а само состояние запрашивает через GET /day/current с If-None-Match или GET /changes.
+# События не обращаются к БД. Медленный клиент получает только последнюю версию, пропуская промежуточные
+@router.get("/events", status_code=200, response_class=StreamingResponse,
+            responses={503: {'description': 'Too many subscribers'}})
+async def get_state_events_handle(
+        day_service: DayService = Depends(get_day_service),
+        state_broadcaster: StateBroadcaster = Depends(get_state_broadcaster)
+) -> StreamingResponse:
+    subscriber = state_broadcaster.subscribe()
+
+    async def _events():
+        try:
+            while True:
+                version = await subscriber.next_version(config.STATE_EVENTS_KEEPALIVE)
+                if version is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield _format_state_event(day_service, version)
+        finally:
+            state_broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(_events(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 
 @router.put("/current", response_model=CurrentStateResponse, status_code=200)
-def set_current_day_handle(
+async def set_current_day_handle(
         request: SetCurrentDayRequest,
+        completed_tasks: CompletedTasksMode = CompletedTasksMode.page,
         day_service: DayService = Depends(get_day_service),
-        task_service: TaskService = Depends(get_task_service)
-) -> CurrentStateResponse:
-    day_service.set_current_day(request.year, request.season, request.number)
-    return _get_current_day_details(day_service, task_service)
+        task_service: TaskService = Depends(get_task_service),
+        change_log_service: ChangeLogService = Depends(get_change_log_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> Response:
+    await db_executor.write(day_service.set_current_day, request.year, request.season, request.number)
+    return await _get_current_state_response(day_service, task_service, change_log_service, db_executor,
+                                             completed_tasks)
 
 
+# days=N переводит сразу на N дней вперед одной транзакцией
 @router.post("/next", response_model=CurrentStateResponse, status_code=200)
-def set_next_day_handle(
+async def set_next_day_handle(
+        days: int = Query(default=1, ge=1, le=config.DAY_ADVANCE_MAX_DAYS),
+        completed_tasks: CompletedTasksMode = CompletedTasksMode.page,
         day_service: DayService = Depends(get_day_service),
-        task_service: TaskService = Depends(get_task_service)
-) -> CurrentStateResponse:
-    day_service.set_next_day()
-    return _get_current_day_details(day_service, task_service)
+        task_service: TaskService = Depends(get_task_service),
+        change_log_service: ChangeLogService = Depends(get_change_log_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> Response:
+    await db_executor.write(day_service.advance_days, days)
+    return await _get_current_state_response(day_service, task_service, change_log_service, db_executor,
+                                             completed_tasks)
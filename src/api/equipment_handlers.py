@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends
+from .handlers_models import *
+from ..dependencies import get_db_executor, get_equipment_service
+from ..repository.db_executor import DbExecutor
+from ..services.equipment_service import EquipmentService
+
+router = APIRouter(
+    prefix="/equipment",
+    tags=["equipment"],
+    responses={404: {'description': 'Entity not found'},
+               400: {'description': 'Invalid state'},
+               409: {'description': 'Duplicate entity'}
+               }
+)
+
+
+# Оставшиеся дни считаются от текущего дня в момент ответа, сами строки оборудования при переходе дня не меняются.
+# Операция и построение ответа выполняются одним вызовом в потоке БД
+def _run_to_response(equipment_service: EquipmentService, operation, *args) -> EquipmentResponse:
+    equipment = operation(*args)
+    return EquipmentResponse.from_equipment(equipment, equipment_service.day_service.get_active().ordinal)
+
+
+def _run_to_responses(equipment_service: EquipmentService, operation) -> List[EquipmentResponse]:
+    equipment = operation()
+    current_ordinal = equipment_service.day_service.get_active().ordinal
+    return [EquipmentResponse.from_equipment(item, current_ordinal) for item in equipment]
+
+
+@router.post("/", status_code=200)
+async def create_equipment_handle(
+        request: CreateEquipmentRequest,
+        equipment_service: EquipmentService = Depends(get_equipment_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> EquipmentResponse:
+    return await db_executor.write(_run_to_response, equipment_service, equipment_service.create_equipment,
+                                   request.name, request.kind.value)
+
+
+@router.get("/", status_code=200)
+async def get_all_equipment_handle(
+        equipment_service: EquipmentService = Depends(get_equipment_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> List[EquipmentResponse]:
+    return await db_executor.run(_run_to_responses, equipment_service, equipment_service.get_all)
+
+
+@router.get("/ready", status_code=200)
+async def get_ready_equipment_handle(
+        equipment_service: EquipmentService = Depends(get_equipment_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> List[EquipmentResponse]:
+    return await db_executor.run(_run_to_responses, equipment_service, equipment_service.get_ready)
+
+
+@router.patch("/{id}/start", status_code=200)
+async def start_equipment_handle(
+        id: int,
+        request: StartEquipmentRequest,
+        equipment_service: EquipmentService = Depends(get_equipment_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> EquipmentResponse:
+    return await db_executor.write(_run_to_response, equipment_service, equipment_service.start, id, request.days)
+
+
+@router.patch("/{id}/collect", status_code=200)
+async def collect_equipment_handle(
+        id: int,
+        equipment_service: EquipmentService = Depends(get_equipment_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> EquipmentResponse:
+    return await db_executor.write(_run_to_response, equipment_service, equipment_service.collect, id)
@@ -31,6 +31,12 @@ async def task_not_found_exception_handler(_, exc):
     return JSONResponse(content=data, status_code=404)
 
 
+@get_app().exception_handler(TaskNotInActiveDayError)
+async def task_not_in_active_day_error_handler(_, exc):
+    data = {'error': exc.message}
+    return JSONResponse(content=data, status_code=404)
+
+
 @get_app().exception_handler(InvalidTaskStateException)
 async def invalid_task_state_exception_handler(_, exc):
     data = {'error': exc.message}
@@ -52,4 +58,33 @@ async def duplicate_day_exception_handler(_, exc):
 @get_app().exception_handler(DuplicateTaskNameException)
 async def duplicate_task_name_exception_handler(_, exc):
     data = {'error': exc.message}
-    return JSONResponse(content=data, status_code=409)
\ No newline at end of file
+    return JSONResponse(content=data, status_code=409)
+
+@get_app().exception_handler(EquipmentNotFoundException)
+async def equipment_not_found_exception_handler(_, exc):
+    data = {'error': exc.message}
+    return JSONResponse(content=data, status_code=404)
+
+
+@get_app().exception_handler(InvalidEquipmentStateException)
+async def invalid_equipment_state_exception_handler(_, exc):
+    data = {'error': exc.message}
+    return JSONResponse(content=data, status_code=400)
+
+
+@get_app().exception_handler(DuplicateEquipmentNameException)
+async def duplicate_equipment_name_exception_handler(_, exc):
+    data = {'error': exc.message}
+    return JSONResponse(content=data, status_code=409)
+
+
+@get_app().exception_handler(TooManySubscribersException)
+async def too_many_subscribers_exception_handler(_, exc):
+    data = {'error': exc.message}
+    return JSONResponse(content=data, status_code=503)
+
+
+@get_app().exception_handler(TooManyDetachedConnectionsException)
+async def too_many_detached_connections_exception_handler(_, exc):
+    data = {'error': exc.message}
+    return JSONResponse(content=data, status_code=503)
@@ -0,0 +1,79 @@
+import json
+from typing import List, Set
+
+from starlette.responses import Response
+
+from src import entities
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Быстрый путь кодирования для самых тяжелых ответов: JSON строится прямо из сущностей, без создания и проверки
+# Pydantic-моделей. Значения сущностей уже проверены ограничениями CHECK в БД. Ключи и порядок полей повторяют
+# модели из handlers_models, поэтому байты ответа совпадают с кодированием через модели.
+# orjson используется, если установлен, иначе - стандартный json с тем же компактным форматом
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = 'application/json'
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def task_to_dict(task: entities.Task, done_today: bool | None = None) -> dict:
+    return {
+        'id': task.id,
+        'name': task.name,
+        'type': task.type,
+        'day_id': task.day_id,
+        'status': task.status,
+        'duration': task.duration,
+        'due_ordinal': task.due_ordinal,
+        'done_today': done_today,
+    }
+
+
+def day_to_dict(day: entities.Day, tasks: List[entities.Task] | None,
+                done_daily_task_ids: Set[int] = frozenset()) -> dict:
+    task_dicts = None
+    if tasks is not None:
+        task_dicts = [
+            task_to_dict(task, task.id in done_daily_task_ids if task.type == 'daily' else None) for task in tasks
+        ]
+    return {
+        'id': day.id,
+        'year': day.year,
+        'season': day.season,
+        'number': day.number,
+        'active': day.active,
+        'tasks': task_dicts,
+    }
+
+
+# Аргументы те же, что у CurrentStateResponse.from_entities
+def current_state_to_dict(current_day: entities.Day, day_tasks: List[entities.Task],
+                          completed_tasks: List[entities.Task], completed_tasks_next_cursor: int | None = None,
+                          completed_tasks_count: int | None = None, done_daily_task_ids: Set[int] = frozenset(),
+                          changes_cursor: int | None = None) -> dict:
+    return {
+        'current_day_info': day_to_dict(current_day, day_tasks, done_daily_task_ids),
+        'all_completed_tasks': [task_to_dict(task) for task in completed_tasks],
+        'completed_tasks_next_cursor': completed_tasks_next_cursor,
+        'completed_tasks_count': completed_tasks_count,
+        'changes_cursor': changes_cursor,
+    }
+
+
+def completed_tasks_page_to_dict(tasks: List[entities.Task], next_cursor: int | None) -> dict:
+    return {
+        'tasks': [task_to_dict(task) for task in tasks],
+        'next_cursor': next_cursor,
+    }
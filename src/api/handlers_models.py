@@ -1,6 +1,6 @@
 from enum import Enum
-from typing import List
-from src import entities
+from typing import List, Set
+from src import entities, config
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 
@@ -21,6 +21,30 @@ class TaskStatus(str, Enum):
     completed = 'completed'
 
 
+class EquipmentKind(str, Enum):
+    tub = 'tub'
+    keg = 'keg'
+    cask = 'cask'
+    preserves_jar = 'preserves_jar'
+
+
+class CompletedTasksMode(str, Enum):
+    page = 'page'
+    count = 'count'
+
+
+class ChangeEntity(str, Enum):
+    task = 'task'
+    day = 'day'
+    task_completion = 'task_completion'
+
+
+class ChangeAction(str, Enum):
+    insert = 'insert'
+    update = 'update'
+    delete = 'delete'
+
+
 class TaskNameRequest(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
     name: str
@@ -32,21 +56,55 @@ class TaskNameRequest(BaseModel):
         return value
 
 
+# duration - сколько дней задача остается активной, начиная с текущего дня; null - бессрочно
+class CreateTaskRequest(TaskNameRequest):
+    duration: int | None = Field(default=1, gt=0)
+
+
+class TaskDurationRequest(BaseModel):
+    duration: int | None = Field(gt=0)
+
+
+class BulkTaskNamesRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+    names: List[str] = Field(min_length=1, max_length=config.TASKS_BULK_MAX_SIZE)
+
+    @field_validator('names')
+    @classmethod
+    def names_must_not_be_empty(cls, value: List[str]) -> List[str]:
+        if not all(value):
+            raise ValueError('Task name must have at least 1 character')
+        return value
+
+
+class BulkTaskIdsRequest(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=config.TASKS_BULK_MAX_SIZE)
+
+
 class TaskResponse(BaseModel):
     id: int
     name: str
     type: TaskType
+    # День, с которого отсчитывается срок однодневной задачи; при переходе дня он не меняется
     day_id: int
     status: TaskStatus
+    duration: int | None = None
+    # Порядковый номер последнего дня однодневной задачи, для ежедневных и бессрочных задач не задан
+    due_ordinal: int | None = None
+    # Отмечена ли ежедневная задача выполненной в текущем дне, для однодневных задач не задано
+    done_today: bool | None = None
 
     @classmethod
-    def from_task(cls, task: entities.Task) -> 'TaskResponse':
+    def from_task(cls, task: entities.Task, done_today: bool | None = None) -> 'TaskResponse':
         return cls(
             id=task.id,
             name=task.name,
             type=TaskType(task.type),
             day_id=task.day_id,
-            status=TaskStatus(task.status)
+            status=TaskStatus(task.status),
+            duration=task.duration,
+            due_ordinal=task.due_ordinal,
+            done_today=done_today
         )
 
 
@@ -65,8 +123,14 @@ class CurrentDayResponse(BaseModel):
     tasks: List[TaskResponse] | None = None
 
     @classmethod
-    def from_day(cls, day: entities.Day, tasks: List[entities.Task] | None) -> 'CurrentDayResponse':
-        task_responses = [TaskResponse.from_task(task) for task in tasks]
+    def from_day(cls, day: entities.Day, tasks: List[entities.Task] | None,
+                 done_daily_task_ids: Set[int] = frozenset()) -> 'CurrentDayResponse':
+        task_responses = None
+        if tasks is not None:
+            task_responses = [
+                TaskResponse.from_task(task, task.id in done_daily_task_ids if task.type == 'daily' else None)
+                for task in tasks
+            ]
         return cls(
             id=day.id,
             year=day.year,
@@ -79,15 +143,148 @@ class CurrentDayResponse(BaseModel):
 
 class CurrentStateResponse(BaseModel):
     current_day_info: CurrentDayResponse
+    # Первая страница завершенных задач; остальные - через GET /task/completed?cursor=...
     all_completed_tasks: List[TaskResponse]
+    completed_tasks_next_cursor: int | None = None
+    completed_tasks_count: int | None = None
+    # Курсор журнала изменений, с которого продолжать синхронизацию через GET /changes?cursor=...
+    changes_cursor: int | None = None
 
     @classmethod
     def from_entities(cls, current_day: entities.Day, day_tasks: List[entities.Task],
-                      completed_tasks: List[entities.Task]) -> 'CurrentStateResponse':
+                      completed_tasks: List[entities.Task], completed_tasks_next_cursor: int | None = None,
+                      completed_tasks_count: int | None = None,
+                      done_daily_task_ids: Set[int] = frozenset(),
+                      changes_cursor: int | None = None) -> 'CurrentStateResponse':
 
-        current_day_response = CurrentDayResponse.from_day(current_day, day_tasks)
+        current_day_response = CurrentDayResponse.from_day(current_day, day_tasks, done_daily_task_ids)
         completed_tasks_response = [TaskResponse.from_task(task) for task in completed_tasks]
         return cls(
             current_day_info=current_day_response,
-            all_completed_tasks=completed_tasks_response
+            all_completed_tasks=completed_tasks_response,
+            completed_tasks_next_cursor=completed_tasks_next_cursor,
+            completed_tasks_count=completed_tasks_count,
+            changes_cursor=changes_cursor
+        )
+
+
+class TaskCompletionsResponse(BaseModel):
+    task_id: int
+    days: List[CurrentDayResponse]
+
+    @classmethod
+    def from_entities(cls, task_id: int, days: List[entities.Day]) -> 'TaskCompletionsResponse':
+        return cls(task_id=task_id, days=[CurrentDayResponse.from_day(day, None) for day in days])
+
+
+class CompletedTasksPageResponse(BaseModel):
+    tasks: List[TaskResponse]
+    next_cursor: int | None = None
+
+    @classmethod
+    def from_entities(cls, tasks: List[entities.Task], next_cursor: int | None) -> 'CompletedTasksPageResponse':
+        return cls(
+            tasks=[TaskResponse.from_task(task) for task in tasks],
+            next_cursor=next_cursor
+        )
+
+
+# data - строка целиком после изменения: клиент заменяет ею свою копию, повторное применение ничего не меняет.
+# У ежедневных задач day_id - день, в котором задача создана; активные ежедневные задачи показываются в каждом дне,
+# однодневные - в каждом дне своего срока
+class ChangeResponse(BaseModel):
+    seq: int
+    entity: ChangeEntity
+    entity_id: int
+    action: ChangeAction
+    data: dict
+
+    @classmethod
+    def from_change(cls, change: entities.Change) -> 'ChangeResponse':
+        return cls(
+            seq=change.seq,
+            entity=ChangeEntity(change.entity),
+            entity_id=change.entity_id,
+            action=ChangeAction(change.action),
+            data=change.data
+        )
+
+
+class ChangesPageResponse(BaseModel):
+    changes: List[ChangeResponse]
+    next_cursor: int
+    has_more: bool
+
+    @classmethod
+    def from_entities(cls, changes: List[entities.Change], next_cursor: int, has_more: bool) -> 'ChangesPageResponse':
+        return cls(changes=[ChangeResponse.from_change(change) for change in changes], next_cursor=next_cursor,
+                   has_more=has_more)
+
+
+# Результат по одной задаче массовой операции: задача после изменения или текст ошибки
+class BulkTaskResult(BaseModel):
+    id: int
+    task: TaskResponse | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_result(cls, id: int, task: entities.Task | None, error: Exception | None) -> 'BulkTaskResult':
+        return cls(
+            id=id,
+            task=TaskResponse.from_task(task) if task is not None else None,
+            error=error.message if error is not None else None
+        )
+
+
+class BulkTaskResponse(BaseModel):
+    results: List[BulkTaskResult]
+
+
+class BulkTaskCreateResult(BaseModel):
+    name: str
+    task: TaskResponse | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_result(cls, name: str, task: entities.Task | None, error: Exception | None) -> 'BulkTaskCreateResult':
+        return cls(
+            name=name,
+            task=TaskResponse.from_task(task) if task is not None else None,
+            error=error.message if error is not None else None
+        )
+
+
+class BulkTaskCreateResponse(BaseModel):
+    results: List[BulkTaskCreateResult]
+
+
+class CreateEquipmentRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+    name: str = Field(min_length=1)
+    kind: EquipmentKind
+
+
+class StartEquipmentRequest(BaseModel):
+    days: int = Field(gt=0, description='Days until the product is ready')
+
+
+class EquipmentResponse(BaseModel):
+    id: int
+    name: str
+    kind: EquipmentKind
+    ready_ordinal: int | None = None
+    # Оставшиеся дни считаются от текущего дня при ответе; 0 - продукт готов, None - оборудование свободно
+    days_left: int | None = None
+
+    @classmethod
+    def from_equipment(cls, equipment: entities.Equipment, current_ordinal: int) -> 'EquipmentResponse':
+        days_left = None
+        if equipment.ready_ordinal is not None:
+            days_left = max(equipment.ready_ordinal - current_ordinal, 0)
+        return cls(
+            id=equipment.id,
+            name=equipment.name,
+            kind=EquipmentKind(equipment.kind),
+            ready_ordinal=equipment.ready_ordinal,
+            days_left=days_left
         )
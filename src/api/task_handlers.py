@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from . import fast_json
 from .handlers_models import *
+from .. import config
+from ..repository.db_executor import DbExecutor
 from ..services.task_service import TaskService
-from ..dependencies import get_task_service
+from ..dependencies import get_db_executor, get_task_service
 
 router = APIRouter(
     prefix="/task",
@@ -14,55 +18,164 @@ router = APIRouter(
 
 
 @router.post("/", status_code=200)
-def create_task_handle(
-        request: TaskNameRequest,
-        task_service: TaskService = Depends(get_task_service)
+async def create_task_handle(
+        request: CreateTaskRequest,
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
 ) -> TaskResponse:
-    new_task = task_service.create_task(request.name)
+    new_task = await db_executor.write(task_service.create_task, request.name, request.duration)
     return TaskResponse.from_task(new_task)
 
 
+# Задачи создаются одной транзакцией, задачи с уже существующими именами возвращаются с ошибкой
+@router.post("/batch", status_code=200)
+async def create_tasks_handle(
+        request: BulkTaskNamesRequest,
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> BulkTaskCreateResponse:
+    results = await db_executor.write(task_service.create_tasks, request.names)
+    return BulkTaskCreateResponse(results=[BulkTaskCreateResult.from_result(*result) for result in results])
+
+
+@router.get("/completed", status_code=200)
+async def get_completed_tasks_handle(
+        cursor: int | None = Query(default=None, ge=0),
+        limit: int = Query(default=config.COMPLETED_TASKS_PAGE_SIZE, ge=1, le=config.COMPLETED_TASKS_MAX_PAGE_SIZE),
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> CompletedTasksPageResponse:
+    tasks, next_cursor = await db_executor.run(task_service.get_completed_page, cursor, limit)
+    if config.API_FAST_JSON:
+        return fast_json.FastJSONResponse(fast_json.completed_tasks_page_to_dict(tasks, next_cursor))
+    return CompletedTasksPageResponse.from_entities(tasks, next_cursor)
+
+
+# NDJSON: одна строка JSON на задачу. Задачи читаются из БД пачками по мере отправки ответа
+@router.get("/completed/export", status_code=200, response_class=StreamingResponse)
+async def export_completed_tasks_handle(
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> StreamingResponse:
+    # Первая пачка читается до начала ответа: если соединение для выгрузки не получено, клиент получает 503,
+    # а не оборванный поток. Каждая пачка читается в потоке БД, цикл событий занят только отправкой
+    batches = task_service.iter_completed_batches()
+    first_tasks = await db_executor.run(next, batches, None)
+
+    async def _ndjson_lines():
+        tasks = first_tasks
+        try:
+            while tasks is not None:
+                if config.API_FAST_JSON:
+                    yield b''.join(fast_json.dumps(fast_json.task_to_dict(task)) + b'\n' for task in tasks)
+                else:
+                    yield ''.join(TaskResponse.from_task(task).model_dump_json() + '\n' for task in tasks)
+                tasks = await db_executor.run(next, batches, None)
+        finally:
+            await db_executor.run(batches.close)
+
+    return StreamingResponse(_ndjson_lines(), media_type='application/x-ndjson')
+
+
+# Ошибки отдельных задач не прерывают операцию: они возвращаются в результатах по каждому id
+@router.post("/complete", status_code=200)
+async def make_tasks_complete_handle(
+        request: BulkTaskIdsRequest,
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> BulkTaskResponse:
+    results = await db_executor.write(task_service.make_completed_many, request.ids)
+    return BulkTaskResponse(results=[BulkTaskResult.from_result(*result) for result in results])
+
+
 @router.patch("/{id}/complete", status_code=200)
-def make_task_complete_handle(
+async def make_task_complete_handle(
         id: int,
-        task_service: TaskService = Depends(get_task_service)
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
 ) -> TaskResponse:
-    updated_task = task_service.make_completed(id)
+    updated_task = await db_executor.write(task_service.make_completed, id)
     return TaskResponse.from_task(updated_task)
 
 
 @router.patch("/{id}/active", status_code=200)
-def make_task_active_handle(
+async def make_task_active_handle(
         id: int,
-        task_service: TaskService = Depends(get_task_service)
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
 ) -> TaskResponse:
-    updated_task = task_service.make_active(id)
+    updated_task = await db_executor.write(task_service.make_active, id)
     return TaskResponse.from_task(updated_task)
 
 
 @router.patch("/{id}/daily", status_code=200)
-def make_task_daily_handle(
+async def make_task_daily_handle(
         id: int,
-        task_service: TaskService = Depends(get_task_service)
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
 ) -> TaskResponse:
-    updated_task = task_service.make_daily(id)
+    updated_task = await db_executor.write(task_service.make_daily, id)
     return TaskResponse.from_task(updated_task)
 
 
 @router.patch("/{id}/one_time", status_code=200)
-def make_task_one_time_handle(
+async def make_task_one_time_handle(
         id: int,
-        task_service: TaskService = Depends(get_task_service)
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
 ) -> TaskResponse:
-    updated_task = task_service.make_one_time(id)
+    updated_task = await db_executor.write(task_service.make_one_time, id)
     return TaskResponse.from_task(updated_task)
 
 
+@router.patch("/{id}/duration", status_code=200)
+async def set_task_duration_handle(
+        id: int,
+        request: TaskDurationRequest,
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> TaskResponse:
+    updated_task = await db_executor.write(task_service.set_duration, id, request.duration)
+    return TaskResponse.from_task(updated_task)
+
+
+# Отметка о выполнении ежедневной задачи в текущем дне. Задача остается активной и появится в следующем дне
+@router.patch("/{id}/done_today", status_code=200)
+async def mark_daily_task_done_handle(
+        id: int,
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> TaskResponse:
+    updated_task = await db_executor.write(task_service.mark_daily_done, id)
+    return TaskResponse.from_task(updated_task, done_today=True)
+
+
+@router.patch("/{id}/not_done_today", status_code=200)
+async def unmark_daily_task_done_handle(
+        id: int,
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> TaskResponse:
+    updated_task = await db_executor.write(task_service.unmark_daily_done, id)
+    return TaskResponse.from_task(updated_task, done_today=False)
+
+
+@router.get("/{id}/completions", status_code=200)
+async def get_daily_task_completions_handle(
+        id: int,
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
+) -> TaskCompletionsResponse:
+    days = await db_executor.run(task_service.get_completion_days, id)
+    return TaskCompletionsResponse.from_entities(id, days)
+
+
 @router.patch("/{id}/rename", status_code=200)
-def rename_task_handle(
+async def rename_task_handle(
         id: int,
         request: TaskNameRequest,
-        task_service: TaskService = Depends(get_task_service)
+        task_service: TaskService = Depends(get_task_service),
+        db_executor: DbExecutor = Depends(get_db_executor)
 ) -> TaskResponse:
-    updated_task = task_service.edit_name(id, request.name)
+    updated_task = await db_executor.write(task_service.edit_name, id, request.name)
     return TaskResponse.from_task(updated_task)
@@ -1 +1,44 @@
-DB_PATH = "db/todo_list.sqlite"
\ No newline at end of file
+DB_PATH = "db/todo_list.sqlite"
+
+# Пул соединений, общий для всех репозиториев
+DB_POOL_SIZE = 8
+DB_POOL_TIMEOUT = 5.0
+DB_POOL_HEALTH_CHECK = True
+DB_CACHED_STATEMENTS = 128
+# Длинные чтения (потоковая выгрузка) открывают свои соединения только для чтения, не занимая пул.
+# Одновременно их может быть не больше DB_MAX_DETACHED_CONNECTIONS, сверх этого запрос получает 503
+DB_MAX_DETACHED_CONNECTIONS = 4
+
+# Групповая фиксация: все записи выполняет один поток, фиксируя до DB_GROUP_COMMIT_MAX_BATCH_SIZE вызовов
+# одной транзакцией. Группа ждет новые вызовы не дольше DB_GROUP_COMMIT_WINDOW секунд
+DB_GROUP_COMMIT = False
+DB_GROUP_COMMIT_MAX_BATCH_SIZE = 64
+DB_GROUP_COMMIT_WINDOW = 0.002
+
+# Набор PRAGMA, применяемый к каждому соединению: 'durable', 'balanced' или 'throughput'
+DB_STORAGE_PROFILE = "balanced"
+
+# Завершенные задачи отдаются страницами по id
+COMPLETED_TASKS_PAGE_SIZE = 50
+COMPLETED_TASKS_MAX_PAGE_SIZE = 500
+# Сколько строк за раз читается из БД при потоковой выгрузке завершенных задач
+COMPLETED_TASKS_EXPORT_BATCH_SIZE = 500
+
+# Самые тяжелые ответы (GET /day/current, GET /task/completed, выгрузка завершенных задач) кодируются в JSON
+# прямо из сущностей, без Pydantic-моделей (см. api/fast_json). False - кодирование через модели
+API_FAST_JSON = True
+
+# Изменения из журнала отдаются страницами по seq
+CHANGES_PAGE_SIZE = 100
+CHANGES_MAX_PAGE_SIZE = 1000
+
+# Поток событий GET /day/events: сколько клиентов может быть подписано одновременно
+# и через сколько секунд без изменений отправляется комментарий, поддерживающий соединение
+STATE_EVENTS_MAX_SUBSCRIBERS = 1000
+STATE_EVENTS_KEEPALIVE = 15.0
+
+# Максимальное число задач в одном запросе массового изменения
+TASKS_BULK_MAX_SIZE = 500
+
+# Максимальный переход вперед за один запрос POST /day/next?days=N
+DAY_ADVANCE_MAX_DAYS = 112 * 100
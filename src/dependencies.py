@@ -1,14 +1,35 @@
+from .repository.db_executor import DbExecutor
+from .services.change_log_service import ChangeLogService
 from .services.day_service import DayService
+from .services.equipment_service import EquipmentService
+from .services.state_broadcaster import StateBroadcaster
 from .services.task_service import TaskService
 import fastapi
 
 # Функции-'поставщики' (провайдеры). FastAPI автоматически передаст в них объект текущего запроса `req`.
-# Получают доступ к состоянию приложения (req.app.state) и возвращают из него нужный сервис, который был создан при старте в main
-def get_day_service(req: fastapi.Request) -> DayService:
+# Получают доступ к состоянию приложения (req.app.state) и возвращают из него нужный сервис, который был создан при старте в main.
+# Провайдеры асинхронные: синхронные FastAPI вызывает в пуле потоков Starlette, а они только читают app.state
+async def get_day_service(req: fastapi.Request) -> DayService:
 # Через запрос `req` получаем доступ к главному объекту `app`,
 # затем к его состоянию `state` и оттуда возвращаем единственный экземпляр `day_service`, созданный в lifespan.
     return req.app.state.day_service
 
 
-def get_task_service(req: fastapi.Request) -> TaskService:
+async def get_task_service(req: fastapi.Request) -> TaskService:
     return req.app.state.task_service
+
+
+async def get_equipment_service(req: fastapi.Request) -> EquipmentService:
+    return req.app.state.equipment_service
+
+
+async def get_change_log_service(req: fastapi.Request) -> ChangeLogService:
+    return req.app.state.change_log_service
+
+
+async def get_state_broadcaster(req: fastapi.Request) -> StateBroadcaster:
+    return req.app.state.state_broadcaster
+
+
+async def get_db_executor(req: fastapi.Request) -> DbExecutor:
+    return req.app.state.db_executor
@@ -1,2 +1,4 @@
 from .task_entities import *
-from .day_entities import *
\ No newline at end of file
+from .day_entities import *
+from .equipment_entities import *
+from .change_entities import *
\ No newline at end of file
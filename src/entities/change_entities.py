@@ -0,0 +1,22 @@
+class Change:
+    __slots__ = ('seq', 'entity', 'entity_id', 'action', 'data')
+
+    # Запись журнала изменений: seq - возрастающий номер изменения, data - состояние строки после изменения
+    # (для action = 'delete' - до удаления)
+    def __init__(self, seq: int, entity: str, entity_id: int, action: str, data: dict):
+        self.seq = seq
+        self.entity = entity
+        self.entity_id = entity_id
+        self.action = action
+        self.data = data
+
+    def __eq__(self, other):
+        if not isinstance(other, Change):
+            return NotImplemented
+        return (
+            self.seq == other.seq and
+            self.entity == other.entity and
+            self.entity_id == other.entity_id and
+            self.action == other.action and
+            self.data == other.data
+        )
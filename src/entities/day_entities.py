@@ -1,4 +1,9 @@
+from ..game_calendar import to_ordinal
+
+
 class Day:
+    __slots__ = ('id', 'year', 'season', 'number', 'active')
+
     def __init__(self, year: int, season: str, number: int, active: bool, day_id: int = None):
         self.id = day_id
         self.year = year
@@ -6,6 +11,10 @@ class Day:
         self.number = number
         self.active = active
 
+    @property
+    def ordinal(self) -> int:
+        return to_ordinal(self.year, self.season, self.number)
+
     def __eq__(self, other):
         if not isinstance(other, Day):
             return NotImplemented
@@ -0,0 +1,20 @@
+class Equipment:
+    __slots__ = ('id', 'name', 'kind', 'ready_ordinal')
+
+    # ready_ordinal - порядковый номер дня, когда продукт будет готов; None - оборудование свободно.
+    # Хранится абсолютный день, а не обратный отсчет, поэтому переход дня не меняет строки оборудования
+    def __init__(self, name: str, kind: str, ready_ordinal: int | None = None, equipment_id: int = None):
+        self.id = equipment_id
+        self.name = name
+        self.kind = kind
+        self.ready_ordinal = ready_ordinal
+
+    def __eq__(self, other):
+        if not isinstance(other, Equipment):
+            return NotImplemented
+        return (
+            self.id == other.id and
+            self.name == other.name and
+            self.kind == other.kind and
+            self.ready_ordinal == other.ready_ordinal
+        )
@@ -1,10 +1,18 @@
 class Task:
-    def __init__(self, name: str, day_id: int, type: str, status: str, task_id: int = None):
+    # Без __dict__ у каждого экземпляра: меньше памяти и быстрее создание при чтении большого числа строк
+    __slots__ = ('name', 'day_id', 'type', 'status', 'id', 'duration', 'due_ordinal')
+
+    # duration - сколько дней длится однодневная задача (None - бессрочно), due_ordinal - порядковый номер
+    # последнего дня задачи. due_ordinal вычисляется в БД от дня задачи, при создании его передавать не нужно
+    def __init__(self, name: str, day_id: int, type: str, status: str, task_id: int = None, duration: int | None = 1,
+                 due_ordinal: int | None = None):
         self.name = name
         self.day_id = day_id
         self.type = type
         self.status = status
         self.id = task_id
+        self.duration = duration
+        self.due_ordinal = due_ordinal
 
     def __eq__(self, other):
         if not isinstance(other, Task):
@@ -14,5 +22,7 @@ class Task:
             self.name == other.name and
             self.day_id == other.day_id and
             self.type == other.type and
-            self.status == other.status
+            self.status == other.status and
+            self.duration == other.duration and
+            self.due_ordinal == other.due_ordinal
         )
@@ -38,3 +38,28 @@ class InvalidDayError(Exception):
     def __init__(self, message: str):
         self.message = message
         super().__init__(self.message)
+
+class EquipmentNotFoundException(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+class InvalidEquipmentStateException(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+class DuplicateEquipmentNameException(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+class TooManySubscribersException(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+class TooManyDetachedConnectionsException(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
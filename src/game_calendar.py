@@ -0,0 +1,38 @@
+from typing import Iterable, List, Tuple
+
+# Календарь игры: 4 сезона по 28 дней, годы начинаются с 1
+SEASONS = ['spring', 'summer', 'autumn', 'winter']
+DAYS_PER_SEASON = 28
+DAYS_PER_YEAR = len(SEASONS) * DAYS_PER_SEASON
+
+_season_indexes = {season: index for index, season in enumerate(SEASONS)}
+
+# То же вычисление порядкового номера на SQL: для заполнения колонки days.ordinal в миграции
+ORDINAL_SQL = f"""year * {DAYS_PER_YEAR}
+                  + CASE season
+                        WHEN 'spring' THEN 0
+                        WHEN 'summer' THEN 1
+                        WHEN 'autumn' THEN 2
+                        WHEN 'winter' THEN 3
+                    END * {DAYS_PER_SEASON}
+                  + number"""
+
+
+# Порядковый номер дня: year * 112 + индекс сезона * 28 + number. Соседние дни отличаются ровно на 1,
+# поэтому диапазон дней - это диапазон номеров, а переход на N дней - сложение
+def to_ordinal(year: int, season: str, number: int) -> int:
+    return year * DAYS_PER_YEAR + _season_indexes[season] * DAYS_PER_SEASON + number
+
+
+def from_ordinal(ordinal: int) -> Tuple[int, str, int]:
+    year, day_of_year = divmod(ordinal - 1, DAYS_PER_YEAR)
+    season_index, day_of_season = divmod(day_of_year, DAYS_PER_SEASON)
+    return year, SEASONS[season_index], day_of_season + 1
+
+
+def to_ordinals(days: Iterable[Tuple[int, str, int]]) -> List[int]:
+    return [to_ordinal(year, season, number) for year, season, number in days]
+
+
+def from_ordinals(ordinals: Iterable[int]) -> List[Tuple[int, str, int]]:
+    return [from_ordinal(ordinal) for ordinal in ordinals]
@@ -4,15 +4,20 @@ from contextlib import asynccontextmanager
 from starlette.datastructures import State
 
 from src import migration, config
-from src.api import day_handlers, task_handlers
-from src.repository import DayRepository, TaskRepository
-from src.services import DayService, TaskService
+from src.api import change_handlers, day_handlers, equipment_handlers, task_handlers
+from src.repository import (ChangeLogRepository, DayRepository, DbExecutor, EquipmentRepository, GroupCommitWriter,
+                            TaskRepository, close_all_pools, get_pool)
+from src.services import ChangeLogService, DayService, EquipmentService, StateBroadcaster, TaskService
 
 # Определение "состояния" приложения ('чертеж')
 # Объект для хранения общих ресурсов, доступных во всем приложении
 class ApplicationState(State):
     day_service: DayService
     task_service: TaskService
+    equipment_service: EquipmentService
+    change_log_service: ChangeLogService
+    state_broadcaster: StateBroadcaster
+    db_executor: DbExecutor
 
 # Свой класс приложения по заданному 'чертежу'
 class Application(FastAPI):
@@ -29,21 +34,36 @@ async def lifespan(application: Application):
     day_repository = DayRepository(config.DB_PATH)
     day_service = DayService(day_repository, task_repository)
     task_service = TaskService(task_repository, day_service)
+    equipment_service = EquipmentService(EquipmentRepository(config.DB_PATH), day_service)
+    change_log_service = ChangeLogService(ChangeLogRepository(config.DB_PATH))
+    state_broadcaster = StateBroadcaster(day_service.state_version)
+    db_executor = DbExecutor()
 
 # Сохранение созданных сервисов в состояние приложения 'application.state'
 # Теперь они доступны из любой части приложения
     application.state.day_service = day_service
     application.state.task_service = task_service
+    application.state.equipment_service = equipment_service
+    application.state.change_log_service = change_log_service
+    application.state.state_broadcaster = state_broadcaster
+    application.state.db_executor = db_executor
     print("Dependencies built")
     migration.create_database_and_tables(config.DB_PATH)
+    if config.DB_GROUP_COMMIT:
+        db_executor.set_writer(GroupCommitWriter(get_pool(config.DB_PATH), on_group_start=day_service.begin_group,
+                                                 on_group_done=day_service.finish_group))
 # `yield` передает управление приложению. Оно начинает работать и принимать запросы.
     yield
     print("Exiting lifespan")
+    db_executor.shutdown()
+    close_all_pools()
 
 # Создание экземпляра приложения и передача ему менеджера жизненного цикла
 app = Application(lifespan=lifespan)
 # Регистрация роутов
 app.include_router(day_handlers.router)
 app.include_router(task_handlers.router)
+app.include_router(equipment_handlers.router)
+app.include_router(change_handlers.router)
 
 from src.api import error_handlers
\ No newline at end of file
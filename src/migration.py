@@ -1,50 +1,314 @@
 import sqlite3
+from typing import List
 
+from src.game_calendar import ORDINAL_SQL, to_ordinal
+from src.repository.storage_profile import get_storage_profile
 
-def create_database_and_tables(db_path: str):
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        create_tasks_table_sql = """
-                                 create table if not exists main.tasks
-                                 (
-                                     id     INTEGER PRIMARY KEY AUTOINCREMENT,
-                                     name   TEXT    NOT NULL,
-                                     day_id INTEGER NOT NULL CHECK (day_id > 0),
-                                     type   TEXT    NOT NULL CHECK (type IN ('daily', 'one-time')),
-                                     status TEXT    NOT NULL CHECK (status IN ('active', 'completed')),
-                                     FOREIGN KEY (day_id) REFERENCES days (id),
-                                     UNIQUE (name)
-                                 ); \
+create_tasks_table_sql = """
+                         create table if not exists main.tasks
+                         (
+                             id     INTEGER PRIMARY KEY AUTOINCREMENT,
+                             name   TEXT    NOT NULL,
+                             day_id INTEGER NOT NULL CHECK (day_id > 0),
+                             type   TEXT    NOT NULL CHECK (type IN ('daily', 'one-time')),
+                             status TEXT    NOT NULL CHECK (status IN ('active', 'completed')),
+                             FOREIGN KEY (day_id) REFERENCES days (id),
+                             UNIQUE (name)
+                         ); \
+                         """
+create_tasks_uniq_index_sql = """ \
+                              create unique index if not exists tasks_name_uindex
+                                  on tasks (name); \
+                              """
+create_days_table_sql = """
+                        create table if not exists main.days
+                        (
+                            id     INTEGER PRIMARY KEY AUTOINCREMENT,
+                            year   INTEGER NOT NULL CHECK (year > 0),
+                            season TEXT    NOT NULL CHECK (season IN ('spring', 'summer', 'autumn', 'winter')),
+                            number INTEGER NOT NULL CHECK (number BETWEEN 1 AND 28),
+                            active BOOLEAN NOT NULL,
+                            UNIQUE (year, season, number)
+                        ); \
+                        """
+create_days_uniq_index_sql = """create unique index if not exists days_season_year_number_uindex
+    on days (season, year, number); \
+                             """
+# Задачи дня: WHERE day_id = ? [AND status = ?] ORDER BY id
+create_tasks_day_id_status_id_index_sql = """
+                                          create index if not exists tasks_day_id_status_id_index
+                                              on tasks (day_id, status, id); \
+                                          """
+# Все завершенные задачи: WHERE status = 'completed' ORDER BY id
+create_tasks_completed_index_sql = """
+                                   create index if not exists tasks_completed_id_index
+                                       on tasks (id)
+                                       where status = 'completed'; \
+                                   """
+# Порядковый номер дня (см. game_calendar): диапазоны дней выбираются по индексу через BETWEEN
+add_days_ordinal_column_sql = """
+                              alter table days
+                                  add column ordinal INTEGER NOT NULL DEFAULT 0; \
+                              """
+fill_days_ordinal_sql = f"""
+                        update days
+                        set ordinal = {ORDINAL_SQL}; \
+                        """
+create_days_ordinal_uindex_sql = """
+                                 create unique index if not exists days_ordinal_uindex
+                                     on days (ordinal); \
                                  """
-        create_tasks_uniq_index_sql = """ \
-                                      create unique index if not exists tasks_name_uindex
-                                          on tasks (name); \
-                                      """
-        create_days_table_sql = """
-                                create table if not exists main.days
-                                (
-                                    id     INTEGER PRIMARY KEY AUTOINCREMENT,
-                                    year   INTEGER NOT NULL CHECK (year > 0),
-                                    season TEXT    NOT NULL CHECK (season IN ('spring', 'summer', 'autumn', 'winter')),
-                                    number INTEGER NOT NULL CHECK (number BETWEEN 1 AND 28),
-                                    active BOOLEAN NOT NULL,
-                                    UNIQUE (year, season, number)
-                                ); \
+# Срок однодневной задачи: duration дней начиная с дня задачи (NULL - бессрочно),
+# due_ordinal - порядковый номер последнего дня. У существующих однодневных задач срок - один день
+add_tasks_duration_column_sql = """
+                                alter table tasks
+                                    add column duration INTEGER DEFAULT 1 CHECK (duration IS NULL OR duration > 0); \
                                 """
-        create_days_uniq_index_sql = """create unique index if not exists days_season_year_number_uindex
-            on days (season, year, number); \
-                                     """
+add_tasks_due_ordinal_column_sql = """
+                                   alter table tasks
+                                       add column due_ordinal INTEGER; \
+                                   """
+fill_tasks_due_ordinal_sql = """
+                             update tasks
+                             set due_ordinal = (SELECT ordinal FROM days WHERE days.id = tasks.day_id)
+                             where type = 'one-time'; \
+                             """
+# Истекающие при переходе дня задачи: WHERE day_id = ? AND status = 'active' AND due_ordinal < ?
+create_tasks_active_due_ordinal_index_sql = """
+                                            create index if not exists tasks_active_day_id_due_ordinal_index
+                                                on tasks (day_id, due_ordinal)
+                                                where status = 'active'; \
+                                            """
+# Оборудование с таймером: ready_ordinal - день готовности продукта, NULL - оборудование свободно
+create_equipment_table_sql = """
+                             create table if not exists main.equipment
+                             (
+                                 id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                                 name          TEXT NOT NULL,
+                                 kind          TEXT NOT NULL CHECK (kind IN ('tub', 'keg', 'cask', 'preserves_jar')),
+                                 ready_ordinal INTEGER,
+                                 UNIQUE (name)
+                             ); \
+                             """
+# Готовое оборудование: WHERE ready_ordinal <= ? ORDER BY ready_ordinal
+create_equipment_ready_ordinal_index_sql = """
+                                           create index if not exists equipment_ready_ordinal_index
+                                               on equipment (ready_ordinal, id)
+                                               where ready_ordinal is not null; \
+                                           """
+# Ежедневные задачи не привязаны к дню: отметка о выполнении хранится отдельной строкой на каждый день.
+# Первичный ключ (task_id, day_id) отвечает на "выполнена ли сегодня", индекс (day_id, task_id) - на "что выполнено в день"
+create_task_completions_table_sql = """
+                                    create table if not exists main.task_completions
+                                    (
+                                        task_id INTEGER NOT NULL,
+                                        day_id  INTEGER NOT NULL,
+                                        PRIMARY KEY (task_id, day_id),
+                                        FOREIGN KEY (task_id) REFERENCES tasks (id),
+                                        FOREIGN KEY (day_id) REFERENCES days (id)
+                                    ) WITHOUT ROWID; \
+                                    """
+create_task_completions_day_id_index_sql = """
+                                           create index if not exists task_completions_day_id_task_id_index
+                                               on task_completions (day_id, task_id); \
+                                           """
+# Активные ежедневные задачи показываются в любом дне: WHERE type = 'daily' AND status = 'active' ORDER BY id
+create_tasks_active_daily_index_sql = """
+                                      create index if not exists tasks_active_daily_id_index
+                                          on tasks (id)
+                                          where type = 'daily' and status = 'active'; \
+                                      """
+# Активным может быть только один день. Если в БД уже несколько активных дней, активным остается последний созданный
+repair_multiple_active_days_sql = """
+                                  update days
+                                  set active = 0
+                                  where active = 1
+                                    and id < (select max(id) from days where active = 1); \
+                                  """
+create_days_single_active_uindex_sql = """
+                                       create unique index if not exists days_single_active_uindex
+                                           on days (active)
+                                           where active = 1; \
+                                       """
+
+# Журнал изменений для инкрементальной синхронизации клиентов: seq - номер изменения, data - JSON строки после
+# изменения. Журнал только пополняется. Записи добавляют триггеры в той же транзакции, что и изменение,
+# поэтому журнал не расходится с таблицами ни при какой ошибке
+create_changes_table_sql = """
+                           create table if not exists main.changes
+                           (
+                               seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+                               entity    TEXT    NOT NULL CHECK (entity IN ('task', 'day', 'task_completion')),
+                               entity_id INTEGER NOT NULL,
+                               action    TEXT    NOT NULL CHECK (action IN ('insert', 'update', 'delete')),
+                               data      TEXT    NOT NULL
+                           ); \
+                           """
+_task_change_data_sql = """json_object('id', NEW.id, 'name', NEW.name, 'day_id', NEW.day_id, 'type', NEW.type,
+                                       'status', NEW.status, 'duration', NEW.duration,
+                                       'due_ordinal', NEW.due_ordinal)"""
+_day_change_data_sql = """json_object('id', NEW.id, 'year', NEW.year, 'season', NEW.season, 'number', NEW.number,
+                                      'active', NEW.active, 'ordinal', NEW.ordinal)"""
+create_tasks_insert_change_trigger_sql = f"""
+                                         create trigger if not exists tasks_insert_change
+                                             after insert on tasks
+                                         begin
+                                             insert into changes (entity, entity_id, action, data)
+                                             values ('task', NEW.id, 'insert', {_task_change_data_sql});
+                                         end; \
+                                         """
+create_tasks_update_change_trigger_sql = f"""
+                                         create trigger if not exists tasks_update_change
+                                             after update on tasks
+                                         begin
+                                             insert into changes (entity, entity_id, action, data)
+                                             values ('task', NEW.id, 'update', {_task_change_data_sql});
+                                         end; \
+                                         """
+create_days_insert_change_trigger_sql = f"""
+                                        create trigger if not exists days_insert_change
+                                            after insert on days
+                                        begin
+                                            insert into changes (entity, entity_id, action, data)
+                                            values ('day', NEW.id, 'insert', {_day_change_data_sql});
+                                        end; \
+                                        """
+create_days_update_change_trigger_sql = f"""
+                                        create trigger if not exists days_update_change
+                                            after update on days
+                                        begin
+                                            insert into changes (entity, entity_id, action, data)
+                                            values ('day', NEW.id, 'update', {_day_change_data_sql});
+                                        end; \
+                                        """
+create_task_completions_insert_change_trigger_sql = """
+                                                    create trigger if not exists task_completions_insert_change
+                                                        after insert on task_completions
+                                                    begin
+                                                        insert into changes (entity, entity_id, action, data)
+                                                        values ('task_completion', NEW.task_id, 'insert',
+                                                                json_object('task_id', NEW.task_id, 'day_id', NEW.day_id));
+                                                    end; \
+                                                    """
+create_task_completions_delete_change_trigger_sql = """
+                                                    create trigger if not exists task_completions_delete_change
+                                                        after delete on task_completions
+                                                    begin
+                                                        insert into changes (entity, entity_id, action, data)
+                                                        values ('task_completion', OLD.task_id, 'delete',
+                                                                json_object('task_id', OLD.task_id, 'day_id', OLD.day_id));
+                                                    end; \
+                                                    """
+# День однодневной задачи больше не переносится при переходе дня: истекающие задачи ищутся по due_ordinal
+# среди всех активных однодневных задач: WHERE status = 'active' AND type = 'one-time' AND due_ordinal < ?.
+# Тот же индекс отвечает на выбор задач дня по сроку
+drop_tasks_active_due_ordinal_index_sql = """
+                                          drop index if exists tasks_active_day_id_due_ordinal_index; \
+                                          """
+create_tasks_active_one_time_due_ordinal_index_sql = """
+                                                     create index if not exists tasks_active_one_time_due_ordinal_index
+                                                         on tasks (due_ordinal)
+                                                         where status = 'active' and type = 'one-time'; \
+                                                     """
+
+# Задачи дня выбираются по сроку и частичным индексам активных задач, выбор по day_id и статусу не используется
+drop_tasks_day_id_status_id_index_sql = """
+                                        drop index if exists tasks_day_id_status_id_index; \
+                                        """
+
+# Миграция с номером N (позиция в списке + 1) переводит схему из версии N - 1 в версию N.
+# Текущая версия схемы хранится в PRAGMA user_version. Уже примененные миграции не меняются, новые добавляются в конец
+migrations: List[List[str]] = [
+    [
+        create_tasks_table_sql,
+        create_days_table_sql,
+        create_days_uniq_index_sql,
+        create_tasks_uniq_index_sql,
+    ],
+    [
+        create_tasks_day_id_status_id_index_sql,
+        create_tasks_completed_index_sql,
+    ],
+    [
+        add_days_ordinal_column_sql,
+        fill_days_ordinal_sql,
+        create_days_ordinal_uindex_sql,
+    ],
+    [
+        add_tasks_duration_column_sql,
+        add_tasks_due_ordinal_column_sql,
+        fill_tasks_due_ordinal_sql,
+        create_tasks_active_due_ordinal_index_sql,
+    ],
+    [
+        create_equipment_table_sql,
+        create_equipment_ready_ordinal_index_sql,
+    ],
+    [
+        create_task_completions_table_sql,
+        create_task_completions_day_id_index_sql,
+        create_tasks_active_daily_index_sql,
+    ],
+    [
+        repair_multiple_active_days_sql,
+        create_days_single_active_uindex_sql,
+    ],
+    [
+        create_changes_table_sql,
+        create_tasks_insert_change_trigger_sql,
+        create_tasks_update_change_trigger_sql,
+        create_days_insert_change_trigger_sql,
+        create_days_update_change_trigger_sql,
+        create_task_completions_insert_change_trigger_sql,
+        create_task_completions_delete_change_trigger_sql,
+    ],
+    [
+        drop_tasks_active_due_ordinal_index_sql,
+        create_tasks_active_one_time_due_ordinal_index_sql,
+    ],
+    [
+        drop_tasks_day_id_status_id_index_sql,
+    ],
+]
+
 
-        cursor.execute(create_tasks_table_sql)
-        cursor.execute(create_days_table_sql)
-        cursor.execute(create_days_uniq_index_sql)
-        cursor.execute(create_tasks_uniq_index_sql)
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
 
+
+def migrate(conn: sqlite3.Connection) -> int:
+    if get_schema_version(conn) >= len(migrations):
+        return get_schema_version(conn)
+
+    while True:
+        # Версия перечитывается под блокировкой записи: другой процесс мог уже применить миграцию
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = get_schema_version(conn)
+            if version >= len(migrations):
+                conn.commit()
+                return version
+            for statement in migrations[version]:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {version + 1}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def create_database_and_tables(db_path: str):
+    with sqlite3.connect(db_path) as conn:
+        # journal_mode = WAL сохраняется в файле БД, остальные настройки действуют только на это соединение
+        get_storage_profile().apply(conn)
+        migrate(conn)
+
+        cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM main.days")
         row = cursor.fetchone()
         if row[0] == 0:
             cursor.execute("""
-                           INSERT INTO main.days (year, season, number, active)
-                           VALUES (1, 'spring', 1, 1); \
-                           """)
+                           INSERT INTO main.days (year, season, number, active, ordinal)
+                           VALUES (1, 'spring', 1, 1, ?); \
+                           """, (to_ordinal(1, 'spring', 1),))
         conn.commit()
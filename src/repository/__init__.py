@@ -1,2 +1,8 @@
+from .storage_profile import *
+from .connection_pool import *
 from .day_repository import *
-from .task_repository import *
\ No newline at end of file
+from .task_repository import *
+from .equipment_repository import *
+from .change_log_repository import *
+from .group_commit import *
+from .db_executor import *
\ No newline at end of file
@@ -0,0 +1,43 @@
+import json
+import sqlite3
+from .. import entities
+from .connection_pool import get_pool
+from typing import List
+
+
+# Колонки выбираются строго в порядке: seq, entity, entity_id, action, data
+def change_row_factory(cursor: sqlite3.Cursor, row: tuple) -> entities.Change:
+    return entities.Change(row[0], row[1], row[2], row[3], json.loads(row[4]))
+
+
+# Журнал заполняется триггерами в той же транзакции, что и само изменение (см. migration), поэтому репозиторий
+# только читает его. Записи в SQLite фиксируются по одной транзакции за раз, и seq растет в порядке фиксации:
+# запись с меньшим seq не может появиться после того, как клиент прочитал большую
+class ChangeLogRepository:
+    def __init__(self, connection_string: str):
+        self.connection_string = connection_string
+        self.pool = get_pool(connection_string)
+
+    def get_since(self, after_seq: int, limit: int) -> List[entities.Change]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = change_row_factory
+            select_changes_since_sql = """
+                                       SELECT seq, entity, entity_id, action, data
+                                       FROM changes
+                                       WHERE seq > ?
+                                       ORDER BY seq
+                                       LIMIT ?; \
+                                       """
+            cursor.execute(select_changes_since_sql, (after_seq, limit))
+            return cursor.fetchall()
+
+    def get_last_seq(self) -> int:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            select_last_seq_sql = """
+                                  SELECT COALESCE(MAX(seq), 0)
+                                  FROM changes; \
+                                  """
+            cursor.execute(select_last_seq_sql)
+            return cursor.fetchone()[0]
@@ -0,0 +1,172 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from .. import config
+from ..errors import InternalException, TooManyDetachedConnectionsException
+from .storage_profile import StorageProfile, get_storage_profile
+
+
+class ConnectionPool:
+    def __init__(self, db_path: str, size: int = config.DB_POOL_SIZE, timeout: float = config.DB_POOL_TIMEOUT,
+                 health_check: bool = config.DB_POOL_HEALTH_CHECK,
+                 cached_statements: int = config.DB_CACHED_STATEMENTS, profile: StorageProfile | None = None,
+                 max_detached: int = config.DB_MAX_DETACHED_CONNECTIONS):
+        if size <= 0:
+            raise ValueError(f'Pool size must be a positive integer, but got {size}')
+        if max_detached < 0:
+            raise ValueError(f'Max detached connections must be a non-negative integer, but got {max_detached}')
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.health_check = health_check
+        self.cached_statements = cached_statements
+        self.profile = profile or get_storage_profile()
+        self.max_detached = max_detached
+        self._detached_slots = threading.BoundedSemaphore(max_detached) if max_detached else None
+        self._idle_connections = queue.LifoQueue(maxsize=size)
+        self._created_count = 0
+        self._lock = threading.Lock()
+        # Соединение, выданное текущему потоку, и глубина вложенных вызовов connection()
+        self._local = threading.local()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        # Вложенные вызовы в одном потоке получают то же соединение, фиксация выполняется только внешним вызовом
+        local_conn = getattr(self._local, 'conn', None)
+        if local_conn is not None:
+            self._local.depth += 1
+            try:
+                yield local_conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        # Единица работы: все вызовы репозиториев внутри блока идут через одно соединение и фиксируются один раз.
+        # BEGIN IMMEDIATE берет блокировку записи сразу, поэтому SQLITE_BUSY не может возникнуть посреди операции
+        with self.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            yield conn
+
+    # Соединение вне потоковой привязки: для длинного чтения, которое продолжается в разных потоках
+    # (например, при потоковой отдаче ответа). Соединение открывается отдельно от пула и только для чтения,
+    # поэтому медленный клиент не занимает соединения обработки запросов и потока записи.
+    # Одновременно открыто не больше max_detached таких соединений, сверх этого - TooManyDetachedConnectionsException
+    @contextmanager
+    def detached_connection(self) -> Iterator[sqlite3.Connection]:
+        if self._detached_slots is None or not self._detached_slots.acquire(blocking=False):
+            raise TooManyDetachedConnectionsException(
+                f'Too many long reads in progress, the limit is {self.max_detached}')
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('PRAGMA query_only = ON')
+                yield conn
+            finally:
+                conn.close()
+        finally:
+            self._detached_slots.release()
+
+    def close(self):
+        with self._lock:
+            while True:
+                try:
+                    conn = self._idle_connections.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._created_count -= 1
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle_connections.get_nowait()
+        except queue.Empty:
+            conn = self._create_or_wait()
+
+        if self.health_check and not self._is_healthy(conn):
+            conn.close()
+            conn = self._connect()
+        return conn
+
+    def _create_or_wait(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._created_count < self.size:
+                self._created_count += 1
+                create_new = True
+            else:
+                create_new = False
+
+        if create_new:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created_count -= 1
+                raise
+
+        try:
+            return self._idle_connections.get(timeout=self.timeout)
+        except queue.Empty:
+            raise InternalException(
+                f'No free database connection in pool of size {self.size} after {self.timeout} seconds')
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle_connections.put_nowait(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Соединение может переходить между потоками пула, но одновременно используется только одним из них
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=self.cached_statements)
+        try:
+            self.profile.apply(conn)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+# Репозитории, созданные для одного файла БД, получают один общий пул
+def get_pool(db_path: str) -> ConnectionPool:
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[db_path] = pool
+        return pool
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
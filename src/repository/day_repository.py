@@ -1,83 +1,81 @@
 import sqlite3
 from .. import entities
+from .connection_pool import get_pool
+from typing import List
 from ..errors import MultipleActiveDaysException, DuplicateDayException
 
 
+# Колонки выбираются строго в порядке: id, year, season, number, active
+def day_row_factory(cursor: sqlite3.Cursor, row: tuple) -> entities.Day:
+    return entities.Day(row[1], row[2], row[3], bool(row[4]), row[0])
+
+
+def _is_active_day_conflict(exc: sqlite3.IntegrityError) -> bool:
+    return 'days.active' in str(exc)
+
+
 class DayRepository:
 
     def __init__(self, connection_string: str):
         self.connection_string = connection_string
+        self.pool = get_pool(connection_string)
+
+    def transaction(self):
+        return self.pool.transaction()
 
     def insert(self, day: entities.Day):
-        with sqlite3.connect(self.connection_string) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             insert_sql = """
-                         INSERT INTO days (year, season, number, active)
-                         VALUES (?, ?, ?, ?);
+                         INSERT INTO days (year, season, number, active, ordinal)
+                         VALUES (?, ?, ?, ?, ?);
                          """
-            data = (day.year, day.season, day.number, day.active)
+            data = (day.year, day.season, day.number, day.active, day.ordinal)
             try:
                 cursor.execute(insert_sql, data)
-                conn.commit()
                 day.id = cursor.lastrowid
                 return day
-            except sqlite3.IntegrityError:
+            except sqlite3.IntegrityError as exc:
+                if _is_active_day_conflict(exc):
+                    raise MultipleActiveDaysException(message='Multiple active days')
                 raise DuplicateDayException(
                     f'Day with "{day.year}", "{day.season}", "{day.number}" already exists'
                 )
 
 
+    # Второй активный день запрещен уникальным частичным индексом days_single_active_uindex,
+    # поэтому активный день находится одним обращением к индексу
     def get_active(self) -> entities.Day | None:
-        with sqlite3.connect(self.connection_string) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = day_row_factory
             select_active_day_sql = """
-                                    SELECT *
+                                    SELECT id, year, season, number, active
                                     FROM days
                                     WHERE active = 1; \
                                     """
             cursor.execute(select_active_day_sql)
-            day_data = cursor.fetchall()
-            if not day_data:
-                return None
-            if len(day_data) > 1:
-                raise MultipleActiveDaysException(message='Multiple active days')
-            return entities.Day(
-                day_id=day_data[0]['id'],
-                year=day_data[0]['year'],
-                season=day_data[0]['season'],
-                number=day_data[0]['number'],
-                active=bool(day_data[0]['active'])
-            )
+            return cursor.fetchone()
 
     def get_by_id(self, day_id: int) -> entities.Day | None:
-        with sqlite3.connect(self.connection_string) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = day_row_factory
             select_day_by_id_sql = """
-                                   SELECT *
+                                   SELECT id, year, season, number, active
                                    FROM days
                                    WHERE id = ?; \
                                    """
             data = (day_id,)
             cursor.execute(select_day_by_id_sql, data)
-            day_data = cursor.fetchone()
-            if day_data is None:
-                return None
-            return entities.Day(
-                day_id=day_data['id'],
-                year=day_data['year'],
-                season=day_data['season'],
-                number=day_data['number'],
-                active=bool(day_data['active'])
-            )
+            return cursor.fetchone()
 
     def get_by_attributes(self, year: int, season: str, number: int) -> entities.Day | None:
-        with sqlite3.connect(self.connection_string) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = day_row_factory
             select_day_by_attributes_sql = """
-                                           SELECT *
+                                           SELECT id, year, season, number, active
                                            FROM days
                                            WHERE year = ?
                                              AND season = ?
@@ -85,19 +83,51 @@ class DayRepository:
                                            """
             data = (year, season, number)
             cursor.execute(select_day_by_attributes_sql, data)
-            day_data = cursor.fetchone()
-            if day_data is None:
-                return None
-            return entities.Day(
-                day_id=day_data['id'],
-                year=day_data['year'],
-                season=day_data['season'],
-                number=day_data['number'],
-                active=bool(day_data['active'])
-            )
+            return cursor.fetchone()
+
+    def get_by_ordinal(self, ordinal: int) -> entities.Day | None:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = day_row_factory
+            select_day_by_ordinal_sql = """
+                                        SELECT id, year, season, number, active
+                                        FROM days
+                                        WHERE ordinal = ?; \
+                                        """
+            cursor.execute(select_day_by_ordinal_sql, (ordinal,))
+            return cursor.fetchone()
+
+    # Созданные дни в диапазоне порядковых номеров, включая границы, в календарном порядке
+    def get_by_ordinal_range(self, first_ordinal: int, last_ordinal: int) -> List[entities.Day]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = day_row_factory
+            select_days_in_range_sql = """
+                                       SELECT id, year, season, number, active
+                                       FROM days
+                                       WHERE ordinal BETWEEN ? AND ?
+                                       ORDER BY ordinal; \
+                                       """
+            cursor.execute(select_days_in_range_sql, (first_ordinal, last_ordinal))
+            return cursor.fetchall()
+
+    # Дни, в которые ежедневная задача была отмечена выполненной, в календарном порядке
+    def get_completion_days(self, task_id: int) -> List[entities.Day]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = day_row_factory
+            select_completion_days_sql = """
+                                         SELECT days.id, days.year, days.season, days.number, days.active
+                                         FROM task_completions
+                                                  JOIN days ON days.id = task_completions.day_id
+                                         WHERE task_completions.task_id = ?
+                                         ORDER BY days.ordinal; \
+                                         """
+            cursor.execute(select_completion_days_sql, (task_id,))
+            return cursor.fetchall()
 
     def set_activity(self, day_id: int, active: bool):
-        with sqlite3.connect(self.connection_string) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             update_day_active_sql = """
                                     UPDATE days
@@ -105,5 +135,9 @@ class DayRepository:
                                     WHERE id = ?; \
                                     """
             data = (active, day_id)
-            cursor.execute(update_day_active_sql, data)
-            conn.commit()
+            try:
+                cursor.execute(update_day_active_sql, data)
+            except sqlite3.IntegrityError as exc:
+                if _is_active_day_conflict(exc):
+                    raise MultipleActiveDaysException(message='Multiple active days')
+                raise
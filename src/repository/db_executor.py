@@ -0,0 +1,42 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from .. import config
+from .group_commit import GroupCommitWriter
+
+T = TypeVar('T')
+
+
+# Отдельные потоки для работы с БД: асинхронные обработчики ждут результат, не занимая цикл событий.
+# Вызов целиком (например, метод сервиса) выполняется в одном потоке, поэтому единица работы пула соединений,
+# привязанная к потоку, не разрывается между потоками. Потоков не больше, чем соединений в пуле
+class DbExecutor:
+    def __init__(self, size: int = config.DB_POOL_SIZE):
+        if size <= 0:
+            raise ValueError(f'Executor size must be a positive integer, but got {size}')
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='db')
+        self.writer: GroupCommitWriter | None = None
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    # Вызов, изменяющий данные. С подключенным потоком записи выполняется в нем с групповой фиксацией,
+    # без него - как обычный вызов run
+    async def write(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        writer = self.writer
+        if writer is None:
+            return await self.run(fn, *args, **kwargs)
+        return await asyncio.wrap_future(writer.submit(fn, *args, **kwargs))
+
+    def set_writer(self, writer: GroupCommitWriter | None):
+        self.writer = writer
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        if self.writer is not None:
+            self.writer.stop()
+
@@ -0,0 +1,105 @@
+import sqlite3
+from .. import entities
+from .connection_pool import get_pool
+from typing import List
+from ..errors import DuplicateEquipmentNameException
+
+
+# Колонки выбираются строго в порядке: id, name, kind, ready_ordinal
+def equipment_row_factory(cursor: sqlite3.Cursor, row: tuple) -> entities.Equipment:
+    return entities.Equipment(row[1], row[2], row[3], row[0])
+
+
+class EquipmentRepository:
+    def __init__(self, connection_string: str):
+        self.connection_string = connection_string
+        self.pool = get_pool(connection_string)
+
+    def transaction(self):
+        return self.pool.transaction()
+
+    def insert(self, equipment: entities.Equipment):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            insert_equipment_sql = """
+                                   INSERT INTO equipment (name, kind, ready_ordinal)
+                                   VALUES (?, ?, ?);
+                                   """
+            data = (equipment.name, equipment.kind, equipment.ready_ordinal)
+            try:
+                cursor.execute(insert_equipment_sql, data)
+                equipment.id = cursor.lastrowid
+                return equipment
+            except sqlite3.IntegrityError:
+                raise DuplicateEquipmentNameException(
+                    f'Equipment with name "{equipment.name}" already exists'
+                )
+
+    def get_by_id(self, equipment_id: int) -> entities.Equipment | None:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = equipment_row_factory
+            select_equipment_by_id_sql = """
+                                         SELECT id, name, kind, ready_ordinal
+                                         FROM equipment
+                                         WHERE id = ?; \
+                                         """
+            cursor.execute(select_equipment_by_id_sql, (equipment_id,))
+            return cursor.fetchone()
+
+    def get_all(self) -> List[entities.Equipment]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = equipment_row_factory
+            select_all_equipment_sql = """
+                                       SELECT id, name, kind, ready_ordinal
+                                       FROM equipment
+                                       ORDER BY id; \
+                                       """
+            cursor.execute(select_all_equipment_sql)
+            return cursor.fetchall()
+
+    # Готовое к сбору оборудование: один диапазонный запрос по индексу дня готовности, раньше готовое - первым
+    def get_ready(self, ordinal: int) -> List[entities.Equipment]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = equipment_row_factory
+            select_ready_equipment_sql = """
+                                         SELECT id, name, kind, ready_ordinal
+                                         FROM equipment
+                                         WHERE ready_ordinal <= ?
+                                         ORDER BY ready_ordinal, id; \
+                                         """
+            cursor.execute(select_ready_equipment_sql, (ordinal,))
+            return cursor.fetchall()
+
+    # Условные переходы, как у задач: одно UPDATE с проверкой состояния в WHERE, None - если условие не выполнено
+    def start(self, equipment_id: int, ready_ordinal: int) -> entities.Equipment | None:
+        start_equipment_sql = """
+                              UPDATE equipment
+                              SET ready_ordinal = ?
+                              WHERE id = ?
+                                AND ready_ordinal IS NULL
+                              RETURNING id, name, kind, ready_ordinal; \
+                              """
+        return self._update_returning_equipment(start_equipment_sql, (ready_ordinal, equipment_id))
+
+    def collect(self, equipment_id: int, ordinal: int) -> entities.Equipment | None:
+        collect_equipment_sql = """
+                                UPDATE equipment
+                                SET ready_ordinal = NULL
+                                WHERE id = ?
+                                  AND ready_ordinal <= ?
+                                RETURNING id, name, kind, ready_ordinal; \
+                                """
+        return self._update_returning_equipment(collect_equipment_sql, (equipment_id, ordinal))
+
+    def _update_returning_equipment(self, update_sql: str, data: tuple) -> entities.Equipment | None:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = equipment_row_factory
+            cursor.execute(update_sql, data)
+            equipment = cursor.fetchall()
+            if not equipment:
+                return None
+            return equipment[0]
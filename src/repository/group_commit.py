@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+from .. import config
+from .connection_pool import ConnectionPool
+
+_STOP = object()
+
+
+class _WriteJob:
+    __slots__ = ('fn', 'args', 'kwargs', 'future')
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+# Единственный поток записи: забирает вызовы из очереди и выполняет их группами в одной транзакции.
+# Группа набирается, пока в ней меньше max_batch_size вызовов и не прошло window секунд с первого вызова.
+# Каждый вызов выполняется в своей точке сохранения: ошибка откатывает только его изменения, остальные вызовы
+# группы фиксируются одним COMMIT. Результат или исключение вызова передается вызывающему только после фиксации.
+# on_group_start вызывается в потоке записи перед каждой группой, on_group_done - после фиксации группы, в которой
+# хотя бы один вызов выполнен успешно, и до передачи результатов. Группа без успешных вызовов ничего не меняет,
+# поэтому для нее on_group_done не вызывается
+class GroupCommitWriter:
+    def __init__(self, pool: ConnectionPool, max_batch_size: int = config.DB_GROUP_COMMIT_MAX_BATCH_SIZE,
+                 window: float = config.DB_GROUP_COMMIT_WINDOW, on_group_start: Callable[[], None] | None = None,
+                 on_group_done: Callable[[], None] | None = None):
+        if max_batch_size <= 0:
+            raise ValueError(f'Batch size must be a positive integer, but got {max_batch_size}')
+        if window < 0:
+            raise ValueError(f'Window must be a non-negative number of seconds, but got {window}')
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.on_group_start = on_group_start
+        self.on_group_done = on_group_done
+        self._jobs = queue.Queue()
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        job = _WriteJob(fn, args, kwargs)
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError('Writer is stopped')
+            self._jobs.put(job)
+        return job.future
+
+    # Вызовы, поставленные до остановки, выполняются
+    def stop(self):
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._jobs.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._jobs.get()
+            if job is _STOP:
+                break
+            batch = [job]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                try:
+                    job = self._jobs.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._execute_batch(batch)
+
+    def _execute_batch(self, batch: List[_WriteJob]):
+        results: List[Tuple[_WriteJob, object, BaseException | None]] = []
+        try:
+            if self.on_group_start is not None:
+                self.on_group_start()
+            with self.pool.transaction() as conn:
+                for job in batch:
+                    if not job.future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute('SAVEPOINT group_commit_job')
+                    try:
+                        result = job.fn(*job.args, **job.kwargs)
+                    except Exception as exc:
+                        conn.execute('ROLLBACK TO group_commit_job')
+                        conn.execute('RELEASE group_commit_job')
+                        results.append((job, None, exc))
+                    else:
+                        conn.execute('RELEASE group_commit_job')
+                        results.append((job, result, None))
+        except Exception as exc:
+            # Группа не зафиксирована: ни один вызов не сохранил изменений
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            return
+
+        if self.on_group_done is not None and any(exc is None for _, _, exc in results):
+            self.on_group_done()
+        for job, result, exc in results:
+            if exc is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(exc)
@@ -0,0 +1,76 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict
+
+from .. import config
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    journal_mode: str
+    synchronous: str
+    mmap_size: int
+    cache_size: int
+    temp_store: str
+    busy_timeout: int
+
+    journal_modes = ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY')
+    synchronous_levels = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+    temp_stores = ('DEFAULT', 'FILE', 'MEMORY')
+
+    def __post_init__(self):
+        # PRAGMA не поддерживает параметры запроса, поэтому значения проверяются до подстановки в SQL
+        if self.journal_mode not in self.journal_modes:
+            raise ValueError(f'Journal mode must be one of {self.journal_modes}, but got "{self.journal_mode}"')
+        if self.synchronous not in self.synchronous_levels:
+            raise ValueError(f'Synchronous must be one of {self.synchronous_levels}, but got "{self.synchronous}"')
+        if self.temp_store not in self.temp_stores:
+            raise ValueError(f'Temp store must be one of {self.temp_stores}, but got "{self.temp_store}"')
+        for name in ('mmap_size', 'cache_size', 'busy_timeout'):
+            if not isinstance(getattr(self, name), int):
+                raise ValueError(f'{name} must be an integer, but got {getattr(self, name)!r}')
+
+    def apply(self, conn: sqlite3.Connection):
+        conn.execute(f'PRAGMA busy_timeout = {self.busy_timeout}')
+        conn.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+        conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        conn.execute(f'PRAGMA mmap_size = {self.mmap_size}')
+        conn.execute(f'PRAGMA cache_size = {self.cache_size}')
+        conn.execute(f'PRAGMA temp_store = {self.temp_store}')
+
+
+# cache_size с минусом задается в килобайтах, mmap_size - в байтах
+storage_profiles: Dict[str, StorageProfile] = {
+    'durable': StorageProfile(
+        journal_mode='WAL',
+        synchronous='FULL',
+        mmap_size=0,
+        cache_size=-2000,
+        temp_store='DEFAULT',
+        busy_timeout=5000,
+    ),
+    'balanced': StorageProfile(
+        journal_mode='WAL',
+        synchronous='NORMAL',
+        mmap_size=64 * 1024 * 1024,
+        cache_size=-16000,
+        temp_store='MEMORY',
+        busy_timeout=5000,
+    ),
+    # synchronous = OFF: при сбое ОС можно потерять последние транзакции
+    'throughput': StorageProfile(
+        journal_mode='WAL',
+        synchronous='OFF',
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64000,
+        temp_store='MEMORY',
+        busy_timeout=10000,
+    ),
+}
+
+
+def get_storage_profile(name: str = config.DB_STORAGE_PROFILE) -> StorageProfile:
+    profile = storage_profiles.get(name)
+    if profile is None:
+        raise ValueError(f'Storage profile must be one of {list(storage_profiles)}, but got "{name}"')
+    return profile
@@ -1,133 +1,363 @@
+import json
 import sqlite3
 from .. import entities
-from typing import List
+from .connection_pool import get_pool
+from typing import Iterator, List
 from ..errors import DuplicateTaskNameException
 
 
+# Строит задачу по позициям колонок без промежуточного sqlite3.Row.
+# Запросы с этой фабрикой выбирают колонки строго в порядке: id, name, day_id, type, status, duration, due_ordinal
+def task_row_factory(cursor: sqlite3.Cursor, row: tuple) -> entities.Task:
+    return entities.Task(row[1], row[2], row[3], row[4], row[0], row[5], row[6])
+
+
+# Последний день однодневной задачи считается от порядкового номера ее дня. У ежедневных и бессрочных задач его нет
+_insert_task_sql = """
+                   INSERT INTO tasks (name, day_id, type, status, duration, due_ordinal)
+                   VALUES (:name, :day_id, :type, :status, :duration,
+                           CASE
+                               WHEN :type = 'one-time'
+                                   THEN (SELECT ordinal FROM days WHERE id = :day_id) + :duration - 1
+                               END)
+                   """
+
+
+# Активная однодневная задача показывается во всех днях от своего дня (day_id) до последнего (due_ordinal)
+# включительно, бессрочная - во всех днях начиная со своего. day_id при переходе дня не меняется
+_one_time_task_in_day_sql = """
+                            tasks.type = 'one-time'
+                            AND tasks.status = 'active'
+                            AND (tasks.due_ordinal >= (SELECT ordinal FROM days WHERE id = :day_id)
+                                OR tasks.due_ordinal IS NULL)
+                            AND (SELECT ordinal FROM days WHERE id = tasks.day_id)
+                                <= (SELECT ordinal FROM days WHERE id = :day_id)
+                            """
+
+
+def _task_insert_data(task: entities.Task) -> dict:
+    return {'name': task.name, 'day_id': task.day_id, 'type': task.type, 'status': task.status,
+            'duration': task.duration}
+
+
 class TaskRepository:
     def __init__(self, connection_string: str):
         self.connection_string = connection_string
+        self.pool = get_pool(connection_string)
+
+    def transaction(self):
+        return self.pool.transaction()
 
     def insert(self, task: entities.Task):
-        with sqlite3.connect(self.connection_string) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            insert_task_sql = """
-                              INSERT INTO tasks (name, day_id, type, status)
-                              VALUES (?, ?, ?, ?);
-                              """
-            data = (task.name, task.day_id, task.type, task.status)
+            insert_task_sql = _insert_task_sql + 'RETURNING id, due_ordinal; '
             try:
-                cursor.execute(insert_task_sql, data)
-                conn.commit()
-                task.id = cursor.lastrowid
+                cursor.execute(insert_task_sql, _task_insert_data(task))
+                task.id, task.due_ordinal = cursor.fetchall()[0]
                 return task
             except sqlite3.IntegrityError:
                 raise DuplicateTaskNameException(
                     f'Task with name "{task.name}" already exists'
                 )
 
+    # Вставка пачкой: повторяющиеся имена пропускаются по уникальному индексу, не прерывая вставку остальных.
+    # Возвращает созданную задачу или None для каждой переданной задачи в том же порядке
+    def insert_many(self, tasks: List[entities.Task]) -> List[entities.Task | None]:
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
+            select_max_id_sql = """
+                                SELECT COALESCE(MAX(id), 0)
+                                FROM tasks; \
+                                """
+            insert_task_sql = _insert_task_sql + 'ON CONFLICT (name) DO NOTHING; '
+            select_inserted_tasks_sql = """
+                                        SELECT id, name, day_id, type, status, duration, due_ordinal
+                                        FROM tasks
+                                        WHERE id > ?; \
+                                        """
+            # Под блокировкой записи новые строки могут появиться только из этой вставки, и их id больше прежнего максимума
+            cursor.execute(select_max_id_sql)
+            max_id = cursor.fetchone()[0]
+            cursor.executemany(insert_task_sql, [_task_insert_data(task) for task in tasks])
+            cursor.row_factory = task_row_factory
+            cursor.execute(select_inserted_tasks_sql, (max_id,))
+            inserted_tasks = {task.name: task for task in cursor.fetchall()}
+            # Из нескольких задач с одинаковым именем создается только первая
+            return [inserted_tasks.pop(task.name, None) for task in tasks]
+
     def get_all_by_day_id(self, day_id: int) -> List[entities.Task]:
-        with sqlite3.connect(self.connection_string) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
             select_tasks_for_day_sql = """
-                                       SELECT *
+                                       SELECT id, name, day_id, type, status, duration, due_ordinal
                                        FROM tasks
                                        WHERE day_id = ?
                                        ORDER BY id; \
                                        """
             data = (day_id,)
             cursor.execute(select_tasks_for_day_sql, data)
-            tasks_data = cursor.fetchall()
-            tasks = []
-            for task_data in tasks_data:
-                tasks.append(entities.Task(
-                    task_id=task_data['id'],
-                    name=task_data['name'],
-                    day_id=task_data['day_id'],
-                    type=task_data['type'],
-                    status=task_data['status']
-                ))
-            return tasks
+            return cursor.fetchall()
+
+    # Активные задачи дня: однодневные задачи, срок которых включает этот день, и все активные ежедневные задачи.
+    # Ежедневная задача не хранит день, в котором показывается, поэтому ее day_id подставляется из запроса
+    def get_active_by_day_id(self, day_id: int) -> List[entities.Task]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
+            select_active_tasks_for_day_sql = f"""
+                                              SELECT id, name, day_id, type, status, duration, due_ordinal
+                                              FROM tasks
+                                              WHERE {_one_time_task_in_day_sql}
+                                              UNION ALL
+                                              SELECT id, name, :day_id, type, status, duration, due_ordinal
+                                              FROM tasks
+                                              WHERE type = 'daily'
+                                                AND status = 'active'
+                                              ORDER BY id; \
+                                              """
+            data = {'day_id': day_id}
+            cursor.execute(select_active_tasks_for_day_sql, data)
+            return cursor.fetchall()
 
     def get_by_id(self, task_id: int) -> entities.Task | None:
-        with sqlite3.connect(self.connection_string) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
             select_task_by_id_sql = """
-                                    SELECT *
+                                    SELECT id, name, day_id, type, status, duration, due_ordinal
                                     FROM tasks
                                     WHERE id = ?; \
                                     """
             data = (task_id,)
             cursor.execute(select_task_by_id_sql, data)
-            task_data = cursor.fetchone()
-            if task_data is None:
-                return None
-            return entities.Task(
-                task_id=task_data['id'],
-                name=task_data['name'],
-                type=task_data['type'],
-                status=task_data['status'],
-                day_id=task_data['day_id']
-            )
+            return cursor.fetchone()
 
-    def get_all_completed(self)-> List[entities.Task]:
-        with sqlite3.connect(self.connection_string) as conn:
-            conn.row_factory = sqlite3.Row
+    # Список id передается одним JSON-параметром: запрос не зависит от числа id и не упирается в лимит параметров
+    def get_by_ids(self, task_ids: List[int]) -> List[entities.Task]:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
+            select_tasks_by_ids_sql = """
+                                      SELECT id, name, day_id, type, status, duration, due_ordinal
+                                      FROM tasks
+                                      WHERE id IN (SELECT value FROM json_each(?))
+                                      ORDER BY id; \
+                                      """
+            cursor.execute(select_tasks_by_ids_sql, (json.dumps(task_ids),))
+            return cursor.fetchall()
+
+    def get_completed_page(self, after_id: int | None, limit: int) -> List[entities.Task]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
+            select_completed_tasks_page_sql = """
+                                              SELECT id, name, day_id, type, status, duration, due_ordinal
+                                              FROM tasks
+                                              WHERE status = 'completed'
+                                                AND id > ?
+                                              ORDER BY id
+                                              LIMIT ?; \
+                                              """
+            data = (after_id or 0, limit)
+            cursor.execute(select_completed_tasks_page_sql, data)
+            return cursor.fetchall()
+
+    # Читает завершенные задачи серверным курсором, в памяти одновременно находится не больше batch_size задач
+    def iter_completed_batches(self, batch_size: int) -> Iterator[List[entities.Task]]:
+        with self.pool.detached_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
             select_all_completed_tasks_sql = """
-                                       SELECT *
-                                       FROM tasks
-                                       WHERE status = 'completed'; \
-                                       """
-            cursor.execute(select_all_completed_tasks_sql)
-            tasks_data = cursor.fetchall()
-            tasks = []
-            for task_data in tasks_data:
-                tasks.append(entities.Task(
-                    task_id=task_data['id'],
-                    name=task_data['name'],
-                    day_id=task_data['day_id'],
-                    type=task_data['type'],
-                    status=task_data['status']
-                ))
-            return tasks
-
-    def update_field(self, task_id: int, field_name: str, new_value):
-        allowed_fields = ['name', 'status', 'type', 'day_id']
-        if field_name not in allowed_fields:
-            raise ValueError(f'Field "{field_name}" cannot be modified')
-
-        with sqlite3.connect(self.connection_string) as conn:
-            conn.row_factory = sqlite3.Row
+                                             SELECT id, name, day_id, type, status, duration, due_ordinal
+                                             FROM tasks
+                                             WHERE status = 'completed'
+                                             ORDER BY id; \
+                                             """
+            try:
+                cursor.execute(select_all_completed_tasks_sql)
+                while True:
+                    tasks = cursor.fetchmany(batch_size)
+                    if not tasks:
+                        break
+                    yield tasks
+            finally:
+                cursor.close()
+
+    def count_completed(self) -> int:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            update_task_field_sql = f"""
-                UPDATE tasks
-                SET {field_name} = ?
-                WHERE id = ?;
-            """
-            data = (new_value, task_id)
-            cursor.execute(update_task_field_sql, data)
-            conn.commit()
+            count_completed_tasks_sql = """
+                                        SELECT COUNT(*)
+                                        FROM tasks
+                                        WHERE status = 'completed'; \
+                                        """
+            cursor.execute(count_completed_tasks_sql)
+            return cursor.fetchone()[0]
 
-    def make_completed(self, task_id: int):
-        self.update_field(task_id, 'status', 'completed')
+    # Переход дня: завершаются однодневные задачи, срок которых истек. Остальные задачи не меняются: день задачи
+    # не переносится, она показывается в днях своего срока. Истекающие задачи находятся по частичному индексу
+    # due_ordinal активных однодневных задач, поэтому стоимость перехода зависит только от числа истекающих задач
+    def roll_over_tasks(self, expire_before_ordinal: int):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            complete_expired_tasks_sql = """
+                                         UPDATE tasks
+                                         SET status = 'completed'
+                                         WHERE status = 'active'
+                                           AND type = 'one-time'
+                                           AND due_ordinal < ?; \
+                                         """
+            cursor.execute(complete_expired_tasks_sql, (expire_before_ordinal,))
 
-    def make_active(self, task_id: int, task_day_id: int):
-        self.update_field(task_id, 'status', 'active') # TODO: make it one database query
-        self.update_field(task_id, 'day_id', task_day_id)
+    # Условные переходы состояния: одно UPDATE с проверкой условий в WHERE.
+    # Возвращают измененную задачу или None, если задача не найдена или условия не выполнены
+    def complete_in_day(self, task_id: int, day_id: int) -> entities.Task | None:
+        complete_task_sql = f"""
+                            UPDATE tasks
+                            SET status = 'completed'
+                            WHERE id = :task_id
+                              AND {_one_time_task_in_day_sql}
+                            RETURNING id, name, day_id, type, status, duration, due_ordinal; \
+                            """
+        return self._update_returning_task(complete_task_sql, {'task_id': task_id, 'day_id': day_id})
 
-    def make_daily(self, task_id: int):
-        self.update_field(task_id, 'type', 'daily')
+    def complete_many_in_day(self, task_ids: List[int], day_id: int) -> List[entities.Task]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
+            complete_tasks_sql = f"""
+                                 UPDATE tasks
+                                 SET status = 'completed'
+                                 WHERE id IN (SELECT value FROM json_each(:task_ids))
+                                   AND {_one_time_task_in_day_sql}
+                                 RETURNING id, name, day_id, type, status, duration, due_ordinal; \
+                                 """
+            cursor.execute(complete_tasks_sql, {'task_ids': json.dumps(task_ids), 'day_id': day_id})
+            return cursor.fetchall()
 
-    def make_one_time(self, task_id: int):
-        self.update_field(task_id, 'type', 'one-time')
+    def activate_in_day(self, task_id: int, day_id: int) -> entities.Task | None:
+        activate_task_sql = f"""
+                            UPDATE tasks
+                            SET status = 'active',
+                                day_id = :day_id,
+                                due_ordinal = CASE
+                                                  WHEN type = 'one-time'
+                                                      THEN (SELECT ordinal FROM days WHERE id = :day_id) + duration - 1
+                                              END
+                            WHERE id = :task_id
+                              AND NOT (type = 'daily' AND status = 'active')
+                              AND NOT ({_one_time_task_in_day_sql})
+                            RETURNING id, name, day_id, type, status, duration, due_ordinal; \
+                            """
+        return self._update_returning_task(activate_task_sql, {'task_id': task_id, 'day_id': day_id})
 
-    def edit_name(self, task_id: int, new_name: str):
+    def make_daily_in_day(self, task_id: int, day_id: int) -> entities.Task | None:
+        make_task_daily_sql = f"""
+                              UPDATE tasks
+                              SET type = 'daily',
+                                  due_ordinal = NULL
+                              WHERE id = :task_id
+                                AND {_one_time_task_in_day_sql}
+                              RETURNING id, name, day_id, type, status, duration, due_ordinal; \
+                              """
+        return self._update_returning_task(make_task_daily_sql, {'task_id': task_id, 'day_id': day_id})
+
+    def make_one_time_in_day(self, task_id: int, day_id: int) -> entities.Task | None:
+        make_task_one_time_sql = """
+                                 UPDATE tasks
+                                 SET type = 'one-time',
+                                     day_id = :day_id,
+                                     due_ordinal = (SELECT ordinal FROM days WHERE id = :day_id) + duration - 1
+                                 WHERE id = :task_id
+                                   AND type = 'daily'
+                                   AND status = 'active'
+                                 RETURNING id, name, day_id, type, status, duration, due_ordinal; \
+                                 """
+        return self._update_returning_task(make_task_one_time_sql, {'task_id': task_id, 'day_id': day_id})
+
+    # Срок однодневной задачи отсчитывается заново от переданного дня, он становится днем задачи:
+    # duration = 1 - только этот день, None - бессрочно
+    def set_duration_in_day(self, task_id: int, day_id: int, duration: int | None) -> entities.Task | None:
+        set_task_duration_sql = f"""
+                                UPDATE tasks
+                                SET duration = :duration,
+                                    day_id = :day_id,
+                                    due_ordinal = (SELECT ordinal FROM days WHERE id = :day_id) + :duration - 1
+                                WHERE id = :task_id
+                                  AND {_one_time_task_in_day_sql}
+                                RETURNING id, name, day_id, type, status, duration, due_ordinal; \
+                                """
+        return self._update_returning_task(set_task_duration_sql,
+                                           {'task_id': task_id, 'day_id': day_id, 'duration': duration})
+
+    # Ежедневная задача относится к любому дню, в ответе она, как и в списке задач дня, показывается в текущем дне.
+    # У однодневной задачи день не меняется: от него отсчитывается ее срок
+    def rename_in_day(self, task_id: int, day_id: int, new_name: str) -> entities.Task | None:
+        rename_task_sql = f"""
+                          UPDATE tasks
+                          SET name = :name,
+                              day_id = CASE WHEN type = 'daily' THEN :day_id ELSE day_id END
+                          WHERE id = :task_id
+                            AND ((type = 'daily' AND status = 'active') OR ({_one_time_task_in_day_sql}))
+                          RETURNING id, name, day_id, type, status, duration, due_ordinal; \
+                          """
         try:
-            self.update_field(task_id, 'name', new_name)
+            return self._update_returning_task(rename_task_sql, {'name': new_name, 'task_id': task_id, 'day_id': day_id})
         except sqlite3.IntegrityError:
             raise DuplicateTaskNameException(
                 f'Task with name "{new_name}" already exists'
-                )
+            )
+
+    # Отметка о выполнении ежедневной задачи в день. Возвращает False, если задача не активная ежедневная
+    # или уже отмечена в этот день
+    def add_daily_completion(self, task_id: int, day_id: int) -> bool:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            add_completion_sql = """
+                                 INSERT INTO task_completions (task_id, day_id)
+                                 SELECT id, ?
+                                 FROM tasks
+                                 WHERE id = ?
+                                   AND type = 'daily'
+                                   AND status = 'active'
+                                 ON CONFLICT (task_id, day_id) DO NOTHING; \
+                                 """
+            cursor.execute(add_completion_sql, (day_id, task_id))
+            return cursor.rowcount == 1
+
+    def remove_daily_completion(self, task_id: int, day_id: int) -> bool:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            remove_completion_sql = """
+                                    DELETE
+                                    FROM task_completions
+                                    WHERE task_id = ?
+                                      AND day_id = ?; \
+                                    """
+            cursor.execute(remove_completion_sql, (task_id, day_id))
+            return cursor.rowcount == 1
+
+    def get_completed_daily_ids(self, day_id: int) -> List[int]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            select_completed_daily_ids_sql = """
+                                             SELECT task_id
+                                             FROM task_completions
+                                             WHERE day_id = ?
+                                             ORDER BY task_id; \
+                                             """
+            cursor.execute(select_completed_daily_ids_sql, (day_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def _update_returning_task(self, update_sql: str, data: tuple | dict) -> entities.Task | None:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = task_row_factory
+            cursor.execute(update_sql, data)
+            # RETURNING нужно дочитать до конца до фиксации транзакции
+            tasks = cursor.fetchall()
+            if not tasks:
+                return None
+            return tasks[0]
@@ -1,2 +1,6 @@
+from .state_version import *
 from .day_service import *
-from .task_service import *
\ No newline at end of file
+from .task_service import *
+from .equipment_service import *
+from .change_log_service import *
+from .state_broadcaster import *
\ No newline at end of file
@@ -0,0 +1,19 @@
+from src import repository, entities
+from typing import List, Tuple
+
+
+class ChangeLogService:
+    def __init__(self, change_log_repository: repository.ChangeLogRepository):
+        self.change_log_repository = change_log_repository
+
+    # Изменения после курсора cursor (seq последнего примененного изменения). Курсор следующей страницы -
+    # seq последнего изменения на странице, без изменений курсор не меняется. Второе значение - есть ли еще изменения
+    def get_changes(self, cursor: int, limit: int) -> Tuple[List[entities.Change], int, bool]:
+        changes = self.change_log_repository.get_since(cursor, limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        next_cursor = changes[-1].seq if changes else cursor
+        return changes, next_cursor, has_more
+
+    def get_last_seq(self) -> int:
+        return self.change_log_repository.get_last_seq()
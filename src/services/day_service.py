@@ -1,23 +1,73 @@
-from src import repository, entities, errors
+import threading
+
+from src import repository, entities, errors, game_calendar
+from .state_version import StateVersion
 
 
 class DayService:
-    seasons = ['spring', 'summer', 'autumn', 'winter']
-    max_day_per_season = 28
+    seasons = game_calendar.SEASONS
+    max_day_per_season = game_calendar.DAYS_PER_SEASON
 
-    def __init__(self, day_repository: repository.DayRepository, task_repository: repository.TaskRepository):
+    def __init__(self, day_repository: repository.DayRepository, task_repository: repository.TaskRepository,
+                 state_version: StateVersion | None = None):
         self.day_repository = day_repository
         self.task_repository = task_repository
+        self.state_version = state_version or StateVersion()
+        # Активный день меняется только в _change_active_day, поэтому кэшируется в памяти и обновляется
+        # после фиксации перехода. Поколение не дает сохранить в кэш день, прочитанный до перехода
+        self._active_day: entities.Day | None = None
+        self._active_day_generation = 0
+        self._active_day_lock = threading.Lock()
 
     def get_active(self):
+        # Внутри группы записей день может быть изменен незафиксированным вызовом, поэтому читается из БД
+        if self.state_version.is_deferred():
+            return self._get_active_from_db()
+        active_day = self._active_day
+        if active_day is not None:
+            return active_day
+
+        generation = self._active_day_generation
+        active_day = self._get_active_from_db()
+        with self._active_day_lock:
+            if generation == self._active_day_generation and self._active_day is None:
+                self._active_day = active_day
+        return active_day
+
+    def _get_active_from_db(self):
         active_day = self.day_repository.get_active()
         if active_day is None:
             raise errors.InternalException('No active day')
         return active_day
 
-    def set_current_day(self, year: int, season: str, number: int):
-        previous_active_day = self.get_active()
+    # Сбрасывает кэш активного дня и снимки состояния, например после групповой фиксации,
+    # если они могли быть построены по еще не зафиксированным данным
+    def invalidate_caches(self):
+        self._set_cached_active_day(None)
+        self.state_version.bump()
+
+    # Групповая фиксация (GroupCommitWriter): изменения вызовов группы видны другим потокам только после COMMIT.
+    # Внутри группы изменения версии откладываются, а активный день не кэшируется
+    def begin_group(self):
+        self.state_version.defer_bumps()
+
+    # Вызывается только после фиксации группы: если вызовы группы меняли состояние, кэши сбрасываются один раз
+    def finish_group(self):
+        if self.state_version.take_deferred_bumps():
+            self.invalidate_caches()
+
+    def _set_cached_active_day(self, active_day: entities.Day | None):
+        with self._active_day_lock:
+            self._active_day = active_day
+            self._active_day_generation += 1
+
+    def get_by_id(self, day_id: int) -> entities.Day | None:
+        return self.day_repository.get_by_id(day_id)
 
+    def get_completion_days(self, task_id: int):
+        return self.day_repository.get_completion_days(task_id)
+
+    def set_current_day(self, year: int, season: str, number: int):
         if not isinstance(year, int) or year <= 0:
             raise errors.InvalidDayError(f'Year must be a positive integer, but got {year}')
         if season not in self.seasons:
@@ -25,35 +75,45 @@ class DayService:
         if not isinstance(number, int) or not (1 <= number <= self.max_day_per_season):
             raise errors.InvalidDayError(f'Day number must be an integer between 1 and {self.max_day_per_season}, but got {number}')
 
-        self._change_active_day(previous_active_day, year, season, number)
+        return self._switch_active_day(lambda previous_active_day: (year, season, number))
 
     def set_next_day(self):
-        previous_active_day = self.get_active()
-
-        next_day_year = previous_active_day.year
-        next_day_season = previous_active_day.season
-        next_day_number = previous_active_day.number + 1
-
-        if next_day_number > self.max_day_per_season:
-            next_day_number = 1
-            next_day_season_index = self.seasons.index(next_day_season)
-            if next_day_season_index == len(self.seasons) - 1:
-                next_day_season = self.seasons[0]
-                next_day_year += 1
-            else:
-                next_day_season = self.seasons[next_day_season_index + 1]
-
-        self._change_active_day(previous_active_day, next_day_year, next_day_season, next_day_number)
+        return self.advance_days(1)
+
+    # Переход сразу на N дней вперед: промежуточные дни не создаются, задачи переносятся один раз на итоговый день
+    def advance_days(self, days: int):
+        if not isinstance(days, int) or days <= 0:
+            raise errors.InvalidDayError(f'Number of days must be a positive integer, but got {days}')
+
+        return self._switch_active_day(
+            lambda previous_active_day: self._get_advanced_day_attributes(previous_active_day, days))
+
+    def _get_advanced_day_attributes(self, previous_active_day: entities.Day, days: int):
+        return game_calendar.from_ordinal(previous_active_day.ordinal + days)
+
+    def _switch_active_day(self, get_target_day_attributes):
+        # Переключение дня выполняется одной транзакцией: либо все изменения, либо ни одного.
+        # Активный день читается из БД под блокировкой записи, кэш обновляется только после фиксации
+        try:
+            with self.day_repository.transaction():
+                previous_active_day = self._get_active_from_db()
+                year, season, number = get_target_day_attributes(previous_active_day)
+                new_active_day = self._change_active_day(previous_active_day, year, season, number)
+        except Exception:
+            self._set_cached_active_day(None)
+            raise
+        self._set_cached_active_day(None if self.state_version.is_deferred() else new_active_day)
+        self.state_version.bump()
+        return new_active_day
 
     def _change_active_day(self, previous_active_day: entities.Day, year: int, season: str, number: int):
-        if (previous_active_day.year == year and
-                previous_active_day.season == season and
-                previous_active_day.number == number):
-            return
+        # День ищется по уникальному индексу порядковых номеров
+        new_active_day = self.day_repository.get_by_ordinal(game_calendar.to_ordinal(year, season, number))
 
-        self.day_repository.set_activity(previous_active_day.id, False)
+        if new_active_day is not None and new_active_day.id == previous_active_day.id:
+            return previous_active_day
 
-        new_active_day = self.day_repository.get_by_attributes(year = year, season = season, number = number)
+        self.day_repository.set_activity(previous_active_day.id, False)
 
         if new_active_day is None:
             new_active_day = entities.Day(year = year, season = season, number = number, active=True)
@@ -63,15 +123,12 @@ class DayService:
                 raise
         else:
             self.day_repository.set_activity(new_active_day.id, True)
+            new_active_day.active = True
+
+        # При переходе назад по календарю истекают задачи, срок которых заканчивался в покидаемом дне
+        expire_before_ordinal = max(new_active_day.ordinal, previous_active_day.ordinal + 1)
+        self._expire_tasks(expire_before_ordinal)
+        return new_active_day
 
-        self._move_tasks_to_current_day(previous_active_day.id, new_active_day.id)
-
-    def _move_tasks_to_current_day(self, previous_active_day_id, next_active_day_id):
-        previous_day_tasks = self.task_repository.get_all_by_day_id(previous_active_day_id)
-        for task in previous_day_tasks:
-            if task.type == 'daily':
-                task.day_id = next_active_day_id
-                self.task_repository.update_field(task.id, 'day_id', task.day_id)
-            if task.type == 'one-time' and task.status == 'active':
-                task.status = 'completed'
-                self.task_repository.update_field(task.id, 'status', task.status)
+    def _expire_tasks(self, expire_before_ordinal):
+        self.task_repository.roll_over_tasks(expire_before_ordinal)
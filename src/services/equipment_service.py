@@ -0,0 +1,57 @@
+from src import repository, entities, errors
+from .day_service import DayService
+from typing import List
+
+
+class EquipmentService:
+    kinds = ['tub', 'keg', 'cask', 'preserves_jar']
+
+    def __init__(self, equipment_repository: repository.EquipmentRepository, day_service: DayService):
+        self.equipment_repository = equipment_repository
+        self.day_service = day_service
+
+    def create_equipment(self, name: str, kind: str) -> entities.Equipment:
+        if kind not in self.kinds:
+            raise errors.InvalidEquipmentStateException(f'Equipment kind must be one of {self.kinds}, but got "{kind}"')
+        return self.equipment_repository.insert(entities.Equipment(name=name, kind=kind))
+
+    def get_by_id(self, id: int) -> entities.Equipment:
+        equipment = self.equipment_repository.get_by_id(id)
+        if equipment is None:
+            raise errors.EquipmentNotFoundException(f'Equipment with id {id} not found')
+        return equipment
+
+    def get_all(self) -> List[entities.Equipment]:
+        return self.equipment_repository.get_all()
+
+    def get_ready(self) -> List[entities.Equipment]:
+        return self.equipment_repository.get_ready(self.day_service.get_active().ordinal)
+
+    # Продукт будет готов через days дней от текущего: хранится день готовности, а не оставшееся число дней
+    def start(self, id: int, days: int) -> entities.Equipment:
+        if not isinstance(days, int) or days <= 0:
+            raise errors.InvalidEquipmentStateException(f'Processing days must be a positive integer, but got {days}')
+        current_day = self.day_service.get_active()
+        started_equipment = self.equipment_repository.start(id, current_day.ordinal + days)
+        if started_equipment is None:
+            equipment = self.get_by_id(id)
+            # Продукт успели забрать между UPDATE и повторным чтением: оборудование уже свободно
+            if equipment.ready_ordinal is None:
+                raise errors.InvalidEquipmentStateException(
+                    f'Equipment with ID {equipment.id} was changed by another request. Try again.')
+            raise errors.InvalidEquipmentStateException(
+                f'Equipment with ID {equipment.id} is already in use: '
+                f'{max(equipment.ready_ordinal - current_day.ordinal, 0)} days left')
+        return started_equipment
+
+    def collect(self, id: int) -> entities.Equipment:
+        current_day = self.day_service.get_active()
+        collected_equipment = self.equipment_repository.collect(id, current_day.ordinal)
+        if collected_equipment is None:
+            equipment = self.get_by_id(id)
+            if equipment.ready_ordinal is None:
+                raise errors.InvalidEquipmentStateException(f'Equipment with ID {equipment.id} is empty')
+            raise errors.InvalidEquipmentStateException(
+                f'Equipment with ID {equipment.id} is not ready yet: '
+                f'{equipment.ready_ordinal - current_day.ordinal} days left')
+        return collected_equipment
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import weakref
+
+from src import config, errors
+from .state_version import StateVersion
+
+
+# Подписчик хранит только последнюю версию, о которой еще не узнал клиент: медленный клиент не копит очередь,
+# а при следующей отправке сразу получает самую новую версию. Промежуточные версии ему не нужны, так как событие
+# только сообщает, что состояние изменилось
+class StateSubscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, version: int):
+        self.loop = loop
+        self._version = version
+        self._sent_version: int | None = None
+        self._changed = asyncio.Event()
+        self._changed.set()
+
+    # Вызывается только в цикле событий подписчика
+    def notify(self, version: int):
+        if version > self._version:
+            self._version = version
+        self._changed.set()
+
+    # Ждет версию новее отправленной, без изменений за timeout секунд возвращает None
+    async def next_version(self, timeout: float) -> int | None:
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            self._changed.clear()
+            if self._version != self._sent_version:
+                self._sent_version = self._version
+                return self._version
+
+
+# Рассылает изменения версии состояния всем подписчикам. Версия увеличивается в потоке БД после фиксации записи,
+# подписчику она передается через его цикл событий
+class StateBroadcaster:
+    def __init__(self, state_version: StateVersion, max_subscribers: int = config.STATE_EVENTS_MAX_SUBSCRIBERS):
+        self.state_version = state_version
+        self.max_subscribers = max_subscribers
+        # Подписка, поток событий которой так и не был запущен (клиент отключился раньше), удаляется вместе с ним
+        self._subscribers: weakref.WeakSet[StateSubscriber] = weakref.WeakSet()
+        self._lock = threading.Lock()
+        state_version.add_listener(self._broadcast)
+
+    @property
+    def subscribers_count(self) -> int:
+        return len(self._subscribers)
+
+    # Вызывается из цикла событий
+    def subscribe(self) -> StateSubscriber:
+        subscriber = StateSubscriber(asyncio.get_running_loop(), self.state_version.value)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise errors.TooManySubscribersException(
+                    f'Too many subscribers to state events: {self.max_subscribers}. Try again later')
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: StateSubscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _broadcast(self, version: int):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.notify, version)
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт
+                self.unsubscribe(subscriber)
@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+# Счетчик версии состояния приложения: увеличивается после каждой зафиксированной записи в TaskService и DayService.
+# Вместе с версией хранит уже закодированные ответы, построенные для нее, чтобы повторные чтения не ходили в БД
+class StateVersion:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Эпоха отличает версии разных запусков приложения: после перезапуска счетчик снова начинается с 0
+        self.epoch = time.time_ns()
+        self._value = 0
+        self._snapshots: Dict[str, Tuple[int, bytes]] = {}
+        self._listeners: List[Callable[[int], None]] = []
+        # Отложенные изменения версии потока, выполняющего группу записей (см. DayService.begin_group)
+        self._local = threading.local()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    # Сильный ETag состояния: одинаковая версия одного запуска всегда соответствует одинаковым байтам ответа
+    def etag(self, version: int) -> str:
+        return f'"{self.epoch}-{version}"'
+
+    # Слушатели вызываются в потоке, выполнившем запись, после увеличения версии и вне блокировки
+    def add_listener(self, listener: Callable[[int], None]):
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: Callable[[int], None]):
+        with self._lock:
+            self._listeners = [item for item in self._listeners if item != listener]
+
+    # Пока поток откладывает изменения, bump только запоминает, что состояние изменилось: записи еще не
+    # зафиксированы, поэтому версия не меняется и слушатели не вызываются. Повторный вызов сбрасывает отложенное
+    def defer_bumps(self):
+        self._local.deferred = True
+        self._local.pending = False
+
+    def is_deferred(self) -> bool:
+        return getattr(self._local, 'deferred', False)
+
+    # Заканчивает откладывание в текущем потоке и возвращает, было ли отложено хотя бы одно изменение
+    def take_deferred_bumps(self) -> bool:
+        pending = getattr(self._local, 'pending', False)
+        self._local.deferred = False
+        self._local.pending = False
+        return pending
+
+    def bump(self) -> int:
+        if self.is_deferred():
+            self._local.pending = True
+            return self._value
+        with self._lock:
+            self._value += 1
+            self._snapshots.clear()
+            value = self._value
+            listeners = self._listeners
+        for listener in listeners:
+            listener(value)
+        return value
+
+    def get_snapshot(self, key: str, version: int) -> bytes | None:
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or snapshot[0] != version:
+            return None
+        return snapshot[1]
+
+    # Версию нужно прочитать до чтения данных: тогда снимок никогда не окажется старее своей версии
+    def store_snapshot(self, key: str, version: int, payload: bytes):
+        with self._lock:
+            if version == self._value:
+                self._snapshots[key] = (version, payload)
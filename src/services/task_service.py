@@ -1,6 +1,6 @@
-from src import repository, entities, errors
+from src import repository, entities, errors, config
 from .day_service import DayService
-from typing import List
+from typing import Iterator, List, Tuple
 
 
 class TaskService:
@@ -8,8 +8,11 @@ class TaskService:
         self.day_service = day_service
         self.task_repository = task_repository
 
-    def get_all_by_day_id(self, day_id: int):
-        return self.task_repository.get_all_by_day_id(day_id)
+    def get_active_by_day_id(self, day_id: int) -> List[entities.Task]:
+        return self.task_repository.get_active_by_day_id(day_id)
+
+    def get_completed_daily_ids(self, day_id: int) -> List[int]:
+        return self.task_repository.get_completed_daily_ids(day_id)
 
     def get_by_id(self, id: int) -> entities.Task:
         task = self.task_repository.get_by_id(id)
@@ -17,97 +20,249 @@ class TaskService:
             raise errors.TaskNotFoundException(f'Task with id {id} not found')
         return task
 
-    def get_all_completed(self) -> List[entities.Task]:
-        return self.task_repository.get_all_completed()
+    # Keyset-пагинация: следующая страница начинается после id последней задачи текущей
+    def get_completed_page(self, cursor: int | None, limit: int) -> Tuple[List[entities.Task], int | None]:
+        tasks = self.task_repository.get_completed_page(cursor, limit + 1)
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            return tasks, tasks[-1].id
+        return tasks, None
+
+    def iter_completed_batches(self) -> Iterator[List[entities.Task]]:
+        return self.task_repository.iter_completed_batches(config.COMPLETED_TASKS_EXPORT_BATCH_SIZE)
 
-    def create_task(self, name: str):
+    def count_completed(self) -> int:
+        return self.task_repository.count_completed()
+
+    def create_task(self, name: str, duration: int | None = 1):
         current_day = self.day_service.get_active()
         new_task = entities.Task(
             name=name,
             day_id=current_day.id,
             type='one-time',
-            status='active'
+            status='active',
+            duration=duration
         )
         try:
             created_task = self.task_repository.insert(new_task)
-            return created_task
         except errors.DuplicateTaskNameException:
             raise
+        self.day_service.state_version.bump()
+        return created_task
+
+    # Для каждого имени возвращается созданная задача или ошибка, дубликаты не прерывают создание остальных
+    def create_tasks(self, names: List[str]) -> List[Tuple[str, entities.Task | None, Exception | None]]:
+        with self.task_repository.transaction():
+            current_day = self.day_service.get_active()
+            new_tasks = [
+                entities.Task(name=name, day_id=current_day.id, type='one-time', status='active') for name in names
+            ]
+            created_tasks = self.task_repository.insert_many(new_tasks)
+        if any(task is not None for task in created_tasks):
+            self.day_service.state_version.bump()
 
+        results = []
+        for name, task in zip(names, created_tasks):
+            if task is None:
+                results.append((name, None, errors.DuplicateTaskNameException(f'Task with name "{name}" already exists')))
+            else:
+                results.append((name, task, None))
+        return results
+
+    # Каждый переход выполняется одним условным UPDATE. Задача перечитывается только если он не сработал,
+    # чтобы вернуть ту же ошибку, что и при проверке до записи
     def make_completed(self, id: int):
         current_day = self.day_service.get_active()
-        task = self.get_by_id(id)
-
-        self._check_task_in_current_day(task, current_day)
-        if task.type != 'one-time':
-            raise errors.InvalidTaskStateException(
-                f'Task with ID {id} cannot be completed. Only \'one-time\' tasks can be marked as completed')
-        if task.status == 'completed':
-            raise errors.InvalidTaskStateException(f'Task with ID {id} is already completed.')
+        updated_task = self.task_repository.complete_in_day(id, current_day.id)
+        if updated_task is None:
+            self._raise_transition_error(id, current_day, self._check_can_be_completed)
+        self.day_service.state_version.bump()
+        return updated_task
 
-        self.task_repository.make_completed(id)
-        updated_task = self.get_by_id(id)  ## нужен ли повторный запрос к бд или лучше изменять объект в памяти? task.status = 'completed' return task
+    # Массовое завершение: найденные задачи завершаются одним условным UPDATE, как и одиночное завершение.
+    # Причина ошибки определяется только для задач, которые не удалось завершить, по их состоянию до UPDATE.
+    # Для каждого id возвращается завершенная задача или ошибка, по которой она не была завершена
+    def make_completed_many(self, ids: List[int]) -> List[Tuple[int, entities.Task | None, Exception | None]]:
+        unique_ids = list(dict.fromkeys(ids))
+        task_errors = {}
+        with self.task_repository.transaction():
+            current_day = self.day_service.get_active()
+            found_tasks = {task.id: task for task in self.task_repository.get_by_ids(unique_ids)}
+            completed_tasks = {}
+            if found_tasks:
+                completed_tasks = {
+                    task.id: task for task in self.task_repository.complete_many_in_day(list(found_tasks), current_day.id)
+                }
+            for id in unique_ids:
+                if id in completed_tasks:
+                    continue
+                try:
+                    task = found_tasks.get(id)
+                    if task is None:
+                        raise errors.TaskNotFoundException(f'Task with id {id} not found')
+                    self._check_can_be_completed(task, current_day)
+                except (errors.TaskNotFoundException, errors.TaskNotInActiveDayError,
+                        errors.InvalidTaskStateException) as exc:
+                    task_errors[id] = exc
+        if completed_tasks:
+            self.day_service.state_version.bump()
 
-        return updated_task
+        results = []
+        for id in unique_ids:
+            if id in completed_tasks:
+                results.append((id, completed_tasks[id], None))
+            else:
+                error = task_errors.get(id) or errors.InvalidTaskStateException(
+                    f'Task with ID {id} was changed by another request. Try again.')
+                results.append((id, None, error))
+        return results
 
     def make_active(self, id: int):
         current_day = self.day_service.get_active()
-        task = self.get_by_id(id)
+        updated_task = self.task_repository.activate_in_day(id, current_day.id)
+        if updated_task is None:
+            self._raise_transition_error(id, current_day, self._check_can_be_activated)
+        self.day_service.state_version.bump()
+        return updated_task
 
-        if task.status == 'active' and task.day_id == current_day.id:
-            raise errors.InvalidTaskStateException(f'Task with ID {id} is already active.')
+    def make_daily(self, id: int):
+        current_day = self.day_service.get_active()
+        updated_task = self.task_repository.make_daily_in_day(id, current_day.id)
+        if updated_task is None:
+            self._raise_transition_error(id, current_day, self._check_can_be_made_daily)
+        self.day_service.state_version.bump()
+        return updated_task
 
-        self.task_repository.make_active(id, current_day.id)
-        updated_task = self.task_repository.get_by_id(id)
+    def make_one_time(self, id: int):
+        current_day = self.day_service.get_active()
+        updated_task = self.task_repository.make_one_time_in_day(id, current_day.id)
+        if updated_task is None:
+            self._raise_transition_error(id, current_day, self._check_can_be_made_one_time)
+        self.day_service.state_version.bump()
         return updated_task
 
-    def make_daily(self, id: int):
+    def set_duration(self, id: int, duration: int | None):
+        if duration is not None and (not isinstance(duration, int) or duration <= 0):
+            raise errors.InvalidTaskStateException(f'Duration must be a positive integer or None, but got {duration}')
         current_day = self.day_service.get_active()
-        task = self.get_by_id(id)
+        updated_task = self.task_repository.set_duration_in_day(id, current_day.id, duration)
+        if updated_task is None:
+            self._raise_transition_error(id, current_day, self._check_can_change_duration)
+        self.day_service.state_version.bump()
+        return updated_task
 
-        self._check_task_in_current_day(task, current_day)
-        if task.status == 'completed':
+    # Выполнение ежедневной задачи отмечается только для текущего дня, сама задача при этом не меняется.
+    # Возвращается задача в текущем дне, как в списке задач дня
+    def mark_daily_done(self, id: int) -> entities.Task:
+        with self.task_repository.transaction():
+            current_day = self.day_service.get_active()
+            if not self.task_repository.add_daily_completion(id, current_day.id):
+                task = self.get_by_id(id)
+                self._check_can_be_marked_done(task)
+                raise errors.InvalidTaskStateException(f'Task with ID {id} is already done today.')
+            task = self.task_repository.get_by_id(id)
+        self.day_service.state_version.bump()
+        task.day_id = current_day.id
+        return task
+
+    def unmark_daily_done(self, id: int) -> entities.Task:
+        with self.task_repository.transaction():
+            current_day = self.day_service.get_active()
+            task = self.get_by_id(id)
+            self._check_can_be_marked_done(task)
+            if not self.task_repository.remove_daily_completion(id, current_day.id):
+                raise errors.InvalidTaskStateException(f'Task with ID {id} is not done today.')
+        self.day_service.state_version.bump()
+        task.day_id = current_day.id
+        return task
+
+    def get_completion_days(self, id: int) -> List[entities.Day]:
+        task = self.get_by_id(id)
+        if task.type != 'daily':
             raise errors.InvalidTaskStateException(
-                f'Task with ID {id} is completed. To make it a daily task, make it active first')
-        if task.type == 'daily':
-            raise errors.InvalidTaskStateException(f'Task with ID {id} is already a daily task.')
+                f'Task with ID {task.id} is not a daily task. Only \'daily\' tasks have completion history')
+        return self.day_service.get_completion_days(id)
 
-        self.task_repository.make_daily(id)
-        updated_task = self.task_repository.get_by_id(id)
+    def edit_name(self, id: int, new_name: str):
+        current_day = self.day_service.get_active()
+        try:
+            updated_task = self.task_repository.rename_in_day(id, current_day.id, new_name)
+        except errors.DuplicateTaskNameException:
+            raise
+        if updated_task is None:
+            self._raise_transition_error(id, current_day, self._check_can_be_renamed)
+        self.day_service.state_version.bump()
         return updated_task
 
-    def make_one_time(self, id: int):
-        current_day = self.day_service.get_active()
+    def _raise_transition_error(self, id: int, day: entities.Day, check_task_state):
         task = self.get_by_id(id)
+        check_task_state(task, day)
+        raise errors.InvalidTaskStateException(f'Task with ID {id} was changed by another request. Try again.')
 
-        self._check_task_in_current_day(task, current_day)
+    def _check_can_be_completed(self, task: entities.Task, day: entities.Day):
+        self._check_task_in_current_day(task, day)
+        if task.type != 'one-time':
+            raise errors.InvalidTaskStateException(
+                f'Task with ID {task.id} cannot be completed. Only \'one-time\' tasks can be marked as completed')
+        if task.status == 'completed':
+            raise errors.InvalidTaskStateException(f'Task with ID {task.id} is already completed.')
+
+    def _check_can_be_activated(self, task: entities.Task, day: entities.Day):
+        if self._is_in_day(task, day):
+            raise errors.InvalidTaskStateException(f'Task with ID {task.id} is already active.')
 
+    def _check_can_be_made_daily(self, task: entities.Task, day: entities.Day):
+        self._check_task_in_current_day(task, day)
         if task.status == 'completed':
-            raise errors.InvalidTaskStateException(f'Task with ID {id} is completed.')
-        if task.type == 'one-time':
-            raise errors.InvalidTaskStateException(f'Task with ID {id} is already a one-time task.')
+            raise errors.InvalidTaskStateException(
+                f'Task with ID {task.id} is completed. To make it a daily task, make it active first')
+        if task.type == 'daily':
+            raise errors.InvalidTaskStateException(f'Task with ID {task.id} is already a daily task.')
 
-        self.task_repository.make_one_time(id)
-        updated_task = self.task_repository.get_by_id(id)
-        return updated_task
+    def _check_can_be_made_one_time(self, task: entities.Task, day: entities.Day):
+        self._check_task_in_current_day(task, day)
+        if task.status == 'completed':
+            raise errors.InvalidTaskStateException(f'Task with ID {task.id} is completed.')
+        if task.type == 'one-time':
+            raise errors.InvalidTaskStateException(f'Task with ID {task.id} is already a one-time task.')
 
-    def edit_name(self, id: int, new_name: str):
-        current_day = self.day_service.get_active()
-        task = self.get_by_id(id)
+    def _check_can_change_duration(self, task: entities.Task, day: entities.Day):
+        self._check_task_in_current_day(task, day)
+        if task.status == 'completed':
+            raise errors.InvalidTaskStateException(f'Task with ID {task.id} is completed.')
+        if task.type == 'daily':
+            raise errors.InvalidTaskStateException(
+                f'Task with ID {task.id} is a daily task. Only \'one-time\' tasks have a duration')
 
-        self._check_task_in_current_day(task, current_day)
+    def _check_can_be_renamed(self, task: entities.Task, day: entities.Day):
+        self._check_task_in_current_day(task, day)
         if task.status == 'completed':
             raise errors.InvalidTaskStateException(
-                f'Task with ID {id} is completed. To edit it, make it active first.')
-        try:
-            self.task_repository.edit_name(id, new_name)
-            updated_task = self.task_repository.get_by_id(id)
-            return updated_task
-        except errors.DuplicateTaskNameException:
-            raise
+                f'Task with ID {task.id} is completed. To edit it, make it active first.')
+
+    def _check_can_be_marked_done(self, task: entities.Task):
+        if task.type != 'daily':
+            raise errors.InvalidTaskStateException(
+                f'Task with ID {task.id} is not a daily task. Use completion for \'one-time\' tasks')
+        if task.status == 'completed':
+            raise errors.InvalidTaskStateException(f'Task with ID {task.id} is completed.')
 
     def _check_task_in_current_day(self, task: entities.Task, day: entities.Day):
-        if task.day_id != day.id:
+        if task.day_id != day.id and not self._is_in_day(task, day):
             raise errors.TaskNotInActiveDayError(
                 f"Task with ID {task.id} not found in active day {day.id}"
             )
+
+    # Активная ежедневная задача есть в любом дне, активная однодневная - в днях своего срока:
+    # от дня задачи до due_ordinal включительно
+    def _is_in_day(self, task: entities.Task, day: entities.Day) -> bool:
+        if task.status != 'active':
+            return False
+        if task.type == 'daily':
+            return True
+        if task.due_ordinal is not None and task.due_ordinal < day.ordinal:
+            return False
+        if task.day_id == day.id:
+            return True
+        task_day = self.day_service.get_by_id(task.day_id)
+        return task_day is not None and task_day.ordinal <= day.ordinal
@@ -2,11 +2,16 @@ import pytest
 from pathlib import Path
 from fastapi.testclient import TestClient
 from src.main import app
-from src.dependencies import get_task_service, get_day_service
 from src.services.task_service import TaskService
 from src.services.day_service import DayService
+from src.services.equipment_service import EquipmentService
+from src.services.change_log_service import ChangeLogService
+from src.services.state_broadcaster import StateBroadcaster
 from src.repository.task_repository import TaskRepository
 from src.repository.day_repository import DayRepository
+from src.repository.equipment_repository import EquipmentRepository
+from src.repository.change_log_repository import ChangeLogRepository
+from src.repository.db_executor import DbExecutor
 from src.migration import create_database_and_tables
 from src.api.handlers_models import *
 from typing import Callable, List
@@ -27,15 +32,25 @@ def test_client(test_db_path: str):
 
     day_service = DayService(day_repo, task_repo)
     task_service = TaskService(task_repo, day_service)
+    equipment_service = EquipmentService(EquipmentRepository(test_db_path), day_service)
+    change_log_service = ChangeLogService(ChangeLogRepository(test_db_path))
+    state_broadcaster = StateBroadcaster(day_service.state_version)
 
-    app.dependency_overrides[get_day_service] = lambda: day_service
-    app.dependency_overrides[get_task_service] = lambda: task_service
+    db_executor = DbExecutor()
+
+    # Клиент создается без запуска lifespan, поэтому состояние приложения заполняется так же, как в lifespan
+    app.state.day_service = day_service
+    app.state.task_service = task_service
+    app.state.equipment_service = equipment_service
+    app.state.change_log_service = change_log_service
+    app.state.state_broadcaster = state_broadcaster
+    app.state.db_executor = db_executor
 
     client = TestClient(app)
     
     yield client
 
-    app.dependency_overrides.clear()
+    db_executor.shutdown()
 
 
 @pytest.fixture
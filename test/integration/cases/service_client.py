@@ -5,8 +5,9 @@ class ServiceClient:
     def __init__(self, client: TestClient):
         self.client = client
 
-    def get_current_state(self) -> CurrentStateResponse:
-        response = self.client.get("/day/current")
+    def get_current_state(self, completed_tasks: CompletedTasksMode | None = None) -> CurrentStateResponse:
+        params = {'completed_tasks': completed_tasks.value} if completed_tasks else None
+        response = self.client.get("/day/current", params=params)
         response.raise_for_status()
         return CurrentStateResponse.model_validate(response.json())
 
@@ -15,8 +16,9 @@ class ServiceClient:
         response.raise_for_status()
         return CurrentStateResponse.model_validate(response.json())
 
-    def set_next_day(self) -> CurrentStateResponse:
-        response = self.client.post("/day/next")
+    def set_next_day(self, days: int | None = None) -> CurrentStateResponse:
+        params = {'days': days} if days is not None else None
+        response = self.client.post("/day/next", params=params)
         response.raise_for_status()
         return CurrentStateResponse.model_validate(response.json())
 
@@ -29,6 +31,16 @@ class ServiceClient:
         response.raise_for_status()
         return TaskResponse.model_validate(response.json())
 
+    def create_tasks(self, names: List[str]) -> BulkTaskCreateResponse:
+        response = self.client.post("/task/batch", json={"names": names})
+        response.raise_for_status()
+        return BulkTaskCreateResponse.model_validate(response.json())
+
+    def set_task_duration(self, task_id: int, duration: int | None) -> TaskResponse:
+        response = self.client.patch(f"/task/{task_id}/duration", json={"duration": duration})
+        response.raise_for_status()
+        return TaskResponse.model_validate(response.json())
+
     def rename_task(self, task_id: int, request: TaskNameRequest) -> TaskResponse:
         if isinstance(request, BaseModel):
             payload = request.model_dump()
@@ -43,6 +55,11 @@ class ServiceClient:
         response.raise_for_status()
         return TaskResponse.model_validate(response.json())
 
+    def complete_tasks(self, ids: List[int]) -> BulkTaskResponse:
+        response = self.client.post("/task/complete", json={"ids": ids})
+        response.raise_for_status()
+        return BulkTaskResponse.model_validate(response.json())
+
     def activate_task(self, task_id: int) -> TaskResponse:
         response = self.client.patch(f"/task/{task_id}/active")
         response.raise_for_status()
@@ -57,3 +74,38 @@ class ServiceClient:
         response = self.client.patch(f"/task/{task_id}/one_time")
         response.raise_for_status()
         return TaskResponse.model_validate(response.json())
+
+    def get_completed_tasks(self, cursor: int | None = None, limit: int | None = None) -> CompletedTasksPageResponse:
+        params = {}
+        if cursor is not None:
+            params['cursor'] = cursor
+        if limit is not None:
+            params['limit'] = limit
+        response = self.client.get("/task/completed", params=params)
+        response.raise_for_status()
+        return CompletedTasksPageResponse.model_validate(response.json())
+
+    def mark_task_done_today(self, task_id: int) -> TaskResponse:
+        response = self.client.patch(f"/task/{task_id}/done_today")
+        response.raise_for_status()
+        return TaskResponse.model_validate(response.json())
+
+    def unmark_task_done_today(self, task_id: int) -> TaskResponse:
+        response = self.client.patch(f"/task/{task_id}/not_done_today")
+        response.raise_for_status()
+        return TaskResponse.model_validate(response.json())
+
+    def get_task_completions(self, task_id: int) -> TaskCompletionsResponse:
+        response = self.client.get(f"/task/{task_id}/completions")
+        response.raise_for_status()
+        return TaskCompletionsResponse.model_validate(response.json())
+
+    def get_changes(self, cursor: int | None = None, limit: int | None = None) -> ChangesPageResponse:
+        params = {}
+        if cursor is not None:
+            params['cursor'] = cursor
+        if limit is not None:
+            params['limit'] = limit
+        response = self.client.get("/changes/", params=params)
+        response.raise_for_status()
+        return ChangesPageResponse.model_validate(response.json())
@@ -0,0 +1,68 @@
+import pytest
+from typing import Callable
+
+import httpx
+from service_client import ServiceClient
+from helpers import assert_task_data, assert_day_data
+from src.api.handlers_models import *
+
+
+# 1. Установить день на 25 весны с 3мя задачами.
+# 2. Перейти на 7 дней вперед.
+#    ОР: Текущий день 4 лета, промежуточные дни не созданы. Однодневная активная задача завершена в исходном дне,
+#    ежедневная перенесена в итоговый день.
+def test_advance_days_applies_rollover_once(
+    service_client: ServiceClient,
+    day_with_three_tasks_factory: Callable[[SetCurrentDayRequest], tuple[CurrentStateResponse, TaskResponse, TaskResponse, TaskResponse]],
+):
+    active_day_state, active_one_time_task, completed_one_time_task, daily_task = day_with_three_tasks_factory(
+        SetCurrentDayRequest(year=1, season=DaySeason.spring, number=25)
+    )
+    initial_day_id = active_day_state.current_day_info.id
+
+    state_after_jump = service_client.set_next_day(days=7)
+    day_after_jump = state_after_jump.current_day_info
+
+    assert_day_data(
+        day_after_jump,
+        expected_year=1,
+        expected_season=DaySeason.summer,
+        expected_number=4,
+        expected_active=True,
+        expected_tasks=[
+            {
+                'id': daily_task.id,
+                'name': daily_task.name,
+                'type': TaskType.daily,
+                'status': TaskStatus.active,
+                'day_id': day_after_jump.id
+            }
+        ]
+    )
+    assert day_after_jump.id == initial_day_id + 1, 'Intermediate days were created'
+
+    completed_task_after_jump = next(
+        task for task in state_after_jump.all_completed_tasks if task.id == active_one_time_task.id)
+    assert_task_data(
+        completed_task_after_jump,
+        expected_id=active_one_time_task.id,
+        expected_name=active_one_time_task.name,
+        expected_type=TaskType.one_time,
+        expected_status=TaskStatus.completed,
+        expected_day_id=initial_day_id
+    )
+
+
+def test_advance_days_by_one_equals_next_day(service_client: ServiceClient, default_day_state: CurrentStateResponse):
+    state_after_next = service_client.set_next_day(days=1)
+
+    assert state_after_next.current_day_info.number == default_day_state.current_day_info.number + 1
+
+
+@pytest.mark.parametrize('days', [0, -1], ids=['zero', 'negative'])
+def test_advance_days_invalid_value(service_client: ServiceClient, default_day_state: CurrentStateResponse, days: int):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.set_next_day(days=days)
+    assert exc_info.value.response.status_code == 422
+
+    assert service_client.get_current_state() == default_day_state
@@ -0,0 +1,63 @@
+import pytest
+from typing import Callable, List
+import httpx
+from service_client import ServiceClient
+from src.api.handlers_models import *
+from src import config
+
+
+# 1. Создать 3 задачи, одну из них сделать ежедневной.
+# 2. Завершить все 3 задачи и несуществующую задачу одним запросом.
+#    ОР: Однодневные задачи завершены, для ежедневной и несуществующей задачи вернулись ошибки.
+#    Результаты идут в порядке id из запроса.
+def test_complete_tasks_in_bulk(service_client: ServiceClient, task_factory: Callable[[int], List[TaskResponse]]):
+    first_task, daily_task, second_task = task_factory(3)
+    service_client.make_task_daily(daily_task.id)
+    non_existent_task_id = 999
+
+    response = service_client.complete_tasks([second_task.id, daily_task.id, first_task.id, non_existent_task_id])
+
+    results = response.results
+    assert [result.id for result in results] == [second_task.id, daily_task.id, first_task.id, non_existent_task_id]
+    assert results[0].task.status == TaskStatus.completed and results[0].error is None
+    assert results[2].task.status == TaskStatus.completed and results[2].error is None
+    assert results[1].task is None
+    assert 'cannot be completed' in results[1].error
+    assert results[3].task is None
+    assert f'Task with id {non_existent_task_id} not found' in results[3].error
+
+    state = service_client.get_current_state()
+    assert [task.id for task in state.current_day_info.tasks] == [daily_task.id]
+    assert sorted(task.id for task in state.all_completed_tasks) == sorted([first_task.id, second_task.id])
+
+
+def test_repeated_ids_are_completed_once(service_client: ServiceClient,
+                                         task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+
+    response = service_client.complete_tasks([task.id, task.id])
+
+    assert len(response.results) == 1
+    assert response.results[0].task.status == TaskStatus.completed
+
+
+def test_already_completed_task_returns_error(service_client: ServiceClient,
+                                              task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    service_client.complete_task(task.id)
+
+    response = service_client.complete_tasks([task.id])
+
+    assert response.results[0].task is None
+    assert 'is already completed' in response.results[0].error
+
+
+@pytest.mark.parametrize(
+    'ids',
+    [[], list(range(1, config.TASKS_BULK_MAX_SIZE + 2))],
+    ids=['empty', 'too_many']
+)
+def test_invalid_bulk_request(service_client: ServiceClient, ids: List[int]):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.complete_tasks(ids)
+    assert exc_info.value.response.status_code == 422
@@ -0,0 +1,43 @@
+import pytest
+from typing import Callable, List
+import httpx
+from service_client import ServiceClient
+from src.api.handlers_models import *
+
+
+# 1. Создать задачу.
+# 2. Создать пачку задач, в которой есть имя уже созданной задачи и повторяющееся имя.
+#    ОР: Новые задачи созданы в текущем дне, для дубликатов вернулись ошибки, остальная пачка не прервалась.
+def test_create_tasks_in_batch(service_client: ServiceClient, task_factory: Callable[[int], List[TaskResponse]],
+                               default_day_state: CurrentStateResponse):
+    existing_task = task_factory(1)[0]
+    names = ['Полить грядки', existing_task.name, '  Покормить кур  ', 'Полить грядки']
+
+    response = service_client.create_tasks(names)
+
+    results = response.results
+    assert [result.name for result in results] == ['Полить грядки', existing_task.name, 'Покормить кур', 'Полить грядки']
+    for result in (results[0], results[2]):
+        assert result.error is None
+        assert result.task.name == result.name
+        assert result.task.type == TaskType.one_time
+        assert result.task.status == TaskStatus.active
+        assert result.task.day_id == default_day_state.current_day_info.id
+    for result in (results[1], results[3]):
+        assert result.task is None
+        assert f'Task with name "{result.name}" already exists' in result.error
+
+    state = service_client.get_current_state()
+    assert [task.id for task in state.current_day_info.tasks] == [existing_task.id, results[0].task.id,
+                                                                   results[2].task.id]
+
+
+@pytest.mark.parametrize(
+    'names',
+    [[], ['Задача', '   ']],
+    ids=['empty_batch', 'empty_name']
+)
+def test_invalid_batch_request(service_client: ServiceClient, names: List[str]):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.create_tasks(names)
+    assert exc_info.value.response.status_code == 422
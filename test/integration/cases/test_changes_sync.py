@@ -0,0 +1,48 @@
+import pytest
+from typing import Callable, List
+import httpx
+from service_client import ServiceClient
+from src.api.handlers_models import *
+
+
+# 1. Получить состояние и курсор журнала изменений.
+# 2. Создать задачу, завершить ее и перелистнуть день.
+#    ОР: После курсора в журнале только эти изменения, в порядке выполнения.
+def test_changes_since_state_cursor(service_client: ServiceClient, default_day_state: CurrentStateResponse):
+    cursor = service_client.get_current_state().changes_cursor
+    assert cursor is not None
+
+    task = service_client.create_task({'name': 'Сделать вино'})
+    service_client.complete_task(task.id)
+    state = service_client.set_next_day()
+
+    page = service_client.get_changes(cursor)
+    assert [(change.entity, change.entity_id, change.action) for change in page.changes] == [
+        (ChangeEntity.task, task.id, ChangeAction.insert),
+        (ChangeEntity.task, task.id, ChangeAction.update),
+        (ChangeEntity.day, default_day_state.current_day_info.id, ChangeAction.update),
+        (ChangeEntity.day, state.current_day_info.id, ChangeAction.insert),
+    ]
+    assert page.changes[1].data['status'] == 'completed'
+    assert (page.next_cursor, page.has_more) == (page.changes[-1].seq, False)
+    assert state.changes_cursor == page.next_cursor
+    assert service_client.get_changes(page.next_cursor).changes == []
+
+
+def test_changes_are_paged(service_client: ServiceClient, task_factory: Callable[[int], List[TaskResponse]]):
+    cursor = service_client.get_current_state().changes_cursor
+    tasks = task_factory(3)
+
+    first_page = service_client.get_changes(cursor, limit=2)
+    second_page = service_client.get_changes(first_page.next_cursor, limit=2)
+
+    assert first_page.has_more is True
+    assert second_page.has_more is False
+    assert [change.entity_id for change in first_page.changes + second_page.changes] == [task.id for task in tasks]
+
+
+@pytest.mark.parametrize('params', [{'cursor': -1}, {'limit': 0}], ids=['negative_cursor', 'zero_limit'])
+def test_get_changes_with_invalid_params(service_client: ServiceClient, params: dict):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.get_changes(**params)
+    assert exc_info.value.response.status_code == 422
@@ -0,0 +1,153 @@
+import pytest
+import httpx
+from contextlib import ExitStack
+from typing import Callable, List
+
+from service_client import ServiceClient
+from src import config
+from src.api.handlers_models import *
+
+
+@pytest.fixture
+def completed_tasks_factory(service_client: ServiceClient, task_factory: Callable[[int], List[TaskResponse]]):
+    def _completed_tasks_factory(tasks_count: int) -> List[TaskResponse]:
+        return [service_client.complete_task(task.id) for task in task_factory(tasks_count)]
+
+    return _completed_tasks_factory
+
+
+# 1. Создать и завершить 5 задач.
+# 2. Получить завершенные задачи страницами по 2.
+#    ОР: 3 страницы (2, 2, 1 задача) в порядке id, у последней страницы нет курсора, задачи не повторяются.
+def test_get_completed_tasks_by_pages(service_client: ServiceClient, completed_tasks_factory):
+    completed_tasks = completed_tasks_factory(5)
+
+    received_tasks = []
+    pages_count = 0
+    cursor = None
+    while True:
+        page = service_client.get_completed_tasks(cursor=cursor, limit=2)
+        pages_count += 1
+        received_tasks.extend(page.tasks)
+        if page.next_cursor is None:
+            break
+        assert page.next_cursor == page.tasks[-1].id
+        cursor = page.next_cursor
+
+    assert pages_count == 3
+    assert [task.id for task in received_tasks] == [task.id for task in completed_tasks]
+    assert all(task.status == TaskStatus.completed for task in received_tasks)
+
+
+# 1. Создать и завершить 3 задачи при размере страницы 2.
+# 2. Получить текущий день.
+#    ОР: В дне только первая страница завершенных задач и курсор на следующую.
+def test_current_state_contains_first_page_of_completed_tasks(service_client: ServiceClient, completed_tasks_factory,
+                                                              monkeypatch):
+    monkeypatch.setattr(config, 'COMPLETED_TASKS_PAGE_SIZE', 2)
+    completed_tasks = completed_tasks_factory(3)
+
+    state = service_client.get_current_state()
+
+    assert [task.id for task in state.all_completed_tasks] == [task.id for task in completed_tasks[:2]]
+    assert state.completed_tasks_next_cursor == completed_tasks[1].id
+    assert state.completed_tasks_count is None
+
+    next_page = service_client.get_completed_tasks(cursor=state.completed_tasks_next_cursor)
+    assert [task.id for task in next_page.tasks] == [completed_tasks[2].id]
+    assert next_page.next_cursor is None
+
+
+# 1. Создать и завершить 3 задачи.
+# 2. Получить текущий день только с количеством завершенных задач.
+#    ОР: Список завершенных задач пуст, количество равно 3.
+def test_current_state_with_completed_tasks_count(service_client: ServiceClient, completed_tasks_factory):
+    completed_tasks_factory(3)
+
+    state = service_client.get_current_state(completed_tasks=CompletedTasksMode.count)
+
+    assert state.all_completed_tasks == []
+    assert state.completed_tasks_count == 3
+    assert state.completed_tasks_next_cursor is None
+
+
+@pytest.mark.parametrize(
+    'params',
+    [
+        {'limit': 0},
+        {'limit': config.COMPLETED_TASKS_MAX_PAGE_SIZE + 1},
+        {'cursor': -1},
+    ],
+    ids=['zero_limit', 'too_big_limit', 'negative_cursor']
+)
+def test_get_completed_tasks_with_invalid_params_should_fail(service_client: ServiceClient,
+                                                             default_day_state: CurrentStateResponse, params):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        response = service_client.client.get("/task/completed", params=params)
+        response.raise_for_status()
+
+    assert exc_info.value.response.status_code == 422
+
+
+# 1. Создать и завершить 5 задач при размере пачки выгрузки 2.
+# 2. Выгрузить историю завершенных задач в NDJSON.
+#    ОР: 5 строк, по одной задаче в строке, в порядке id, активные задачи не выгружены.
+def test_export_completed_tasks(service_client: ServiceClient, completed_tasks_factory,
+                                task_factory: Callable[[int], List[TaskResponse]], monkeypatch):
+    monkeypatch.setattr(config, 'COMPLETED_TASKS_EXPORT_BATCH_SIZE', 2)
+    completed_tasks = completed_tasks_factory(5)
+    service_client.create_task(TaskNameRequest(name='Активная задача'))
+
+    with service_client.client.stream("GET", "/task/completed/export") as response:
+        response.raise_for_status()
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        lines = [line for line in response.iter_lines() if line]
+
+    exported_tasks = [TaskResponse.model_validate_json(line) for line in lines]
+    assert [task.id for task in exported_tasks] == [task.id for task in completed_tasks]
+    assert exported_tasks == completed_tasks
+
+
+# 1. Занять все соединения для выгрузки.
+# 2. Выгрузить историю завершенных задач.
+#    ОР: 503, остальные запросы к БД обрабатываются.
+def test_export_is_rejected_when_all_export_connections_are_busy(service_client: ServiceClient,
+                                                                 completed_tasks_factory):
+    completed_tasks_factory(1)
+    pool = service_client.client.app.state.task_service.task_repository.pool
+
+    with ExitStack() as stack:
+        for _ in range(pool.max_detached):
+            stack.enter_context(pool.detached_connection())
+        response = service_client.client.get("/task/completed/export")
+        current_state = service_client.client.get("/day/current")
+
+    assert response.status_code == 503
+    assert current_state.status_code == 200
+
+
+def test_export_without_completed_tasks_is_empty(service_client: ServiceClient, default_day_state: CurrentStateResponse):
+    response = service_client.client.get("/task/completed/export")
+    response.raise_for_status()
+    assert response.text == ''
+
+
+
+# Быстрое кодирование и кодирование через модели отдают одинаковые байты
+@pytest.mark.parametrize('url', ['/task/completed', '/task/completed/export', '/day/current'])
+def test_fast_json_responses_match_model_responses(service_client: ServiceClient, completed_tasks_factory,
+                                                   monkeypatch, url: str):
+    completed_tasks_factory(3)
+    service_client.make_task_daily(service_client.create_task({'name': 'Полить грядки'}).id)
+    day_service = service_client.client.app.state.day_service
+
+    monkeypatch.setattr(config, 'API_FAST_JSON', True)
+    fast_response = service_client.client.get(url)
+    # Сбрасывает снимок GET /day/current, не меняя данных
+    day_service.state_version.bump()
+    monkeypatch.setattr(config, 'API_FAST_JSON', False)
+    model_response = service_client.client.get(url)
+
+    assert fast_response.status_code == model_response.status_code == 200
+    assert fast_response.headers['content-type'] == model_response.headers['content-type']
+    assert fast_response.content == model_response.content
@@ -0,0 +1,104 @@
+import asyncio
+import sqlite3
+from typing import Callable, List
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from src.api.handlers_models import *
+from src.repository import GroupCommitWriter, get_pool
+
+
+async def _send_concurrently(test_client: TestClient, requests: List[tuple]) -> List[httpx.Response]:
+    transport = httpx.ASGITransport(app=test_client.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        return await asyncio.gather(*(client.request(method, url, **kwargs) for method, url, kwargs in requests))
+
+
+@pytest.fixture
+def group_commit(test_client: TestClient, test_db_path: str):
+    day_service = test_client.app.state.day_service
+    writer = GroupCommitWriter(get_pool(test_db_path), on_group_start=day_service.begin_group,
+                               on_group_done=day_service.finish_group)
+    test_client.app.state.db_executor.set_writer(writer)
+    yield writer
+    test_client.app.state.db_executor.set_writer(None)
+    writer.stop()
+
+
+# 1. Одновременно отправить много запросов текущего дня и завершения разных задач.
+#    ОР: Все запросы выполнены успешно, каждая задача завершена ровно один раз.
+def test_concurrent_pollers_and_writers(test_client: TestClient, task_factory: Callable[[int], List[TaskResponse]]):
+    tasks = task_factory(10)
+    requests = [('GET', '/day/current', {}) for _ in range(50)]
+    requests += [('PATCH', f'/task/{task.id}/complete', {}) for task in tasks]
+
+    responses = asyncio.run(_send_concurrently(test_client, requests))
+
+    assert [response.status_code for response in responses] == [200] * len(requests)
+    state = CurrentStateResponse.model_validate(test_client.get('/day/current').json())
+    assert state.current_day_info.tasks == []
+    assert sorted(task.id for task in state.all_completed_tasks) == sorted(task.id for task in tasks)
+
+
+def test_concurrent_completion_of_same_task(test_client: TestClient, task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    requests = [('PATCH', f'/task/{task.id}/complete', {}) for _ in range(5)]
+
+    responses = asyncio.run(_send_concurrently(test_client, requests))
+
+    assert sorted(response.status_code for response in responses) == [200] + [400] * 4
+
+
+# Те же проверки при записи через один поток с групповой фиксацией
+def test_concurrent_pollers_and_writers_with_group_commit(test_client: TestClient, group_commit: GroupCommitWriter,
+                                                          task_factory: Callable[[int], List[TaskResponse]]):
+    test_concurrent_pollers_and_writers(test_client, task_factory)
+
+
+def test_concurrent_completion_of_same_task_with_group_commit(test_client: TestClient,
+                                                              group_commit: GroupCommitWriter,
+                                                              task_factory: Callable[[int], List[TaskResponse]]):
+    test_concurrent_completion_of_same_task(test_client, task_factory)
+
+
+def test_day_transition_with_group_commit(test_client: TestClient, group_commit: GroupCommitWriter,
+                                          task_factory: Callable[[int], List[TaskResponse]]):
+    tasks = task_factory(3)
+    requests = [('POST', '/day/next', {})]
+    requests += [('PATCH', f'/task/{task.id}/rename', {'json': {'name': f'Задача {task.id}'}}) for task in tasks]
+
+    responses = asyncio.run(_send_concurrently(test_client, requests))
+
+    assert responses[0].status_code == 200
+    # Переименование до перехода дня успешно, после - задача уже завершена и не входит в новый день
+    assert {response.status_code for response in responses[1:]} <= {200, 404}
+    state = CurrentStateResponse.model_validate(test_client.get('/day/current').json())
+    assert state.current_day_info.number == 2
+
+
+# 1. Включить групповую фиксацию, отправить запрос, который отклоняется с ошибкой.
+#    ОР: Версия состояния не изменилась.
+# 2. Завершить задачу.
+#    ОР: Версия изменилась один раз, слушатель версии видит уже зафиксированное изменение.
+def test_group_commit_publishes_only_committed_changes(test_client: TestClient, test_db_path: str,
+                                                       group_commit: GroupCommitWriter,
+                                                       task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    state_version = test_client.app.state.day_service.state_version
+    committed_statuses = []
+
+    def read_committed_status(version: int):
+        with sqlite3.connect(test_db_path) as conn:
+            committed_statuses.append(conn.execute('SELECT status FROM tasks WHERE id = ?', (task.id,)).fetchone()[0])
+
+    state_version.add_listener(read_committed_status)
+    version = state_version.value
+
+    rejected_response = test_client.patch(f'/task/{task.id}/active')
+    assert rejected_response.status_code == 400
+    assert state_version.value == version, 'Rejected request changed the state version'
+
+    test_client.patch(f'/task/{task.id}/complete').raise_for_status()
+    assert state_version.value == version + 1
+    assert committed_statuses == ['completed']
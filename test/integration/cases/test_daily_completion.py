@@ -0,0 +1,92 @@
+import pytest
+from typing import Callable, List
+import httpx
+from service_client import ServiceClient
+from src.api.handlers_models import *
+
+
+def _day_task(state: CurrentStateResponse, task_id: int) -> TaskResponse:
+    return next(task for task in state.current_day_info.tasks if task.id == task_id)
+
+
+# 1. Создать задачу, сделать ее ежедневной и отметить выполненной.
+#    ОР: В текущем дне задача отмечена выполненной и осталась активной.
+# 2. Перелистнуть день.
+#    ОР: Задача есть в новом дне и не отмечена выполненной.
+# 3. Отметить задачу выполненной в новом дне.
+#    ОР: История выполнения содержит оба дня.
+def test_daily_task_is_done_per_day(service_client: ServiceClient, task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    service_client.make_task_daily(task.id)
+
+    done_task = service_client.mark_task_done_today(task.id)
+    assert (done_task.status, done_task.done_today) == (TaskStatus.active, True)
+    first_day_state = service_client.get_current_state()
+    assert _day_task(first_day_state, task.id).done_today is True
+
+    second_day_state = service_client.set_next_day()
+    second_day_task = _day_task(second_day_state, task.id)
+    assert second_day_task.done_today is False
+    assert second_day_task.day_id == second_day_state.current_day_info.id
+
+    service_client.mark_task_done_today(task.id)
+    completions = service_client.get_task_completions(task.id)
+    assert [day.id for day in completions.days] == [first_day_state.current_day_info.id,
+                                                    second_day_state.current_day_info.id]
+
+
+def test_unmark_daily_task_done(service_client: ServiceClient, task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    service_client.make_task_daily(task.id)
+    service_client.mark_task_done_today(task.id)
+
+    undone_task = service_client.unmark_task_done_today(task.id)
+
+    assert undone_task.done_today is False
+    assert _day_task(service_client.get_current_state(), task.id).done_today is False
+    assert service_client.get_task_completions(task.id).days == []
+
+
+def test_mark_daily_task_done_twice_fails(service_client: ServiceClient,
+                                          task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    service_client.make_task_daily(task.id)
+    service_client.mark_task_done_today(task.id)
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.mark_task_done_today(task.id)
+
+    assert exc_info.value.response.status_code == 400
+    assert 'is already done today' in exc_info.value.response.json()['error']
+
+
+def test_mark_one_time_task_done_fails(service_client: ServiceClient,
+                                       task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.mark_task_done_today(task.id)
+
+    assert exc_info.value.response.status_code == 400
+    assert 'is not a daily task' in exc_info.value.response.json()['error']
+
+
+def test_mark_non_existent_task_done_fails(service_client: ServiceClient, default_day_state: CurrentStateResponse):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.mark_task_done_today(666)
+
+    assert exc_info.value.response.status_code == 404
+
+
+# Ежедневная задача из прошлого дня меняется в текущем дне без переноса при переходе дня
+def test_daily_task_can_be_changed_in_later_day(service_client: ServiceClient,
+                                                task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    service_client.make_task_daily(task.id)
+    state = service_client.set_next_day(days=3)
+
+    renamed_task = service_client.rename_task(task.id, {'name': 'Полить цветы'})
+    one_time_task = service_client.make_task_one_time(task.id)
+
+    assert renamed_task.day_id == state.current_day_info.id
+    assert (one_time_task.type, one_time_task.day_id) == (TaskType.one_time, state.current_day_info.id)
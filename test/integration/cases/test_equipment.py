@@ -0,0 +1,86 @@
+import httpx
+from fastapi.testclient import TestClient
+from service_client import ServiceClient
+from src.api.handlers_models import *
+
+
+def _create_equipment(test_client: TestClient, name: str, kind: EquipmentKind) -> EquipmentResponse:
+    response = test_client.post("/equipment/", json={'name': name, 'kind': kind.value})
+    response.raise_for_status()
+    return EquipmentResponse.model_validate(response.json())
+
+
+def _start_equipment(test_client: TestClient, equipment_id: int, days: int) -> httpx.Response:
+    return test_client.patch(f"/equipment/{equipment_id}/start", json={'days': days})
+
+
+def _get_ready(test_client: TestClient) -> List[EquipmentResponse]:
+    response = test_client.get("/equipment/ready")
+    response.raise_for_status()
+    return [EquipmentResponse.model_validate(item) for item in response.json()]
+
+
+# 1. Создать бочонок и банку для заготовок, запустить их на 3 и 1 день.
+#    ОР: Оставшиеся дни 3 и 1, готового оборудования нет.
+# 2. Перелистнуть день.
+#    ОР: Банка готова, у бочонка осталось 2 дня.
+# 3. Собрать продукт из банки.
+#    ОР: Банка свободна, готового оборудования нет.
+# 4. Перейти на 2 дня вперед.
+#    ОР: Бочонок готов.
+def test_equipment_timers_follow_day_changes(test_client: TestClient, service_client: ServiceClient):
+    keg = _create_equipment(test_client, 'Бочонок 1', EquipmentKind.keg)
+    jar = _create_equipment(test_client, 'Банка 1', EquipmentKind.preserves_jar)
+    assert keg.days_left is None
+
+    started_keg = EquipmentResponse.model_validate(_start_equipment(test_client, keg.id, 3).json())
+    started_jar = EquipmentResponse.model_validate(_start_equipment(test_client, jar.id, 1).json())
+    assert (started_keg.days_left, started_jar.days_left) == (3, 1)
+    assert _get_ready(test_client) == []
+
+    service_client.set_next_day()
+    ready = _get_ready(test_client)
+    assert [item.id for item in ready] == [jar.id]
+    assert ready[0].days_left == 0
+    all_equipment = [EquipmentResponse.model_validate(item) for item in test_client.get("/equipment/").json()]
+    assert [item.days_left for item in all_equipment] == [2, 0]
+
+    collect_response = test_client.patch(f"/equipment/{jar.id}/collect")
+    collect_response.raise_for_status()
+    assert EquipmentResponse.model_validate(collect_response.json()).days_left is None
+    assert _get_ready(test_client) == []
+
+    service_client.set_next_day(days=2)
+    assert [item.id for item in _get_ready(test_client)] == [keg.id]
+
+
+def test_start_busy_equipment_fails(test_client: TestClient):
+    keg = _create_equipment(test_client, 'Бочонок 1', EquipmentKind.keg)
+    _start_equipment(test_client, keg.id, 3).raise_for_status()
+
+    response = _start_equipment(test_client, keg.id, 1)
+
+    assert response.status_code == 400
+    assert 'is already in use: 3 days left' in response.json()['error']
+
+
+def test_collect_not_ready_equipment_fails(test_client: TestClient):
+    cask = _create_equipment(test_client, 'Бочка 1', EquipmentKind.cask)
+    _start_equipment(test_client, cask.id, 5).raise_for_status()
+
+    response = test_client.patch(f"/equipment/{cask.id}/collect")
+
+    assert response.status_code == 400
+    assert 'is not ready yet: 5 days left' in response.json()['error']
+
+
+def test_equipment_errors(test_client: TestClient):
+    _create_equipment(test_client, 'Кадка 1', EquipmentKind.tub)
+
+    duplicate = test_client.post("/equipment/", json={'name': 'Кадка 1', 'kind': 'tub'})
+    not_found = test_client.patch("/equipment/999/collect")
+    unknown_kind = test_client.post("/equipment/", json={'name': 'Печь', 'kind': 'furnace'})
+
+    assert duplicate.status_code == 409
+    assert not_found.status_code == 404
+    assert unknown_kind.status_code == 422
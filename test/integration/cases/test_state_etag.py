@@ -0,0 +1,89 @@
+from typing import Callable, List
+
+from fastapi.testclient import TestClient
+from src.api.handlers_models import *
+
+
+# 1. Получить текущий день.
+#    ОР: В ответе есть ETag.
+# 2. Повторить запрос с этим ETag в If-None-Match.
+#    ОР: 304 без тела, тот же ETag.
+def test_unchanged_state_returns_not_modified(test_client: TestClient):
+    response = test_client.get("/day/current")
+    response.raise_for_status()
+    etag = response.headers['ETag']
+
+    not_modified = test_client.get("/day/current", headers={'If-None-Match': etag})
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+    assert not_modified.headers['ETag'] == etag
+
+
+def test_weak_and_listed_etags_match(test_client: TestClient):
+    etag = test_client.get("/day/current").headers['ETag']
+
+    weak = test_client.get("/day/current", headers={'If-None-Match': f'W/{etag}'})
+    listed = test_client.get("/day/current", headers={'If-None-Match': f'"other", {etag}'})
+    any_tag = test_client.get("/day/current", headers={'If-None-Match': '*'})
+
+    assert weak.status_code == 304
+    assert listed.status_code == 304
+    assert any_tag.status_code == 304
+
+
+# 1. Получить текущий день и запомнить ETag.
+# 2. Создать задачу, затем запросить текущий день со старым ETag.
+#    ОР: 200, новый ETag, в ответе есть созданная задача.
+def test_write_changes_etag(test_client: TestClient, task_factory: Callable[[int], List[TaskResponse]]):
+    etag = test_client.get("/day/current").headers['ETag']
+    task = task_factory(1)[0]
+
+    response = test_client.get("/day/current", headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    state = CurrentStateResponse.model_validate(response.json())
+    assert [current_task.id for current_task in state.current_day_info.tasks] == [task.id]
+
+
+def test_day_change_returns_etag_of_new_state(test_client: TestClient):
+    etag = test_client.get("/day/current").headers['ETag']
+
+    next_day_response = test_client.post("/day/next")
+    next_day_response.raise_for_status()
+
+    assert next_day_response.headers['ETag'] != etag
+    not_modified = test_client.get("/day/current", headers={'If-None-Match': next_day_response.headers['ETag']})
+    assert not_modified.status_code == 304
+
+
+def test_version_check_does_not_query_tasks(test_client: TestClient, monkeypatch):
+    etag = test_client.get("/day/current").headers['ETag']
+
+    def fail(*args, **kwargs):
+        raise AssertionError('Tasks were queried for an unchanged state')
+
+    monkeypatch.setattr('src.repository.task_repository.TaskRepository.get_active_by_day_id', fail)
+    monkeypatch.setattr('src.repository.task_repository.TaskRepository.get_completed_page', fail)
+
+    response = test_client.get("/day/current", headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+# Провайдеры зависимостей и проверка версии выполняются в цикле событий, без пула потоков Starlette
+def test_not_modified_does_not_use_threadpool(test_client: TestClient, monkeypatch):
+    etag = test_client.get("/day/current").headers['ETag']
+    threadpool_calls = []
+
+    async def spy_run_in_threadpool(func, *args, **kwargs):
+        threadpool_calls.append(getattr(func, '__name__', repr(func)))
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr('fastapi.dependencies.utils.run_in_threadpool', spy_run_in_threadpool)
+    monkeypatch.setattr('fastapi.routing.run_in_threadpool', spy_run_in_threadpool)
+
+    response = test_client.get("/day/current", headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert threadpool_calls == []
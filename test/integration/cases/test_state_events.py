@@ -0,0 +1,75 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from src.api.handlers_models import *
+
+
+# Поток событий бесконечный, поэтому приложение вызывается напрямую через ASGI: события читаются по мере отправки,
+# а после нужного числа событий клиент отключается
+async def _read_state_events(test_client: TestClient, events_count: int, requests: List[tuple]) -> List[dict]:
+    app = test_client.app
+    sent = asyncio.Queue()
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        await sent.put(message)
+
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+             'path': '/day/events', 'raw_path': b'/day/events', 'root_path': '', 'query_string': b'',
+             'headers': [], 'client': ('test', 1), 'server': ('test', 80)}
+    app_task = asyncio.create_task(app(scope, receive, send))
+
+    start = await asyncio.wait_for(sent.get(), 5)
+    assert start['status'] == 200
+    assert (b'content-type', b'text/event-stream; charset=utf-8') in start['headers']
+
+    events = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        while len(events) < events_count:
+            message = await asyncio.wait_for(sent.get(), 5)
+            event = dict(line.split(': ', 1) for line in message['body'].decode().strip().split('\n'))
+            events.append(event)
+            if requests:
+                method, url, kwargs = requests.pop(0)
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+
+    disconnected.set()
+    await asyncio.wait_for(app_task, 5)
+    return events
+
+
+# 1. Подписаться на события.
+#    ОР: Сразу приходит событие с текущей версией.
+# 2. Создать задачу, затем перелистнуть день.
+#    ОР: После каждой записи приходит событие с новой версией и ETag, который совпадает с ETag GET /day/current.
+def test_state_events_follow_writes(test_client: TestClient, default_day_state: CurrentStateResponse):
+    requests = [('POST', '/task/', {'json': {'name': 'Сделать вино'}}), ('POST', '/day/next', {})]
+
+    events = asyncio.run(_read_state_events(test_client, 3, requests))
+
+    assert [event['event'] for event in events] == ['state'] * 3
+    versions = [json.loads(event['data'])['version'] for event in events]
+    assert versions[0] < versions[1] < versions[2]
+    assert json.loads(events[-1]['data'])['etag'] == test_client.get('/day/current').headers['ETag']
+    broadcaster = test_client.app.state.state_broadcaster
+    assert broadcaster.subscribers_count == 0, 'Disconnected client must be unsubscribed'
+
+
+def test_too_many_subscribers(test_client: TestClient, default_day_state: CurrentStateResponse, monkeypatch):
+    broadcaster = test_client.app.state.state_broadcaster
+    monkeypatch.setattr(broadcaster, 'max_subscribers', 0)
+
+    response = test_client.get('/day/events')
+
+    assert response.status_code == 503
+    assert 'Too many subscribers' in response.json()['error']
@@ -0,0 +1,44 @@
+import sqlite3
+from typing import Callable, List
+
+from service_client import ServiceClient
+from src.api.handlers_models import *
+
+
+# 1. Получить текущий день, затем изменить задачу в БД в обход API.
+# 2. Снова получить текущий день.
+#    ОР: Ответ взят из снимка текущей версии состояния и не изменился.
+# 3. Завершить другую задачу через API и получить текущий день.
+#    ОР: Версия состояния увеличилась, ответ построен заново и содержит оба изменения.
+def test_current_state_is_served_from_snapshot_until_write(service_client: ServiceClient, test_db_path: str,
+                                                           task_factory: Callable[[int], List[TaskResponse]]):
+    first_task, second_task = task_factory(2)
+    first_response = service_client.client.get("/day/current")
+    first_response.raise_for_status()
+
+    with sqlite3.connect(test_db_path) as conn:
+        conn.execute("UPDATE tasks SET name = 'Изменено в обход API' WHERE id = ?", (first_task.id,))
+        conn.commit()
+
+    second_response = service_client.client.get("/day/current")
+    assert second_response.content == first_response.content
+
+    service_client.complete_task(second_task.id)
+    state = service_client.get_current_state()
+
+    assert [task.name for task in state.current_day_info.tasks] == ['Изменено в обход API']
+    assert [task.id for task in state.all_completed_tasks] == [second_task.id]
+
+
+def test_snapshots_are_kept_per_completed_tasks_mode(service_client: ServiceClient,
+                                                     task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    service_client.complete_task(task.id)
+
+    page_state = service_client.get_current_state()
+    count_state = service_client.get_current_state(completed_tasks=CompletedTasksMode.count)
+
+    assert len(page_state.all_completed_tasks) == 1
+    assert page_state.completed_tasks_count is None
+    assert count_state.all_completed_tasks == []
+    assert count_state.completed_tasks_count == 1
@@ -0,0 +1,106 @@
+import pytest
+from typing import Callable, List
+import httpx
+from service_client import ServiceClient
+from src.api.handlers_models import *
+
+
+def _active_task_ids(state: CurrentStateResponse) -> List[int]:
+    return [task.id for task in state.current_day_info.tasks]
+
+
+def _completed_task_ids(state: CurrentStateResponse) -> List[int]:
+    return [task.id for task in state.all_completed_tasks]
+
+
+# 1. Создать задачи на 1 день, на 2 дня и бессрочную.
+# 2. Перелистнуть день.
+#    ОР: Задача на 1 день завершена, остальные показываются в новом дне и остаются в дне создания.
+# 3. Перелистнуть день.
+#    ОР: Задача на 2 дня завершена, бессрочная осталась активной.
+def test_tasks_expire_after_duration(service_client: ServiceClient):
+    one_day_task = service_client.create_task({'name': 'Полить грядки'})
+    two_days_task = service_client.create_task({'name': 'Построить сарай', 'duration': 2})
+    endless_task = service_client.create_task({'name': 'Найти золотой свиток', 'duration': None})
+    assert (one_day_task.duration, two_days_task.duration, endless_task.duration) == (1, 2, None)
+    assert two_days_task.due_ordinal == one_day_task.due_ordinal + 1
+    assert endless_task.due_ordinal is None
+
+    state_after_first_day = service_client.set_next_day()
+
+    assert _completed_task_ids(state_after_first_day) == [one_day_task.id]
+    assert _active_task_ids(state_after_first_day) == [two_days_task.id, endless_task.id]
+    assert all(task.day_id == one_day_task.day_id for task in state_after_first_day.current_day_info.tasks)
+
+    state_after_second_day = service_client.set_next_day()
+
+    assert _completed_task_ids(state_after_second_day) == [one_day_task.id, two_days_task.id]
+    assert _active_task_ids(state_after_second_day) == [endless_task.id]
+
+
+# 1. Создать задачу на 2 дня и бессрочную задачу, перелистнуть день.
+# 2. Изменить и завершить задачи во втором дне.
+#    ОР: Задачи второго дня доступны для изменения, переход дня не изменил задачи, которые не истекли.
+def test_multi_day_tasks_can_be_changed_in_later_days(service_client: ServiceClient):
+    two_days_task = service_client.create_task({'name': 'Построить сарай', 'duration': 2})
+    endless_task = service_client.create_task({'name': 'Найти золотой свиток', 'duration': None})
+    changes_cursor = service_client.get_current_state().changes_cursor
+
+    state = service_client.set_next_day()
+    assert state.current_day_info.id != endless_task.day_id
+
+    changed_task_ids = {change.entity_id for change in service_client.get_changes(cursor=changes_cursor).changes
+                        if change.entity == ChangeEntity.task}
+    assert changed_task_ids == set(), 'Tasks that did not expire were changed by the day transition'
+    renamed_task = service_client.rename_task(endless_task.id, {'name': 'Найти все золотые свитки'})
+    assert renamed_task.day_id == endless_task.day_id
+    completed_task = service_client.complete_task(two_days_task.id)
+    assert completed_task.status == TaskStatus.completed
+    assert _active_task_ids(service_client.get_current_state()) == [endless_task.id]
+
+
+def test_jump_over_several_days_expires_all_due_tasks(service_client: ServiceClient):
+    two_days_task = service_client.create_task({'name': 'Построить сарай', 'duration': 2})
+    five_days_task = service_client.create_task({'name': 'Собрать урожай', 'duration': 5})
+
+    state = service_client.set_next_day(days=3)
+
+    assert _completed_task_ids(state) == [two_days_task.id]
+    assert _active_task_ids(state) == [five_days_task.id]
+
+
+# 1. Создать задачу на 1 день и сделать ее бессрочной.
+#    ОР: Задача не завершается при переходе дня.
+# 2. Установить задаче срок 1 день.
+#    ОР: Задача завершается при следующем переходе дня.
+def test_set_task_duration(service_client: ServiceClient, task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+
+    endless_task = service_client.set_task_duration(task.id, None)
+    assert (endless_task.duration, endless_task.due_ordinal) == (None, None)
+    state = service_client.set_next_day()
+    assert _active_task_ids(state) == [task.id]
+
+    one_day_task = service_client.set_task_duration(task.id, 1)
+    assert one_day_task.duration == 1
+    state = service_client.set_next_day()
+    assert _completed_task_ids(state) == [task.id]
+
+
+def test_set_duration_of_daily_task_fails(service_client: ServiceClient,
+                                          task_factory: Callable[[int], List[TaskResponse]]):
+    task = task_factory(1)[0]
+    service_client.make_task_daily(task.id)
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.set_task_duration(task.id, 3)
+
+    assert exc_info.value.response.status_code == 400
+    assert 'Only \'one-time\' tasks have a duration' in exc_info.value.response.json()['error']
+
+
+@pytest.mark.parametrize('duration', [0, -1], ids=['zero', 'negative'])
+def test_create_task_with_invalid_duration(service_client: ServiceClient, duration: int):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        service_client.create_task({'name': 'Полить грядки', 'duration': duration})
+    assert exc_info.value.response.status_code == 422
@@ -0,0 +1,92 @@
+import pytest
+from pathlib import Path
+
+from src.entities.day_entities import Day
+from src.entities.task_entities import Task
+from src.migration import create_database_and_tables
+from src.repository.change_log_repository import ChangeLogRepository
+from src.repository.day_repository import DayRepository
+from src.repository.task_repository import TaskRepository
+
+
+@pytest.fixture
+def get_test_db_path(tmp_path: Path) -> str:
+    test_db_path = tmp_path / "test_change_log_db.sqlite"
+    create_database_and_tables(str(test_db_path))
+    return str(test_db_path)
+
+
+@pytest.fixture
+def change_log_repo(get_test_db_path: str) -> ChangeLogRepository:
+    return ChangeLogRepository(get_test_db_path)
+
+
+@pytest.fixture
+def task_repo(get_test_db_path: str) -> TaskRepository:
+    return TaskRepository(get_test_db_path)
+
+
+@pytest.fixture
+def day_repo(get_test_db_path: str) -> DayRepository:
+    return DayRepository(get_test_db_path)
+
+
+def test_initial_day_is_logged(change_log_repo: ChangeLogRepository):
+    changes = change_log_repo.get_since(0, 10)
+
+    assert [(change.seq, change.entity, change.entity_id, change.action) for change in changes] == [
+        (1, 'day', 1, 'insert')]
+    assert changes[0].data == {'id': 1, 'year': 1, 'season': 'spring', 'number': 1, 'active': 1, 'ordinal': 113}
+    assert change_log_repo.get_last_seq() == 1
+
+
+def test_task_mutations_are_logged_with_row_state(change_log_repo: ChangeLogRepository, task_repo: TaskRepository):
+    last_seq = change_log_repo.get_last_seq()
+    task = task_repo.insert(Task(name='Make the wine', day_id=1, type='one-time', status='active'))
+    task_repo.complete_in_day(task.id, 1)
+
+    changes = change_log_repo.get_since(last_seq, 10)
+
+    assert [(change.entity, change.entity_id, change.action) for change in changes] == [
+        ('task', task.id, 'insert'), ('task', task.id, 'update')]
+    assert changes[1].data == {'id': task.id, 'name': 'Make the wine', 'day_id': 1, 'type': 'one-time',
+                               'status': 'completed', 'duration': 1, 'due_ordinal': 113}
+    assert changes[0].seq < changes[1].seq
+
+
+def test_daily_completions_are_logged(change_log_repo: ChangeLogRepository, task_repo: TaskRepository):
+    task = task_repo.insert(Task(name='Water the garden', day_id=1, type='daily', status='active'))
+    last_seq = change_log_repo.get_last_seq()
+
+    task_repo.add_daily_completion(task.id, 1)
+    task_repo.remove_daily_completion(task.id, 1)
+
+    changes = change_log_repo.get_since(last_seq, 10)
+    assert [(change.entity, change.action, change.data) for change in changes] == [
+        ('task_completion', 'insert', {'task_id': task.id, 'day_id': 1}),
+        ('task_completion', 'delete', {'task_id': task.id, 'day_id': 1}),
+    ]
+
+
+def test_rolled_back_mutation_is_not_logged(change_log_repo: ChangeLogRepository, day_repo: DayRepository):
+    last_seq = change_log_repo.get_last_seq()
+
+    with pytest.raises(ValueError):
+        with day_repo.transaction():
+            day_repo.set_activity(1, False)
+            day_repo.insert(Day(year=1, season='spring', number=2, active=True))
+            raise ValueError('broken transition')
+
+    assert change_log_repo.get_since(last_seq, 10) == []
+    assert change_log_repo.get_last_seq() == last_seq
+
+
+def test_get_since_returns_page_after_cursor(change_log_repo: ChangeLogRepository, task_repo: TaskRepository):
+    for number in range(5):
+        task_repo.insert(Task(name=f'Task {number}', day_id=1, type='one-time', status='active'))
+
+    first_page = change_log_repo.get_since(0, 3)
+    second_page = change_log_repo.get_since(first_page[-1].seq, 3)
+
+    assert [change.seq for change in first_page + second_page] == [1, 2, 3, 4, 5, 6]
+    assert change_log_repo.get_since(6, 3) == []
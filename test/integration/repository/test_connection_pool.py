@@ -0,0 +1,177 @@
+import pytest
+import sqlite3
+import threading
+from pathlib import Path
+
+from src.errors import InternalException, TooManyDetachedConnectionsException
+from src.repository.connection_pool import ConnectionPool, get_pool
+from src.repository.storage_profile import StorageProfile
+from src.migration import create_database_and_tables
+
+
+@pytest.fixture
+def get_test_db_path(tmp_path: Path) -> str:
+    test_db_path = tmp_path / "test_pool_db.sqlite"
+    create_database_and_tables(str(test_db_path))
+    return str(test_db_path)
+
+
+@pytest.fixture
+def pool(get_test_db_path: str) -> ConnectionPool:
+    test_pool = ConnectionPool(get_test_db_path, size=2, timeout=0.1)
+    yield test_pool
+    test_pool.close()
+
+
+def test_get_pool_returns_shared_pool_for_same_path(get_test_db_path: str):
+    assert get_pool(get_test_db_path) is get_pool(get_test_db_path), 'Repositories of one database must share a pool'
+
+
+def test_connection_is_reused_between_calls(pool: ConnectionPool):
+    with pool.connection() as conn1:
+        pass
+    with pool.connection() as conn2:
+        pass
+    assert conn1 is conn2, 'Connection was not returned to the pool'
+
+
+def test_nested_connection_in_same_thread_is_shared(pool: ConnectionPool):
+    with pool.connection() as outer_conn:
+        with pool.connection() as inner_conn:
+            assert inner_conn is outer_conn, 'Nested call got another connection'
+
+
+def test_each_thread_gets_its_own_connection(pool: ConnectionPool):
+    connections = []
+    barrier = threading.Barrier(2)
+
+    def worker():
+        with pool.connection() as conn:
+            connections.append(conn)
+            barrier.wait(timeout=1)
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(connections) == 2
+    assert connections[0] is not connections[1], 'Concurrent threads shared one connection'
+
+
+def test_exhausted_pool_raises_internal_exception(pool: ConnectionPool):
+    occupied = threading.Barrier(pool.size + 1)
+    release = threading.Event()
+
+    def worker():
+        with pool.connection():
+            occupied.wait(timeout=1)
+            release.wait(timeout=1)
+
+    threads = [threading.Thread(target=worker) for _ in range(pool.size)]
+    for thread in threads:
+        thread.start()
+    occupied.wait(timeout=1)
+    try:
+        with pytest.raises(InternalException) as exc_info:
+            with pool.connection():
+                pass
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert 'No free database connection' in str(exc_info.value)
+
+
+def test_changes_are_rolled_back_on_exception(pool: ConnectionPool):
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("UPDATE days SET active = 0 WHERE id = 1")
+            raise RuntimeError('boom')
+
+    with pool.connection() as conn:
+        active = conn.execute("SELECT active FROM days WHERE id = 1").fetchone()[0]
+    assert active == 1, 'Changes were committed despite the exception'
+
+
+def test_broken_connection_is_replaced_by_health_check(pool: ConnectionPool):
+    with pool.connection() as conn:
+        pass
+    conn.close()
+
+    with pool.connection() as new_conn:
+        assert new_conn is not conn, 'Closed connection was handed out again'
+        assert new_conn.execute('SELECT 1').fetchone()[0] == 1
+
+
+def test_transaction_commits_once_at_the_end(pool: ConnectionPool, get_test_db_path: str):
+    with pool.transaction() as conn:
+        conn.execute("UPDATE days SET number = 2 WHERE id = 1")
+        with pool.transaction() as nested_conn:
+            assert nested_conn is conn, 'Nested transaction got another connection'
+            nested_conn.execute("UPDATE days SET year = 2 WHERE id = 1")
+        with sqlite3.connect(get_test_db_path) as other_conn:
+            row = other_conn.execute("SELECT year, number FROM days WHERE id = 1").fetchone()
+        assert row == (1, 1), 'Changes became visible before the transaction ended'
+
+    with sqlite3.connect(get_test_db_path) as other_conn:
+        row = other_conn.execute("SELECT year, number FROM days WHERE id = 1").fetchone()
+    assert row == (2, 2), 'Transaction was not committed'
+
+
+def test_transaction_takes_write_lock_immediately(get_test_db_path: str):
+    profile = StorageProfile(journal_mode='WAL', synchronous='NORMAL', mmap_size=0,
+                             cache_size=-2000, temp_store='MEMORY', busy_timeout=0)
+    pool = ConnectionPool(get_test_db_path, size=2, profile=profile)
+    locked = threading.Event()
+    release = threading.Event()
+
+    def writer():
+        with pool.transaction():
+            locked.set()
+            release.wait(timeout=1)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    locked.wait(timeout=1)
+    try:
+        with pytest.raises(sqlite3.OperationalError) as exc_info:
+            with pool.transaction():
+                pass
+    finally:
+        release.set()
+        thread.join()
+        pool.close()
+
+    assert 'locked' in str(exc_info.value)
+
+
+def test_detached_connections_do_not_take_pool_connections(get_test_db_path: str):
+    pool = ConnectionPool(get_test_db_path, size=1, timeout=0.1, max_detached=2)
+    try:
+        with pool.detached_connection(), pool.detached_connection():
+            with pool.connection() as conn:
+                assert conn.execute('SELECT COUNT(*) FROM days').fetchone()[0] == 1
+    finally:
+        pool.close()
+
+
+def test_detached_connections_are_limited(get_test_db_path: str):
+    pool = ConnectionPool(get_test_db_path, size=1, max_detached=1)
+    try:
+        with pool.detached_connection():
+            with pytest.raises(TooManyDetachedConnectionsException):
+                with pool.detached_connection():
+                    pass
+        with pool.detached_connection():
+            pass
+    finally:
+        pool.close()
+
+
+def test_detached_connection_is_read_only(pool: ConnectionPool):
+    with pool.detached_connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("UPDATE days SET number = 2")
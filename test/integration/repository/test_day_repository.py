@@ -3,7 +3,7 @@ import sqlite3
 from pathlib import Path
 
 from src.errors import MultipleActiveDaysException, DuplicateDayException
-from src.repository.day_repository import DayRepository
+from src.repository.day_repository import DayRepository, day_row_factory
 from src.entities.day_entities import Day
 from src.migration import create_database_and_tables
 
@@ -178,10 +178,61 @@ def test_set_activity_on_non_existent_day(repo_with_initial_day: DayRepository):
     assert repo_with_initial_day.get_active().id == 1, 'Initial day changed its id'
 
 
-def test_get_active_raises_multiple_active_days_exception(repo_with_multiple_days_data: DayRepository):
+def test_second_active_day_raises_multiple_active_days_exception(repo_with_multiple_days_data: DayRepository):
     day_to_make_activ = repo_with_multiple_days_data.get_by_attributes(year=3, season='winter', number=27)
     assert day_to_make_activ is not None, 'Day to make activ was not found'
-    repo_with_multiple_days_data.set_activity(day_to_make_activ.id, True)
     with pytest.raises(MultipleActiveDaysException) as exception_message:
-        repo_with_multiple_days_data.get_active()
+        repo_with_multiple_days_data.set_activity(day_to_make_activ.id, True)
     assert 'Multiple active days' in str(exception_message.value), 'Exception message missmatch'
+    assert repo_with_multiple_days_data.get_active().id == 1, 'Active day was changed'
+    assert repo_with_multiple_days_data.get_by_id(day_to_make_activ.id).active is False
+
+
+def test_insert_second_active_day_raises_multiple_active_days_exception(repo_with_initial_day: DayRepository):
+    with pytest.raises(MultipleActiveDaysException):
+        repo_with_initial_day.insert(Day(year=1, season='spring', number=2, active=True))
+    assert repo_with_initial_day.get_by_attributes(1, 'spring', 2) is None, 'Second active day was created'
+
+
+def test_day_row_factory_can_be_set_on_connection(get_test_db_path: str):
+    with sqlite3.connect(get_test_db_path) as conn:
+        conn.row_factory = day_row_factory
+        found_day = conn.execute('SELECT id, year, season, number, active FROM days WHERE id = 1').fetchone()
+
+    assert found_day == Day(year=1, season='spring', number=1, active=True, day_id=1)
+    assert found_day.active is True
+    assert not hasattr(found_day, '__dict__'), 'Day should not allocate a per-instance __dict__'
+
+
+def test_get_by_ordinal_range(repo_with_multiple_days_data: DayRepository):
+    days_in_range = repo_with_multiple_days_data.get_by_ordinal_range(Day(1, 'spring', 2, False).ordinal,
+                                                                      Day(3, 'winter', 27, False).ordinal)
+
+    assert [(day.year, day.season, day.number) for day in days_in_range] == [
+        (1, 'spring', 2),
+        (1, 'summer', 15),
+        (1, 'summer', 28),
+        (3, 'winter', 27),
+    ]
+
+
+def test_get_by_ordinal(repo_with_multiple_days_data: DayRepository):
+    day = repo_with_multiple_days_data.get_by_ordinal(Day(4, 'autumn', 4, False).ordinal)
+
+    _compare_day_objects_without_id(day, Day(year=4, season='autumn', number=4, active=False))
+    assert repo_with_multiple_days_data.get_by_ordinal(Day(9, 'spring', 1, False).ordinal) is None
+
+
+def test_get_completion_days(repo_with_multiple_days_data: DayRepository):
+    with sqlite3.connect(repo_with_multiple_days_data.connection_string) as conn:
+        conn.executemany("INSERT INTO task_completions (task_id, day_id) VALUES (?, ?)",
+                         [(1, 5), (1, 2), (1, 6), (2, 3)])
+
+    completion_days = repo_with_multiple_days_data.get_completion_days(1)
+
+    assert [(day.year, day.season, day.number) for day in completion_days] == [
+        (1, 'spring', 2),
+        (3, 'winter', 27),
+        (4, 'autumn', 4),
+    ]
+    assert repo_with_multiple_days_data.get_completion_days(666) == []
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.repository.db_executor import DbExecutor
+
+
+@pytest.fixture
+def db_executor() -> DbExecutor:
+    executor = DbExecutor(size=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_call_runs_in_db_thread(db_executor: DbExecutor):
+    thread_name = asyncio.run(db_executor.run(lambda: threading.current_thread().name))
+
+    assert thread_name.startswith('db')
+
+
+def test_exception_is_raised_in_caller(db_executor: DbExecutor):
+    def fail():
+        raise ValueError('broken call')
+
+    with pytest.raises(ValueError) as exc_info:
+        asyncio.run(db_executor.run(fail))
+    assert 'broken call' in str(exc_info.value)
+
+
+def test_concurrent_calls_are_limited_by_size(db_executor: DbExecutor):
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def slow_call():
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    async def run_many():
+        await asyncio.gather(*(db_executor.run(slow_call) for _ in range(6)))
+
+    asyncio.run(run_many())
+
+    assert max_running == db_executor.size
+
+
+def test_invalid_size_raises_value_error():
+    with pytest.raises(ValueError) as exc_info:
+        DbExecutor(size=0)
+    assert 'Executor size must be a positive integer' in str(exc_info.value)
@@ -0,0 +1,89 @@
+import pytest
+import sqlite3
+from pathlib import Path
+
+from src.errors import DuplicateEquipmentNameException
+from src.repository.equipment_repository import EquipmentRepository
+from src.entities.equipment_entities import Equipment
+from src.migration import create_database_and_tables
+
+
+@pytest.fixture
+def get_test_db_path(tmp_path: Path) -> str:
+    test_db_path = tmp_path / "test_equipment_db.sqlite"
+    create_database_and_tables(str(test_db_path))
+    return str(test_db_path)
+
+
+@pytest.fixture
+def test_repo(get_test_db_path: str) -> EquipmentRepository:
+    return EquipmentRepository(connection_string=get_test_db_path)
+
+
+@pytest.fixture
+def repo_with_equipment(test_repo: EquipmentRepository) -> tuple[EquipmentRepository, list[Equipment]]:
+    equipment = [
+        Equipment(name='Keg 1', kind='keg', ready_ordinal=120),
+        Equipment(name='Keg 2', kind='keg'),
+        Equipment(name='Cask 1', kind='cask', ready_ordinal=170),
+        Equipment(name='Jar 1', kind='preserves_jar', ready_ordinal=115),
+        Equipment(name='Jar 2', kind='preserves_jar', ready_ordinal=120),
+    ]
+    for item in equipment:
+        test_repo.insert(item)
+    return test_repo, equipment
+
+
+def test_insert_and_get_by_id(test_repo: EquipmentRepository):
+    equipment = test_repo.insert(Equipment(name='Tub 1', kind='tub'))
+
+    assert test_repo.get_by_id(equipment.id) == equipment
+    assert test_repo.get_by_id(100) is None
+
+
+def test_insert_duplicate_name_fails(test_repo: EquipmentRepository):
+    test_repo.insert(Equipment(name='Keg 1', kind='keg'))
+
+    with pytest.raises(DuplicateEquipmentNameException) as exc_info:
+        test_repo.insert(Equipment(name='Keg 1', kind='cask'))
+    assert 'Equipment with name "Keg 1" already exists' in str(exc_info.value)
+
+
+def test_get_ready_returns_equipment_ready_by_day(repo_with_equipment: tuple[EquipmentRepository, list[Equipment]]):
+    repo, equipment = repo_with_equipment
+
+    ready_equipment = repo.get_ready(120)
+
+    assert [item.name for item in ready_equipment] == ['Jar 1', 'Keg 1', 'Jar 2']
+    assert repo.get_ready(114) == []
+
+
+def test_start_only_empty_equipment(repo_with_equipment: tuple[EquipmentRepository, list[Equipment]]):
+    repo, equipment = repo_with_equipment
+    empty_keg, busy_keg = equipment[1], equipment[0]
+
+    started_keg = repo.start(empty_keg.id, 130)
+
+    assert started_keg.ready_ordinal == 130
+    assert repo.start(busy_keg.id, 130) is None
+    assert repo.get_by_id(busy_keg.id).ready_ordinal == busy_keg.ready_ordinal
+
+
+def test_collect_only_ready_equipment(repo_with_equipment: tuple[EquipmentRepository, list[Equipment]]):
+    repo, equipment = repo_with_equipment
+    ready_jar, cask = equipment[3], equipment[2]
+
+    collected_jar = repo.collect(ready_jar.id, 115)
+
+    assert collected_jar.ready_ordinal is None
+    assert repo.collect(cask.id, 115) is None
+    assert repo.get_by_id(cask.id).ready_ordinal == cask.ready_ordinal
+
+
+def test_ready_query_uses_index(get_test_db_path: str):
+    with sqlite3.connect(get_test_db_path) as conn:
+        rows = conn.execute('EXPLAIN QUERY PLAN SELECT * FROM equipment WHERE ready_ordinal <= ? '
+                            'ORDER BY ready_ordinal, id', (120,)).fetchall()
+    plan = ' '.join(row[-1] for row in rows)
+    assert 'equipment_ready_ordinal_index' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,171 @@
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.entities.task_entities import Task
+from src.errors import DuplicateTaskNameException
+from src.migration import create_database_and_tables
+from src.repository.connection_pool import close_all_pools
+from src.repository.db_executor import DbExecutor
+from src.repository.group_commit import GroupCommitWriter
+from src.repository.task_repository import TaskRepository
+
+
+@pytest.fixture
+def task_repo(tmp_path: Path) -> TaskRepository:
+    test_db_path = str(tmp_path / "test_group_commit_db.sqlite")
+    create_database_and_tables(test_db_path)
+    yield TaskRepository(test_db_path)
+    close_all_pools()
+
+
+@pytest.fixture
+def groups() -> list:
+    return []
+
+
+@pytest.fixture
+def started_groups() -> list:
+    return []
+
+
+@pytest.fixture
+def writer_factory(task_repo: TaskRepository, groups: list, started_groups: list):
+    writers = []
+
+    def _writer_factory(max_batch_size: int = 64, window: float = 0.2) -> GroupCommitWriter:
+        writer = GroupCommitWriter(task_repo.pool, max_batch_size=max_batch_size, window=window,
+                                   on_group_start=lambda: started_groups.append(threading.current_thread().name),
+                                   on_group_done=lambda: groups.append(threading.current_thread().name))
+        writers.append(writer)
+        return writer
+
+    yield _writer_factory
+    for writer in writers:
+        writer.stop()
+
+
+def _insert_task(task_repo: TaskRepository, name: str) -> Task:
+    return task_repo.insert(Task(name=name, day_id=1, type='one-time', status='active'))
+
+
+def _committed_task_names(task_repo: TaskRepository) -> list:
+    with sqlite3.connect(task_repo.connection_string) as conn:
+        return [row[0] for row in conn.execute('SELECT name FROM tasks ORDER BY id')]
+
+
+def test_calls_are_committed_in_one_group(task_repo: TaskRepository, writer_factory, groups: list):
+    writer = writer_factory()
+
+    futures = [writer.submit(_insert_task, task_repo, f'Task {number}') for number in range(5)]
+
+    assert [future.result(timeout=5).name for future in futures] == [f'Task {number}' for number in range(5)]
+    assert _committed_task_names(task_repo) == [f'Task {number}' for number in range(5)]
+    assert groups == ['db-writer'], 'Calls submitted within the window should be committed together'
+
+
+def test_failed_call_does_not_roll_back_other_calls(task_repo: TaskRepository, writer_factory):
+    writer = writer_factory()
+
+    first = writer.submit(_insert_task, task_repo, 'Make the wine')
+    duplicate = writer.submit(_insert_task, task_repo, 'Make the wine')
+    last = writer.submit(_insert_task, task_repo, 'Water the garden')
+
+    with pytest.raises(DuplicateTaskNameException):
+        duplicate.result(timeout=5)
+    assert first.result(timeout=5).name == 'Make the wine'
+    assert last.result(timeout=5).name == 'Water the garden'
+    assert _committed_task_names(task_repo) == ['Make the wine', 'Water the garden']
+
+
+def test_failed_call_changes_are_rolled_back(task_repo: TaskRepository, writer_factory):
+    writer = writer_factory()
+
+    def insert_and_fail():
+        _insert_task(task_repo, 'Make the wine')
+        raise ValueError('broken call')
+
+    with pytest.raises(ValueError):
+        writer.submit(insert_and_fail).result(timeout=5)
+    assert _committed_task_names(task_repo) == []
+
+
+def test_group_without_successful_calls_is_not_reported(task_repo: TaskRepository, writer_factory, groups: list,
+                                                         started_groups: list):
+    writer = writer_factory(window=0)
+    _insert_task(task_repo, 'Make the wine')
+
+    with pytest.raises(DuplicateTaskNameException):
+        writer.submit(_insert_task, task_repo, 'Make the wine').result(timeout=5)
+
+    assert started_groups == ['db-writer']
+    assert groups == [], 'Group without committed changes was reported as done'
+
+
+def test_committed_changes_are_visible_when_group_is_reported(task_repo: TaskRepository):
+    visible_task_names = []
+    writer = GroupCommitWriter(task_repo.pool, window=0,
+                               on_group_done=lambda: visible_task_names.extend(_committed_task_names(task_repo)))
+    try:
+        writer.submit(_insert_task, task_repo, 'Make the wine').result(timeout=5)
+    finally:
+        writer.stop()
+
+    assert visible_task_names == ['Make the wine']
+
+
+def test_failed_group_start_fails_calls(task_repo: TaskRepository):
+    def fail():
+        raise RuntimeError('group start failed')
+
+    writer = GroupCommitWriter(task_repo.pool, window=0, on_group_start=fail)
+    try:
+        with pytest.raises(RuntimeError):
+            writer.submit(_insert_task, task_repo, 'Make the wine').result(timeout=5)
+    finally:
+        writer.stop()
+
+    assert _committed_task_names(task_repo) == []
+
+
+def test_group_size_is_limited(task_repo: TaskRepository, writer_factory, groups: list):
+    writer = writer_factory(max_batch_size=2)
+
+    futures = [writer.submit(_insert_task, task_repo, f'Task {number}') for number in range(5)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert len(groups) >= 3
+
+
+def test_stop_executes_submitted_calls(task_repo: TaskRepository, writer_factory):
+    writer = writer_factory(window=0)
+    future = writer.submit(_insert_task, task_repo, 'Make the wine')
+
+    writer.stop()
+
+    assert future.result(timeout=0).name == 'Make the wine'
+    with pytest.raises(RuntimeError):
+        writer.submit(_insert_task, task_repo, 'Water the garden')
+
+
+def test_executor_write_goes_through_writer(writer_factory):
+    executor = DbExecutor(size=1)
+    executor.set_writer(writer_factory(window=0))
+    try:
+        thread_name = asyncio.run(executor.write(lambda: threading.current_thread().name))
+        read_thread_name = asyncio.run(executor.run(lambda: threading.current_thread().name))
+    finally:
+        executor.set_writer(None)
+        executor.shutdown()
+
+    assert thread_name == 'db-writer'
+    assert read_thread_name.startswith('db_')
+
+
+def test_invalid_batch_size_raises_value_error(task_repo: TaskRepository):
+    with pytest.raises(ValueError):
+        GroupCommitWriter(task_repo.pool, max_batch_size=0)
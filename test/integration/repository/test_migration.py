@@ -0,0 +1,135 @@
+import pytest
+import sqlite3
+from pathlib import Path
+
+from src.game_calendar import to_ordinal
+from src.migration import create_database_and_tables, migrations, get_schema_version, migrate
+
+
+@pytest.fixture
+def get_test_db_path(tmp_path: Path) -> str:
+    test_db_path = tmp_path / "test_migration_db.sqlite"
+    create_database_and_tables(str(test_db_path))
+    return str(test_db_path)
+
+
+def _query_plan(db_path: str, sql: str, data: tuple = ()) -> str:
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', data).fetchall()
+    return ' '.join(row[-1] for row in rows)
+
+
+def test_migration_sets_latest_schema_version(get_test_db_path: str):
+    with sqlite3.connect(get_test_db_path) as conn:
+        assert get_schema_version(conn) == len(migrations)
+
+
+def test_up_to_date_schema_is_not_migrated_again(get_test_db_path: str):
+    with sqlite3.connect(get_test_db_path) as conn:
+        conn.execute('DROP INDEX tasks_completed_id_index')
+        conn.commit()
+
+    create_database_and_tables(get_test_db_path)
+
+    with sqlite3.connect(get_test_db_path) as conn:
+        index = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'tasks_completed_id_index'").fetchone()
+    assert index is None, 'Migrations were applied to an up-to-date schema'
+
+
+def test_database_without_version_is_upgraded(tmp_path: Path):
+    test_db_path = str(tmp_path / "legacy_db.sqlite")
+    with sqlite3.connect(test_db_path) as conn:
+        for statement in migrations[0]:
+            conn.execute(statement)
+        conn.execute("INSERT INTO days (year, season, number, active) VALUES (2, 'summer', 3, 1)")
+        conn.execute("INSERT INTO tasks (name, day_id, type, status) VALUES ('Make the wine', 1, 'one-time', 'active')")
+        conn.execute("INSERT INTO tasks (name, day_id, type, status) VALUES ('Water the garden', 1, 'daily', 'active')")
+        conn.commit()
+        assert get_schema_version(conn) == 0
+
+    create_database_and_tables(test_db_path)
+
+    with sqlite3.connect(test_db_path) as conn:
+        assert get_schema_version(conn) == len(migrations)
+        assert conn.execute("SELECT COUNT(*) FROM days").fetchone()[0] == 1, 'Existing data was changed'
+        assert conn.execute("SELECT ordinal FROM days").fetchone()[0] == to_ordinal(2, 'summer', 3), \
+            'Ordinal of existing day was not filled'
+        assert conn.execute("SELECT duration, due_ordinal FROM tasks ORDER BY id").fetchall() == [
+            (1, to_ordinal(2, 'summer', 3)),
+            (1, None),
+        ], 'Existing one-time tasks must last one day'
+
+
+def test_failed_migration_is_rolled_back(get_test_db_path: str, monkeypatch):
+    with sqlite3.connect(get_test_db_path) as conn:
+        version_before = get_schema_version(conn)
+        broken_migration = ['create table broken_table (id INTEGER)', 'this is not sql']
+        monkeypatch.setattr('src.migration.migrations', migrations + [broken_migration])
+
+        with pytest.raises(sqlite3.OperationalError):
+            migrate(conn)
+
+        assert get_schema_version(conn) == version_before
+        table = conn.execute("SELECT name FROM sqlite_master WHERE name = 'broken_table'").fetchone()
+        assert table is None, 'Partially applied migration was not rolled back'
+
+
+def test_unused_tasks_of_day_index_is_dropped(get_test_db_path: str):
+    with sqlite3.connect(get_test_db_path) as conn:
+        index = conn.execute("SELECT name FROM sqlite_master WHERE name = 'tasks_day_id_status_id_index'").fetchone()
+    assert index is None
+
+
+def test_completed_tasks_query_uses_partial_index(get_test_db_path: str):
+    plan = _query_plan(get_test_db_path, "SELECT * FROM tasks WHERE status = 'completed' ORDER BY id")
+    assert 'tasks_completed_id_index' in plan
+
+
+def test_days_range_query_uses_ordinal_index(get_test_db_path: str):
+    plan = _query_plan(get_test_db_path, "SELECT * FROM days WHERE ordinal BETWEEN ? AND ? ORDER BY ordinal",
+                       (113, 140))
+    assert 'days_ordinal_uindex' in plan
+    assert 'TEMP B-TREE' not in plan, 'Days should be read in index order'
+
+
+def test_active_daily_tasks_query_uses_partial_index(get_test_db_path: str):
+    plan = _query_plan(get_test_db_path, "SELECT * FROM tasks WHERE type = 'daily' AND status = 'active' ORDER BY id")
+    assert 'tasks_active_daily_id_index' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_migration_keeps_single_active_day(tmp_path: Path):
+    test_db_path = str(tmp_path / "legacy_db.sqlite")
+    with sqlite3.connect(test_db_path) as conn:
+        for statement in migrations[0]:
+            conn.execute(statement)
+        conn.execute("INSERT INTO days (year, season, number, active) VALUES (1, 'spring', 1, 1)")
+        conn.execute("INSERT INTO days (year, season, number, active) VALUES (1, 'spring', 5, 0)")
+        conn.execute("INSERT INTO days (year, season, number, active) VALUES (1, 'spring', 2, 1)")
+        conn.commit()
+
+    create_database_and_tables(test_db_path)
+
+    with sqlite3.connect(test_db_path) as conn:
+        assert conn.execute("SELECT id FROM days WHERE active = 1").fetchall() == [(3,)], \
+            'Only the last created active day must stay active'
+
+
+def test_active_day_query_uses_partial_index(get_test_db_path: str):
+    plan = _query_plan(get_test_db_path, "SELECT * FROM days WHERE active = 1")
+    assert 'days_single_active_uindex' in plan
+
+
+def test_existing_rows_are_not_logged_on_upgrade(tmp_path: Path):
+    test_db_path = str(tmp_path / "legacy_db.sqlite")
+    with sqlite3.connect(test_db_path) as conn:
+        for statement in migrations[0]:
+            conn.execute(statement)
+        conn.execute("INSERT INTO days (year, season, number, active) VALUES (2, 'summer', 3, 1)")
+        conn.commit()
+
+    create_database_and_tables(test_db_path)
+
+    with sqlite3.connect(test_db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0] == 0
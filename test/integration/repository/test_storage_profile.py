@@ -0,0 +1,67 @@
+import pytest
+import sqlite3
+from pathlib import Path
+
+from src.repository.connection_pool import ConnectionPool
+from src.repository.storage_profile import StorageProfile, get_storage_profile, storage_profiles
+from src.migration import create_database_and_tables
+
+
+@pytest.fixture
+def get_test_db_path(tmp_path: Path) -> str:
+    test_db_path = tmp_path / "test_profile_db.sqlite"
+    create_database_and_tables(str(test_db_path))
+    return str(test_db_path)
+
+
+@pytest.mark.parametrize('profile_name', list(storage_profiles))
+def test_profile_is_applied_to_pool_connections(get_test_db_path: str, profile_name: str):
+    profile = get_storage_profile(profile_name)
+    pool = ConnectionPool(get_test_db_path, size=1, profile=profile)
+    synchronous_levels = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+    temp_stores = {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+    try:
+        with pool.connection() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0].upper() == profile.journal_mode
+            assert synchronous_levels[conn.execute('PRAGMA synchronous').fetchone()[0]] == profile.synchronous
+            assert conn.execute('PRAGMA cache_size').fetchone()[0] == profile.cache_size
+            assert temp_stores[conn.execute('PRAGMA temp_store').fetchone()[0]] == profile.temp_store
+            assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == profile.busy_timeout
+    finally:
+        pool.close()
+
+
+def test_migration_switches_database_to_wal(get_test_db_path: str):
+    with sqlite3.connect(get_test_db_path) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_reader_is_not_blocked_by_writer(get_test_db_path: str):
+    pool = ConnectionPool(get_test_db_path, size=2)
+    try:
+        writer = pool._acquire()
+        writer.execute('BEGIN IMMEDIATE')
+        writer.execute('UPDATE days SET number = 2 WHERE id = 1')
+
+        reader = pool._acquire()
+        number = reader.execute('SELECT number FROM days WHERE id = 1').fetchone()[0]
+        assert number == 1, 'Reader must see the last committed state'
+
+        writer.rollback()
+        pool._release(writer)
+        pool._release(reader)
+    finally:
+        pool.close()
+
+
+def test_unknown_profile_raises_value_error():
+    with pytest.raises(ValueError) as exc_info:
+        get_storage_profile('reckless')
+    assert 'Storage profile must be one of' in str(exc_info.value)
+
+
+def test_invalid_pragma_value_raises_value_error():
+    with pytest.raises(ValueError) as exc_info:
+        StorageProfile(journal_mode='WAL', synchronous='NORMAL; DROP TABLE tasks', mmap_size=0,
+                       cache_size=-2000, temp_store='MEMORY', busy_timeout=5000)
+    assert 'Synchronous must be one of' in str(exc_info.value)
@@ -3,7 +3,9 @@ import sqlite3
 from pathlib import Path
 
 from src.errors import DuplicateTaskNameException
-from src.repository.task_repository import TaskRepository
+from src.repository.day_repository import DayRepository
+from src.repository.task_repository import TaskRepository, task_row_factory
+from src.entities.day_entities import Day
 from src.entities.task_entities import Task
 from src.migration import create_database_and_tables
 
@@ -22,8 +24,13 @@ def get_test_db_path(tmp_path: Path) -> str:
     return str(test_db_path)
 
 
+# Задачи дня выбираются по порядковым номерам дней, поэтому дни задач должны быть в БД.
+# День 1 создается миграцией, дни 2-7 - следующие дни весны, их порядковые номера 114-119
 @pytest.fixture
 def test_repo(get_test_db_path: str) -> TaskRepository:
+    day_repo = DayRepository(get_test_db_path)
+    for number in range(2, 8):
+        day_repo.insert(Day(year=1, season='spring', number=number, active=False))
     return TaskRepository(connection_string=get_test_db_path)
 
 
@@ -128,10 +135,23 @@ def test_get_all_by_day_id_of_non_existent_day(repo_with_one_task: TaskRepositor
     assert len(list_of_found_tasks) == len(expected_tasks_list), 'Expected an empty list'
 
 
-def test_update_field(repo_with_one_task: TaskRepository):
+@pytest.fixture
+def repo_with_two_active_one_time_tasks(test_repo: TaskRepository) -> TaskRepository:
+    tasks = [
+        Task(name='Hug the husband', day_id=2, type='one-time', status='active'),
+        Task(name='Feed animals', day_id=2, type='one-time', status='active')
+    ]
+    for task in tasks:
+        test_repo.insert(task)
+    return test_repo
+
+
+def test_rename_in_day(repo_with_one_task: TaskRepository):
     original_task = repo_with_one_task.get_by_id(1)
-    new_name = 'new task name'
-    repo_with_one_task.update_field(1, 'name', new_name)
+    new_name = 'Updated task name'
+
+    renamed_task = repo_with_one_task.rename_in_day(1, 1, new_name)
+
     changed_task = repo_with_one_task.get_by_id(1)
     expected_changed_task = Task(
         name=new_name,
@@ -140,34 +160,30 @@ def test_update_field(repo_with_one_task: TaskRepository):
         status=original_task.status
     )
     assert changed_task is not None, 'Can\'t find the changed task'
+    assert changed_task == renamed_task, 'Returned task differs from the task in DB'
     assert changed_task.id == original_task.id, 'Task changed its id'
     _compare_task_objects_without_id(changed_task, expected_changed_task)
 
 
-def test_update_field_of_non_existent_task(repo_with_one_task: TaskRepository):
+def test_rename_in_day_of_non_existent_task_do_nothing(repo_with_one_task: TaskRepository):
     task_in_bd = repo_with_one_task.get_by_id(1)
-    new_name = 'new task name'
-    try:
-        repo_with_one_task.update_field(666, 'name', new_name)
-    except Exception as e:
-        pytest.fail('Updating field of non existent task got an exception but it shouldn\'t happen')
+    assert repo_with_one_task.rename_in_day(666, 1, 'Updated task name') is None
     task_in_bd_after_function_call = repo_with_one_task.get_by_id(1)
     assert task_in_bd_after_function_call is not None, 'Task was deleted'
     _compare_task_objects_without_id(task_in_bd_after_function_call, task_in_bd)
 
 
-def test_make_completed(repo_with_two_active_daily_tasks: TaskRepository):
-    task1 = repo_with_two_active_daily_tasks.get_by_id(1)
-    task2 = repo_with_two_active_daily_tasks.get_by_id(2)
-    new_status = 'completed'
-    repo_with_two_active_daily_tasks.make_completed(1)
-    task1_after_completed = repo_with_two_active_daily_tasks.get_by_id(1)
-    task2_after_function_call = repo_with_two_active_daily_tasks.get_by_id(2)
+def test_complete_in_day(repo_with_two_active_one_time_tasks: TaskRepository):
+    task1 = repo_with_two_active_one_time_tasks.get_by_id(1)
+    task2 = repo_with_two_active_one_time_tasks.get_by_id(2)
+    repo_with_two_active_one_time_tasks.complete_in_day(1, 2)
+    task1_after_completed = repo_with_two_active_one_time_tasks.get_by_id(1)
+    task2_after_function_call = repo_with_two_active_one_time_tasks.get_by_id(2)
     expected_task_after_completed = Task(
         name=task1.name,
         day_id=task1.day_id,
         type=task1.type,
-        status=new_status
+        status='completed'
     )
     assert task1_after_completed is not None, 'Completed task was deleted'
     assert task2_after_function_call is not None, 'The neighboring was deleted'
@@ -176,17 +192,16 @@ def test_make_completed(repo_with_two_active_daily_tasks: TaskRepository):
     _compare_task_objects_without_id(task1_after_completed, expected_task_after_completed)
 
 
-def test_make_one_time(repo_with_two_active_daily_tasks: TaskRepository):
+def test_make_one_time_in_day(repo_with_two_active_daily_tasks: TaskRepository):
     task1 = repo_with_two_active_daily_tasks.get_by_id(1)
     task2 = repo_with_two_active_daily_tasks.get_by_id(2)
-    new_type = 'one-time'
-    repo_with_two_active_daily_tasks.make_one_time(2)
+    repo_with_two_active_daily_tasks.make_one_time_in_day(2, 1)
     task1_after_function_call = repo_with_two_active_daily_tasks.get_by_id(1)
     task2_after_changing = repo_with_two_active_daily_tasks.get_by_id(2)
     expected_task_after_changing = Task(
         name=task2.name,
-        day_id=task2.day_id,
-        type=new_type,
+        day_id=1,
+        type='one-time',
         status=task2.status
     )
     assert task1_after_function_call is not None, 'The neighboring was deleted'
@@ -194,19 +209,20 @@ def test_make_one_time(repo_with_two_active_daily_tasks: TaskRepository):
     _compare_task_objects_without_id(task1_after_function_call, task1)
     assert task2_after_changing.id == task2.id, 'Task changed its id'
     _compare_task_objects_without_id(task2_after_changing, expected_task_after_changing)
+    # Срок однодневной задачи отсчитывается от дня 1 (порядковый номер 113)
+    assert task2_after_changing.due_ordinal == 113, 'Due ordinal was not set'
 
 
-def test_make_daily(repo_with_two_completed_one_time_tasks: TaskRepository):
-    task1 = repo_with_two_completed_one_time_tasks.get_by_id(1)
-    task2 = repo_with_two_completed_one_time_tasks.get_by_id(2)
-    new_type = 'daily'
-    repo_with_two_completed_one_time_tasks.make_daily(1)
-    task1_after_changed = repo_with_two_completed_one_time_tasks.get_by_id(1)
-    task2_after_function_call = repo_with_two_completed_one_time_tasks.get_by_id(2)
+def test_make_daily_in_day(repo_with_two_active_one_time_tasks: TaskRepository):
+    task1 = repo_with_two_active_one_time_tasks.get_by_id(1)
+    task2 = repo_with_two_active_one_time_tasks.get_by_id(2)
+    repo_with_two_active_one_time_tasks.make_daily_in_day(1, 2)
+    task1_after_changed = repo_with_two_active_one_time_tasks.get_by_id(1)
+    task2_after_function_call = repo_with_two_active_one_time_tasks.get_by_id(2)
     expected_task_after_changed = Task(
         name=task1.name,
         day_id=task1.day_id,
-        type=new_type,
+        type='daily',
         status=task1.status
     )
     assert task1_after_changed is not None, 'Changed task was deleted'
@@ -214,55 +230,308 @@ def test_make_daily(repo_with_two_completed_one_time_tasks: TaskRepository):
     _compare_task_objects_without_id(task2_after_function_call, task2)
     assert task1_after_changed.id == task1.id, 'Task changed its id'
     _compare_task_objects_without_id(task1_after_changed, expected_task_after_changed)
+    assert task1_after_changed.due_ordinal is None, 'Daily task kept the due ordinal'
 
 
-def test_make_active(repo_with_two_completed_one_time_tasks: TaskRepository):
+def test_activate_in_day(repo_with_two_completed_one_time_tasks: TaskRepository):
     task1 = repo_with_two_completed_one_time_tasks.get_by_id(1)
     task2 = repo_with_two_completed_one_time_tasks.get_by_id(2)
-    new_status = 'active'
-    new_day_id = 90
-    repo_with_two_completed_one_time_tasks.make_active(2, new_day_id)
+    new_day_id = 5
+    repo_with_two_completed_one_time_tasks.activate_in_day(2, new_day_id)
     task1_after_function_call = repo_with_two_completed_one_time_tasks.get_by_id(1)
     task2_after_activating = repo_with_two_completed_one_time_tasks.get_by_id(2)
     expected_task_after_activating = Task(
         name=task2.name,
         day_id=new_day_id,
         type=task2.type,
-        status=new_status
+        status='active'
     )
     assert task1_after_function_call is not None, 'The neighboring was deleted'
     assert task2_after_activating is not None, 'Activated task was deleted'
     _compare_task_objects_without_id(task1_after_function_call, task1)
     assert task2_after_activating.id == task2.id, 'Task changed its id'
     _compare_task_objects_without_id(task2_after_activating, expected_task_after_activating)
+    # Срок отсчитывается заново от дня 5 (порядковый номер 117)
+    assert task2_after_activating.due_ordinal == 117, 'Due ordinal was not recalculated'
+
+
+def test_roll_over_tasks(test_repo: TaskRepository):
+    # Переход из дня 1 (порядковый номер 113) в день 2 (114)
+    tasks_in_bd = [
+        Task(name='Make the wine', day_id=1, type='one-time', status='active'),
+        Task(name='Build a barn', day_id=1, type='one-time', status='active', duration=2),
+        Task(name='Find the golden scroll', day_id=1, type='one-time', status='active', duration=None),
+        Task(name='Water the garden', day_id=1, type='daily', status='active'),
+        Task(name='Check the mail', day_id=1, type='daily', status='completed'),
+        Task(name='Sell the crops', day_id=1, type='one-time', status='completed'),
+        Task(name='Craft items', day_id=4, type='one-time', status='active'),
+    ]
+    for task in tasks_in_bd:
+        test_repo.insert(task)
+    expected_statuses = {
+        'Make the wine': 'completed',
+        'Build a barn': 'active',
+        'Find the golden scroll': 'active',
+        'Water the garden': 'active',
+        'Check the mail': 'completed',
+        'Sell the crops': 'completed',
+        'Craft items': 'active',
+    }
+
+    test_repo.roll_over_tasks(114)
 
+    for task in tasks_in_bd:
+        task_after_roll_over = test_repo.get_by_id(task.id)
+        assert task_after_roll_over.day_id == task.day_id, f'Task "{task.name}" changed its day'
+        assert task_after_roll_over.status == expected_statuses[task.name], f'Task "{task.name}" has wrong status'
+        assert task_after_roll_over.type == task.type, f'Task "{task.name}" changed its type'
+    assert [task.name for task in test_repo.get_active_by_day_id(2)] == [
+        'Build a barn', 'Find the golden scroll', 'Water the garden']
 
-def test_edit_name(repo_with_one_task: TaskRepository):
-    original_task = repo_with_one_task.get_by_id(1)
-    new_name = 'Updated task name'
 
-    repo_with_one_task.edit_name(1, new_name)
+def test_insert_sets_due_ordinal_from_day_and_duration(test_repo: TaskRepository):
+    one_day_task = test_repo.insert(Task(name='Make the wine', day_id=1, type='one-time', status='active'))
+    five_days_task = test_repo.insert(Task(name='Build a barn', day_id=1, type='one-time', status='active', duration=5))
+    endless_task = test_repo.insert(Task(name='Find the scroll', day_id=1, type='one-time', status='active',
+                                         duration=None))
+    daily_task = test_repo.insert(Task(name='Water the garden', day_id=1, type='daily', status='active'))
 
-    changed_task = repo_with_one_task.get_by_id(1)
-    expected_changed_task = Task(
-        name=new_name,
-        day_id=original_task.day_id,
-        type=original_task.type,
-        status=original_task.status
-    )
+    assert one_day_task.due_ordinal == 113
+    assert five_days_task.due_ordinal == 117
+    assert endless_task.due_ordinal is None
+    assert daily_task.due_ordinal is None
+    assert test_repo.get_by_id(five_days_task.id) == five_days_task
 
-    assert changed_task is not None, 'Can\'t find the changed task'
-    assert changed_task.id == original_task.id, 'Task changed its id'
-    _compare_task_objects_without_id(changed_task, expected_changed_task)
 
+def test_set_duration_in_day(test_repo: TaskRepository):
+    task = test_repo.insert(Task(name='Build a barn', day_id=1, type='one-time', status='active'))
 
-def test_edit_name_of_non_existent_task_do_nothing(repo_with_one_task: TaskRepository):
-    task_in_bd = repo_with_one_task.get_by_id(1)
-    new_name = 'Updated task name'
-    try:
-        repo_with_one_task.edit_name(666, new_name)
-    except Exception as e:
-        pytest.fail('Editing name of non existent task got an exception but it shouldn\'t happen')
-    task_in_bd_after_function_call = repo_with_one_task.get_by_id(1)
-    assert task_in_bd_after_function_call is not None, 'Task was deleted'
-    _compare_task_objects_without_id(task_in_bd_after_function_call, task_in_bd)
+    updated_task = test_repo.set_duration_in_day(task.id, 1, 3)
+    endless_task = test_repo.set_duration_in_day(task.id, 1, None)
+
+    # Бессрочная задача показывается и в дне 2, срок отсчитывается заново от него
+    restarted_task = test_repo.set_duration_in_day(task.id, 2, 2)
+    later_task = test_repo.insert(Task(name='Craft items', day_id=4, type='one-time', status='active'))
+
+    assert (updated_task.duration, updated_task.due_ordinal) == (3, 115)
+    assert (endless_task.duration, endless_task.due_ordinal) == (None, None)
+    assert (restarted_task.day_id, restarted_task.duration, restarted_task.due_ordinal) == (2, 2, 115)
+    assert test_repo.set_duration_in_day(later_task.id, 2, 3) is None, 'Duration of task in another day was changed'
+
+
+def test_expired_tasks_are_found_by_index(get_test_db_path: str):
+    with sqlite3.connect(get_test_db_path) as conn:
+        rows = conn.execute("""EXPLAIN QUERY PLAN
+                               UPDATE tasks SET status = 'completed'
+                               WHERE status = 'active' AND type = 'one-time' AND due_ordinal < ?""",
+                            (114,)).fetchall()
+    assert 'tasks_active_one_time_due_ordinal_index' in ' '.join(row[-1] for row in rows)
+
+
+def test_roll_over_tasks_without_expired_tasks_do_nothing(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+
+    repo.roll_over_tasks(113)
+
+    for task in tasks_in_bd:
+        _compare_task_objects_without_id(repo.get_by_id(task.id), task)
+
+
+def test_complete_in_day_returns_updated_task(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    task = next(task for task in tasks_in_bd if task.name == 'Make the wine')
+
+    completed_task = repo.complete_in_day(task.id, task.day_id)
+
+    assert completed_task is not None, 'Task was not completed'
+    assert completed_task.id == task.id
+    assert completed_task.status == 'completed'
+    _compare_task_objects_without_id(repo.get_by_id(task.id), completed_task)
+
+
+@pytest.mark.parametrize(
+    'task_name, day_id',
+    [
+        ('Make the wine', 4),
+        ('Water the garden', 3),
+        ('Check the mail', 3),
+    ],
+    ids=['other_day', 'daily_task', 'completed_task']
+)
+def test_complete_in_day_with_unmet_conditions_do_nothing(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]],
+                                                           task_name: str, day_id: int):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    task = next(task for task in tasks_in_bd if task.name == task_name)
+
+    assert repo.complete_in_day(task.id, day_id) is None, 'Should return None if conditions are not met'
+    _compare_task_objects_without_id(repo.get_by_id(task.id), task)
+
+
+def test_activate_in_day_moves_task_to_day(repo_with_two_completed_one_time_tasks: TaskRepository):
+    activated_task = repo_with_two_completed_one_time_tasks.activate_in_day(1, 5)
+
+    assert activated_task is not None, 'Task was not activated'
+    assert activated_task.status == 'active'
+    assert activated_task.day_id == 5
+    assert repo_with_two_completed_one_time_tasks.activate_in_day(1, 5) is None, 'Active task was activated twice'
+
+
+def test_rename_in_day_to_existent_name_raises_exception(repo_with_two_active_daily_tasks: TaskRepository):
+    with pytest.raises(DuplicateTaskNameException) as exc_info:
+        repo_with_two_active_daily_tasks.rename_in_day(1, 1, 'Feed animals')
+
+    assert "already exists" in str(exc_info.value)
+    assert repo_with_two_active_daily_tasks.get_by_id(1).name == 'Hug the husband'
+
+
+def test_make_one_time_in_day_of_non_existent_task_returns_none(repo_with_two_active_daily_tasks: TaskRepository):
+    assert repo_with_two_active_daily_tasks.make_one_time_in_day(666, 1) is None
+
+
+def test_get_active_by_day_id(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    expected_tasks_list = [task for task in tasks_in_bd if task.day_id == 3 and task.status == 'active']
+
+    list_of_found_tasks = repo.get_active_by_day_id(3)
+
+    assert [task.id for task in list_of_found_tasks] == sorted(task.id for task in expected_tasks_list)
+    for task1, task2 in zip(sorted(expected_tasks_list, key=lambda task: task.id), list_of_found_tasks):
+        _compare_task_objects_without_id(task1, task2)
+
+
+def test_get_active_by_day_id_shows_active_daily_tasks_in_any_day(
+        repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    expected_ids = sorted(task.id for task in tasks_in_bd
+                          if task.status == 'active' and (task.day_id == 5 or task.type == 'daily'))
+
+    list_of_found_tasks = repo.get_active_by_day_id(5)
+
+    assert [task.id for task in list_of_found_tasks] == expected_ids
+    assert all(task.day_id == 5 for task in list_of_found_tasks), 'Daily tasks must be shown in the requested day'
+
+
+def test_daily_completion_is_recorded_once_per_day(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    daily_task = next(task for task in tasks_in_bd if task.name == 'Water the garden')
+
+    assert repo.add_daily_completion(daily_task.id, 3) is True
+    assert repo.add_daily_completion(daily_task.id, 3) is False, 'Task was marked done twice in one day'
+    assert repo.add_daily_completion(daily_task.id, 4) is True
+
+    assert repo.get_completed_daily_ids(3) == [daily_task.id]
+    assert repo.get_completed_daily_ids(4) == [daily_task.id]
+    assert repo.remove_daily_completion(daily_task.id, 3) is True
+    assert repo.remove_daily_completion(daily_task.id, 3) is False
+    assert repo.get_completed_daily_ids(3) == []
+    _compare_task_objects_without_id(repo.get_by_id(daily_task.id), daily_task)
+
+
+@pytest.mark.parametrize(
+    'task_name',
+    ['Make the wine', 'Check the mail', 'Not existing'],
+    ids=['one_time_task', 'completed_daily_task', 'non_existent_task']
+)
+def test_daily_completion_of_not_active_daily_task_is_not_recorded(
+        repo_with_multiple_tasks: tuple[TaskRepository, list[Task]], task_name: str):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    task_id = next((task.id for task in tasks_in_bd if task.name == task_name), 666)
+
+    assert repo.add_daily_completion(task_id, 3) is False
+    assert repo.get_completed_daily_ids(3) == []
+
+
+def test_make_one_time_in_day_moves_daily_task_to_day(repo_with_two_active_daily_tasks: TaskRepository):
+    updated_task = repo_with_two_active_daily_tasks.make_one_time_in_day(1, 7)
+
+    assert updated_task is not None, 'Daily task from another day was not changed'
+    assert (updated_task.type, updated_task.day_id) == ('one-time', 7)
+
+
+def test_get_completed_page(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    completed_ids = sorted(task.id for task in tasks_in_bd if task.status == 'completed')
+
+    first_page = repo.get_completed_page(None, 1)
+    second_page = repo.get_completed_page(first_page[-1].id, 1)
+    last_page = repo.get_completed_page(second_page[-1].id, 1)
+
+    assert [task.id for task in first_page + second_page] == completed_ids
+    assert last_page == []
+    assert repo.count_completed() == len(completed_ids)
+
+
+def test_iter_completed_batches(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    completed_ids = sorted(task.id for task in tasks_in_bd if task.status == 'completed')
+
+    batches = list(repo.iter_completed_batches(1))
+
+    assert [len(batch) for batch in batches] == [1] * len(completed_ids)
+    assert [task.id for batch in batches for task in batch] == completed_ids
+
+
+def test_iter_completed_batches_releases_connection_when_closed_early(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, _ = repo_with_multiple_tasks
+
+    for _ in range(repo.pool.max_detached + 1):
+        batches = repo.iter_completed_batches(1)
+        next(batches)
+        batches.close()
+
+    with repo.pool.detached_connection():
+        pass
+
+
+def test_task_row_factory_can_be_set_on_connection(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]],
+                                                   get_test_db_path: str):
+    _, tasks_in_bd = repo_with_multiple_tasks
+    expected_task = min(tasks_in_bd, key=lambda task: task.id)
+
+    with sqlite3.connect(get_test_db_path) as conn:
+        conn.row_factory = task_row_factory
+        found_task = conn.execute('SELECT id, name, day_id, type, status, duration, due_ordinal FROM tasks WHERE id = ?',
+                                  (expected_task.id,)).fetchone()
+
+    assert found_task == expected_task
+    assert not hasattr(found_task, '__dict__'), 'Task should not allocate a per-instance __dict__'
+
+
+def test_get_by_ids(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+
+    found_tasks = repo.get_by_ids([tasks_in_bd[2].id, 100, tasks_in_bd[0].id])
+
+    assert found_tasks == [tasks_in_bd[0], tasks_in_bd[2]]
+
+
+def test_complete_many_in_day(repo_with_multiple_tasks: tuple[TaskRepository, list[Task]]):
+    repo, tasks_in_bd = repo_with_multiple_tasks
+    # В дне 3: активная ежедневная, активная однодневная и завершенная ежедневная задачи
+    day_3_task_ids = [task.id for task in tasks_in_bd if task.day_id == 3]
+    other_day_task_id = tasks_in_bd[0].id
+
+    completed_tasks = repo.complete_many_in_day(day_3_task_ids + [other_day_task_id], 3)
+
+    assert [task.id for task in completed_tasks] == [tasks_in_bd[2].id]
+    assert completed_tasks[0].status == 'completed'
+    assert repo.get_by_id(tasks_in_bd[1].id).status == 'active', 'Daily task must not be completed'
+    assert repo.get_by_id(other_day_task_id).status == 'active', 'Task of another day must not be completed'
+
+
+def test_insert_many_skips_duplicates(repo_with_one_task: TaskRepository):
+    tasks_to_insert = [
+        Task(name='Buy the seeds', day_id=1, type='one-time', status='active'),
+        Task(name='Watch the news', day_id=1, type='one-time', status='active'),
+        Task(name='Plant the seeds', day_id=1, type='one-time', status='active'),
+        Task(name='Buy the seeds', day_id=1, type='one-time', status='active'),
+    ]
+
+    inserted_tasks = repo_with_one_task.insert_many(tasks_to_insert)
+
+    assert inserted_tasks[1] is None, 'Task with existing name was inserted'
+    assert inserted_tasks[3] is None, 'Repeated name in batch was inserted twice'
+    for task_to_insert, inserted_task in zip(tasks_to_insert[::2], inserted_tasks[::2]):
+        _compare_task_objects_without_id(inserted_task, task_to_insert)
+        assert repo_with_one_task.get_by_id(inserted_task.id) == inserted_task
+    assert len(repo_with_one_task.get_all_by_day_id(1)) == 3
@@ -95,11 +95,33 @@ def test_set_next_day_creates_new_day_and_updates_tasks(day_service_with_initial
     assert new_active_day is not None
     _compare_day_objects_without_id(new_active_day, expected_next_day)
 
-    new_day_tasks = task_repo.get_all_by_day_id(new_active_day.id)
-    daily_tasks = [task for task in new_day_tasks if task.type == 'daily']
-    assert len(new_day_tasks) == len(daily_tasks)
-    assert new_day_tasks == daily_tasks
+    new_day_tasks = task_repo.get_active_by_day_id(new_active_day.id)
+    assert [task.name for task in new_day_tasks] == ['Daily task 1', 'Daily task 2']
+    assert all(task.day_id == new_active_day.id for task in new_day_tasks)
+    # Ежедневные задачи не переносятся: при переходе дня их строки не меняются
+    assert [task.day_id for task in task_repo.get_all_by_day_id(initial_day.id) if task.type == 'daily'] == [
+        initial_day.id, initial_day.id]
 
     for task in one_time_tasks:
         updated_task = task_repo.get_by_id(task.id)
-        assert updated_task.status == 'completed'
\ No newline at end of file
+        assert updated_task.status == 'completed'
+
+def test_set_next_day_rolls_back_all_changes_on_failure(day_service_with_initial_day_in_db, day_repo, task_repo):
+    initial_day = day_repo.get_active()
+    task = Task(name='One-time active task', day_id=initial_day.id, type='one-time', status='active')
+    task_repo.insert(task)
+
+    def fail_on_roll_over(expire_before_ordinal):
+        raise RuntimeError('Roll over failed')
+
+    task_repo.roll_over_tasks = fail_on_roll_over
+
+    with pytest.raises(RuntimeError):
+        day_service_with_initial_day_in_db.set_next_day()
+
+    active_day = day_repo.get_active()
+    assert active_day is not None, 'Previous active day was deactivated'
+    assert active_day.id == initial_day.id
+    assert day_repo.get_by_attributes(year=initial_day.year, season=initial_day.season,
+                                      number=initial_day.number + 1) is None, 'Next day was created'
+    assert task_repo.get_by_id(task.id).status == 'active'
@@ -81,29 +81,6 @@ def test_create_existent_task_fails(task_service_with_tasks_in_db, mock_day_serv
     assert "already exists" in str(exc_info.value)
 
 
-def test_get_all_by_day_id(task_service_with_tasks_in_db, tasks_data_in_db):
-    day_id = 1
-    expected_tasks = [task for task in tasks_data_in_db if task.day_id == day_id]
-
-    tasks = task_service_with_tasks_in_db.get_all_by_day_id(day_id)
-
-    assert len(tasks) == len(expected_tasks)
-    task_names = {task.name for task in tasks}
-    expected_names = {task.name for task in expected_tasks}
-    assert task_names == expected_names
-
-
-def test_get_all_completed(task_service_with_tasks_in_db, tasks_data_in_db):
-    expected_completed = [task for task in tasks_data_in_db if task.status == 'completed']
-
-    completed_tasks = task_service_with_tasks_in_db.get_all_completed()
-
-    assert len(completed_tasks) == len(expected_completed)
-    completed_names = {task.name for task in completed_tasks}
-    expected_names = {task.name for task in expected_completed}
-    assert completed_names == expected_names
-
-
 @pytest.mark.parametrize(
     'initial_type, initial_status, operation, expected_type, expected_status',
     [
@@ -168,7 +145,7 @@ def test_edit_name(task_service, mock_day_service, active_day):
 )
 def test_task_operations_check_active_day(task_service, mock_day_service,
                                                       task_day_id, active_day_id, should_raise_error):
-    active_day = Day(year=1, season='spring', number=1, active=True, day_id=active_day_id)
+    active_day = Day(year=1, season='spring', number=active_day_id, active=True, day_id=active_day_id)
     mock_day_service.get_active.return_value = active_day
 
     task = Task(name='Test task', day_id=task_day_id, type='one-time', status='active')
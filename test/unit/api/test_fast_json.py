@@ -0,0 +1,70 @@
+import pytest
+
+from src.api import fast_json
+from src.api.handlers_models import CompletedTasksPageResponse, CurrentStateResponse, TaskResponse
+from src.entities.day_entities import Day
+from src.entities.task_entities import Task
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(fast_json, 'orjson', None)
+    elif fast_json.orjson is None:
+        pytest.skip('orjson is not installed')
+    return request.param
+
+
+@pytest.fixture
+def active_day() -> Day:
+    return Day(year=1, season='spring', number=3, active=True, day_id=3)
+
+
+@pytest.fixture
+def day_tasks() -> list:
+    return [
+        Task(name='Полить грядки', day_id=3, type='daily', status='active', task_id=1, duration=1),
+        Task(name='Feed "animals"', day_id=3, type='daily', status='active', task_id=2, duration=1),
+        Task(name='Build a barn', day_id=3, type='one-time', status='active', task_id=4, duration=None),
+    ]
+
+
+@pytest.fixture
+def completed_tasks() -> list:
+    return [
+        Task(name='Make the wine', day_id=1, type='one-time', status='completed', task_id=3, due_ordinal=113),
+    ]
+
+
+def test_current_state_matches_model_encoding(encoder, active_day, day_tasks, completed_tasks):
+    details = {
+        'current_day': active_day,
+        'day_tasks': day_tasks,
+        'completed_tasks': completed_tasks,
+        'completed_tasks_next_cursor': 3,
+        'done_daily_task_ids': {2},
+        'changes_cursor': 17,
+    }
+
+    fast_payload = fast_json.dumps(fast_json.current_state_to_dict(**details))
+
+    assert fast_payload == CurrentStateResponse.from_entities(**details).model_dump_json().encode()
+
+
+def test_current_state_in_count_mode_matches_model_encoding(encoder, active_day):
+    details = {'current_day': active_day, 'day_tasks': [], 'completed_tasks': [], 'completed_tasks_count': 12}
+
+    fast_payload = fast_json.dumps(fast_json.current_state_to_dict(**details))
+
+    assert fast_payload == CurrentStateResponse.from_entities(**details).model_dump_json().encode()
+
+
+def test_completed_page_matches_model_encoding(encoder, completed_tasks):
+    fast_payload = fast_json.FastJSONResponse(fast_json.completed_tasks_page_to_dict(completed_tasks, None)).body
+
+    assert fast_payload == CompletedTasksPageResponse.from_entities(completed_tasks, None).model_dump_json().encode()
+
+
+def test_task_matches_model_encoding(encoder, day_tasks):
+    for task in day_tasks:
+        assert fast_json.dumps(fast_json.task_to_dict(task)) == TaskResponse.from_task(task).model_dump_json().encode()
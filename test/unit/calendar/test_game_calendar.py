@@ -0,0 +1,31 @@
+import pytest
+
+from src import game_calendar
+
+
+@pytest.mark.parametrize(
+    'day, expected_ordinal',
+    [
+        ((1, 'spring', 1), 113),
+        ((1, 'spring', 28), 140),
+        ((1, 'summer', 1), 141),
+        ((1, 'winter', 28), 224),
+        ((2, 'spring', 1), 225),
+    ],
+    ids=['first_day', 'end_of_season', 'next_season', 'end_of_year', 'next_year']
+)
+def test_to_ordinal(day, expected_ordinal):
+    assert game_calendar.to_ordinal(*day) == expected_ordinal
+    assert game_calendar.from_ordinal(expected_ordinal) == day
+
+
+def test_neighbour_days_have_consecutive_ordinals():
+    days = [(year, season, number)
+            for year in range(1, 4)
+            for season in game_calendar.SEASONS
+            for number in range(1, game_calendar.DAYS_PER_SEASON + 1)]
+
+    ordinals = game_calendar.to_ordinals(days)
+
+    assert ordinals == list(range(ordinals[0], ordinals[0] + len(days)))
+    assert game_calendar.from_ordinals(ordinals) == days
@@ -0,0 +1,44 @@
+import pytest
+from unittest.mock import MagicMock
+from src.services.change_log_service import ChangeLogService
+from src.entities.change_entities import Change
+
+
+@pytest.fixture
+def mock_change_log_repo():
+    return MagicMock()
+
+
+@pytest.fixture
+def change_log_service(mock_change_log_repo):
+    return ChangeLogService(mock_change_log_repo)
+
+
+def _changes(*seqs):
+    return [Change(seq=seq, entity='task', entity_id=1, action='update', data={}) for seq in seqs]
+
+
+def test_get_changes_returns_page_and_cursor(change_log_service, mock_change_log_repo):
+    mock_change_log_repo.get_since.return_value = _changes(6, 7, 8)
+
+    changes, next_cursor, has_more = change_log_service.get_changes(5, 2)
+
+    mock_change_log_repo.get_since.assert_called_once_with(5, 3)
+    assert changes == _changes(6, 7)
+    assert (next_cursor, has_more) == (7, True)
+
+
+def test_get_changes_of_last_page(change_log_service, mock_change_log_repo):
+    mock_change_log_repo.get_since.return_value = _changes(6)
+
+    changes, next_cursor, has_more = change_log_service.get_changes(5, 2)
+
+    assert (next_cursor, has_more) == (6, False)
+
+
+def test_get_changes_without_new_changes_keeps_cursor(change_log_service, mock_change_log_repo):
+    mock_change_log_repo.get_since.return_value = []
+
+    changes, next_cursor, has_more = change_log_service.get_changes(5, 2)
+
+    assert (changes, next_cursor, has_more) == ([], 5, False)
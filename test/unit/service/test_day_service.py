@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, call, ANY
 from src import errors
+from src.game_calendar import to_ordinal
 from src.services.day_service import DayService
 from src.entities.day_entities import Day
 from src.entities.task_entities import Task
@@ -60,11 +61,11 @@ def test_get_active_day_fails_with_multiple_active_days(day_service, mock_day_re
 def test_set_current_day_new_day(day_service, mock_day_repo):
     new_day_id = 2
 
-    day_service._move_tasks_to_current_day = MagicMock()
+    day_service._expire_tasks = MagicMock()
 
     previous_active_day = Day(year=1, season='spring', number=1, active=True, day_id=1)
     mock_day_repo.get_active.return_value = previous_active_day
-    mock_day_repo.get_by_attributes.return_value = None
+    mock_day_repo.get_by_ordinal.return_value = None
 
     def set_id_on_insert(new_active_day: Day):
         new_active_day.id = new_day_id
@@ -77,15 +78,14 @@ def test_set_current_day_new_day(day_service, mock_day_repo):
                                 number=expected_new_day.number)
 
     mock_day_repo.set_activity.assert_called_once_with(previous_active_day.id, False)
-    mock_day_repo.get_by_attributes.assert_called_once_with(year=expected_new_day.year, season=expected_new_day.season,
-                                                            number=expected_new_day.number)
+    mock_day_repo.get_by_ordinal.assert_called_once_with(expected_new_day.ordinal)
 
     mock_day_repo.insert.assert_called_once()
     inserted_day = mock_day_repo.insert.call_args[0][0]
     _compare_day_objects_without_id(inserted_day, expected_new_day)  # если провалится, то проблема в логике DayService
     assert inserted_day.id == expected_new_day.id  # если провалится, то проблема в настройке side_effect
 
-    day_service._move_tasks_to_current_day.assert_called_once_with(previous_active_day.id, expected_new_day.id)
+    day_service._expire_tasks.assert_called_once_with(expected_new_day.ordinal)
 
 
 def test_set_current_day_existent_day_integrates_with_task_moving(day_service, mock_day_repo, mock_task_repo):
@@ -93,53 +93,36 @@ def test_set_current_day_existent_day_integrates_with_task_moving(day_service, m
     mock_day_repo.get_active.return_value = previous_active_day
 
     expected_day_from_db = Day(year=1, season='autumn', number=13, active=False, day_id=6)
-    mock_day_repo.get_by_attributes.return_value = expected_day_from_db
+    mock_day_repo.get_by_ordinal.return_value = expected_day_from_db
 
     set_activity_expected_calls = [
         call(previous_active_day.id, False),
         call(expected_day_from_db.id, True)
     ]
 
-    tasks = [
-        Task(name='Daily task', day_id=previous_active_day.id, type='daily', status='active', task_id=3),
-        Task(name='One-time active task', day_id=previous_active_day.id, type='one-time', status='active', task_id=2),
-        Task(name='One-time completed task', day_id=previous_active_day.id, type='one-time', status='completed', task_id=6)
-    ]
-    mock_task_repo.get_all_by_day_id.return_value = tasks
-
-    update_field_expected_calls = [
-        call(3, 'day_id', expected_day_from_db.id),
-        call(2, 'status', 'completed')
-    ]
-
     day_service.set_current_day(year=expected_day_from_db.year, season=expected_day_from_db.season,
                                 number=expected_day_from_db.number)
 
-    mock_day_repo.get_by_attributes.assert_called_once_with(year=expected_day_from_db.year,
-                                                            season=expected_day_from_db.season,
-                                                            number=expected_day_from_db.number)
+    mock_day_repo.get_by_ordinal.assert_called_once_with(expected_day_from_db.ordinal)
     mock_day_repo.set_activity.assert_has_calls(set_activity_expected_calls, any_order=False)
     assert mock_day_repo.set_activity.call_count == len(set_activity_expected_calls)
     mock_day_repo.insert.assert_not_called()
 
-    mock_task_repo.get_all_by_day_id.assert_called_once_with(previous_active_day.id)
-    mock_task_repo.update_field.assert_has_calls(update_field_expected_calls, any_order=True)
-    assert mock_task_repo.update_field.call_count == len(update_field_expected_calls)
+    mock_task_repo.roll_over_tasks.assert_called_once_with(expected_day_from_db.ordinal)
+    mock_task_repo.complete_in_day.assert_not_called()
 
 
 def test_set_current_day_active_day(day_service, mock_day_repo):
     previous_active_day = Day(year=2, season='spring', number=8, active=True, day_id=5)
 
     mock_day_repo.get_active.return_value = previous_active_day
-    mock_day_repo.get_by_attributes.return_value = previous_active_day
+    mock_day_repo.get_by_ordinal.return_value = previous_active_day
 
     day_service.set_current_day(year=previous_active_day.year, season=previous_active_day.season,
                                 number=previous_active_day.number)
 
     mock_day_repo.get_active.assert_called_once()
-    mock_day_repo.get_by_attributes.assert_called_once_with(year=previous_active_day.year,
-                                                            season=previous_active_day.season,
-                                                            number=previous_active_day.number)
+    mock_day_repo.get_by_ordinal.assert_called_once_with(previous_active_day.ordinal)
     mock_day_repo.set_activity.assert_not_called()
     mock_day_repo.insert.assert_not_called()
 
@@ -193,7 +176,7 @@ def test_set_next_day_new_day_with_task_moving(day_service, mock_day_repo, mock_
     previous_active_day = Day(year=4, season='winter', number=19, active=True, day_id=11)
     mock_day_repo.get_active.return_value = previous_active_day
 
-    mock_day_repo.get_by_attributes.return_value = None
+    mock_day_repo.get_by_ordinal.return_value = None
 
     def set_id_on_insert(new_active_day: Day):
         new_active_day.id = new_day_id
@@ -202,24 +185,10 @@ def test_set_next_day_new_day_with_task_moving(day_service, mock_day_repo, mock_
     expected_next_day = Day(year=previous_active_day.year, season=previous_active_day.season,
                             number=previous_active_day.number + 1, active=True, day_id=new_day_id)
 
-    tasks = [
-        Task(name='Daily task', day_id=previous_active_day.id, type='daily', status='active', task_id=1),
-        Task(name='One-time active task', day_id=previous_active_day.id, type='one-time', status='active', task_id=2),
-        Task(name='One-time completed task', day_id=previous_active_day.id, type='one-time', status='completed', task_id=3)
-    ]
-    mock_task_repo.get_all_by_day_id.return_value = tasks
-
-    update_field_expected_calls = [
-        call(1, 'day_id', new_day_id),
-        call(2, 'status', 'completed')
-    ]
-
     day_service.set_next_day()
 
     mock_day_repo.get_active.assert_called_once()
-    mock_day_repo.get_by_attributes.assert_called_once_with(year=expected_next_day.year,
-                                                            season=expected_next_day.season,
-                                                            number=expected_next_day.number)
+    mock_day_repo.get_by_ordinal.assert_called_once_with(expected_next_day.ordinal)
     mock_day_repo.set_activity.assert_called_once_with(previous_active_day.id, False)
 
     mock_day_repo.insert.assert_called_once()
@@ -227,20 +196,19 @@ def test_set_next_day_new_day_with_task_moving(day_service, mock_day_repo, mock_
     _compare_day_objects_without_id(inserted_day, expected_next_day)
     assert inserted_day.id == expected_next_day.id
 
-    mock_task_repo.get_all_by_day_id.assert_called_once_with(previous_active_day.id)
-    mock_task_repo.update_field.assert_has_calls(update_field_expected_calls, any_order=True)
-    assert mock_task_repo.update_field.call_count == len(update_field_expected_calls)
+    mock_task_repo.roll_over_tasks.assert_called_once_with(expected_next_day.ordinal)
+    mock_task_repo.complete_in_day.assert_not_called()
 
 
 def test_set_next_day_existent_day(day_service, mock_day_repo):
-    day_service._move_tasks_to_current_day = MagicMock()
+    day_service._expire_tasks = MagicMock()
 
     previous_active_day = Day(year=3, season='summer', number=17, active=True, day_id=2)
     mock_day_repo.get_active.return_value = previous_active_day
 
     expected_day_from_bd = Day(year=previous_active_day.year, season=previous_active_day.season,
                                number=previous_active_day.number + 1, active=False, day_id=3)
-    mock_day_repo.get_by_attributes.return_value = expected_day_from_bd
+    mock_day_repo.get_by_ordinal.return_value = expected_day_from_bd
 
     set_activity_expected_calls = [
         call(previous_active_day.id, False),
@@ -250,14 +218,12 @@ def test_set_next_day_existent_day(day_service, mock_day_repo):
     day_service.set_next_day()
 
     mock_day_repo.get_active.assert_called_once()
-    mock_day_repo.get_by_attributes.assert_called_once_with(year=expected_day_from_bd.year,
-                                                            season=expected_day_from_bd.season,
-                                                            number=expected_day_from_bd.number)
+    mock_day_repo.get_by_ordinal.assert_called_once_with(expected_day_from_bd.ordinal)
     mock_day_repo.set_activity.assert_has_calls(set_activity_expected_calls, any_order=False)
     assert mock_day_repo.set_activity.call_count == len(set_activity_expected_calls)
     mock_day_repo.insert.assert_not_called()
 
-    day_service._move_tasks_to_current_day.assert_called_once_with(previous_active_day.id, expected_day_from_bd.id)
+    day_service._expire_tasks.assert_called_once_with(expected_day_from_bd.ordinal)
 
 
 @pytest.mark.parametrize(
@@ -281,12 +247,12 @@ def test_set_next_day_boundary_transitions(day_service, mock_day_repo, previous_
                                            expected_next_day_data):
     new_day_id = 8
 
-    day_service._move_tasks_to_current_day = MagicMock()
+    day_service._expire_tasks = MagicMock()
 
     previous_active_day = Day(**previous_active_day_data, active=True, day_id=7)
     mock_day_repo.get_active.return_value = previous_active_day
 
-    mock_day_repo.get_by_attributes.return_value = None
+    mock_day_repo.get_by_ordinal.return_value = None
 
     def set_id_on_insert(new_active_day: Day):
         new_active_day.id = new_day_id
@@ -297,7 +263,7 @@ def test_set_next_day_boundary_transitions(day_service, mock_day_repo, previous_
     day_service.set_next_day()
 
     mock_day_repo.get_active.assert_called_once()
-    mock_day_repo.get_by_attributes.assert_called_once_with(**expected_next_day_data)
+    mock_day_repo.get_by_ordinal.assert_called_once_with(to_ordinal(**expected_next_day_data))
     mock_day_repo.set_activity.assert_called_once_with(previous_active_day.id, False)
 
     mock_day_repo.insert.assert_called_once()
@@ -305,7 +271,7 @@ def test_set_next_day_boundary_transitions(day_service, mock_day_repo, previous_
     _compare_day_objects_without_id(inserted_day, expected_next_day)
     assert inserted_day.id == expected_next_day.id
 
-    day_service._move_tasks_to_current_day.assert_called_once_with(previous_active_day.id, expected_next_day.id)
+    day_service._expire_tasks.assert_called_once_with(expected_next_day.ordinal)
 
 
 def test_set_next_day_fails_if_no_active_day(day_service, mock_day_repo):
@@ -318,41 +284,179 @@ def test_set_next_day_fails_if_no_active_day(day_service, mock_day_repo):
     mock_day_repo.insert.assert_not_called()
 
 
-def test_move_tasks_to_current_day(day_service, mock_day_repo, mock_task_repo):
-    previous_day_id = 1
-    new_day_id = 2
+def test_expire_tasks(day_service, mock_day_repo, mock_task_repo):
+    expire_before_ordinal = 114
 
-    tasks_to_move = [
-        Task(name='One-time active task 1', day_id=previous_day_id, type='one-time', status='active', task_id=10),
-        Task(name='Daily task 1', day_id=previous_day_id, type='daily', status='active', task_id=11),
-        Task(name='One-time active task 2', day_id=previous_day_id, type='one-time', status='active', task_id=12),
-        Task(name='Daily task 2', day_id=previous_day_id, type='daily', status='active', task_id=13),
-        Task(name='One-time completed task', day_id=previous_day_id, type='one-time', status='completed', task_id=14)
-    ]
+    day_service._expire_tasks(expire_before_ordinal)
 
-    mock_task_repo.get_all_by_day_id.return_value = tasks_to_move
+    mock_task_repo.roll_over_tasks.assert_called_once_with(expire_before_ordinal)
+    mock_task_repo.get_all_by_day_id.assert_not_called()
+    mock_task_repo.complete_in_day.assert_not_called()
 
-    update_field_expected_calls = [
-        call(11, 'day_id', new_day_id),
-        call(13, 'day_id', new_day_id),
-        call(10, 'status', 'completed'),
-        call(12, 'status', 'completed'),
-    ]
 
-    day_service._move_tasks_to_current_day(previous_day_id, new_day_id)
+def test_set_next_day_runs_in_one_transaction(day_service, mock_day_repo):
+    day_service._expire_tasks = MagicMock()
+    mock_day_repo.get_active.return_value = Day(year=1, season='spring', number=3, active=True, day_id=3)
+    mock_day_repo.get_by_ordinal.return_value = None
 
-    mock_task_repo.get_all_by_day_id.assert_called_once_with(previous_day_id)
-    mock_task_repo.update_field.assert_has_calls(update_field_expected_calls, any_order=True)
-    assert mock_task_repo.update_field.call_count == len(update_field_expected_calls)
+    day_service.set_next_day()
 
+    mock_day_repo.transaction.assert_called_once()
+    mock_day_repo.transaction.return_value.__enter__.assert_called_once()
+    mock_day_repo.transaction.return_value.__exit__.assert_called_once()
 
-def test_move_tasks_to_current_day_no_tasks(day_service, mock_task_repo):
-    previous_day_id = 1
-    new_day_id = 2
 
-    tasks_to_move = []
+def test_get_active_day_is_cached(day_service, mock_day_repo):
+    expected_day = Day(year=1, season='winter', number=15, active=True, day_id=2)
+    mock_day_repo.get_active.return_value = expected_day
+
+    first_active_day = day_service.get_active()
+    second_active_day = day_service.get_active()
+
+    assert first_active_day == expected_day
+    assert second_active_day == expected_day
+    mock_day_repo.get_active.assert_called_once()
+
+
+def test_set_next_day_updates_cached_active_day(day_service, mock_day_repo):
+    new_day_id = 4
+    day_service._expire_tasks = MagicMock()
+    previous_active_day = Day(year=1, season='spring', number=3, active=True, day_id=3)
+    mock_day_repo.get_active.return_value = previous_active_day
+    mock_day_repo.get_by_ordinal.return_value = None
+
+    def set_id_on_insert(new_active_day: Day):
+        new_active_day.id = new_day_id
+
+    mock_day_repo.insert.side_effect = set_id_on_insert
+
+    assert day_service.get_active() == previous_active_day
+    day_service.set_next_day()
+    active_day = day_service.get_active()
+
+    assert active_day.id == new_day_id
+    _compare_day_objects_without_id(active_day, Day(year=1, season='spring', number=4, active=True))
+    # один раз для заполнения кэша и один раз внутри транзакции перехода
+    assert mock_day_repo.get_active.call_count == 2
+
+
+def test_failed_transition_invalidates_cached_active_day(day_service, mock_day_repo):
+    previous_active_day = Day(year=1, season='spring', number=3, active=True, day_id=3)
+    mock_day_repo.get_active.return_value = previous_active_day
+    mock_day_repo.get_by_ordinal.return_value = None
+    mock_day_repo.insert.side_effect = errors.DuplicateDayException('Day already exists')
+
+    day_service.get_active()
+    with pytest.raises(errors.DuplicateDayException):
+        day_service.set_next_day()
+    day_service.get_active()
+
+    assert mock_day_repo.get_active.call_count == 3
+
+
+def test_active_day_read_before_transition_is_not_cached(day_service, mock_day_repo):
+    stale_day = Day(year=1, season='spring', number=3, active=True, day_id=3)
+    new_day = Day(year=1, season='spring', number=4, active=True, day_id=4)
+
+    def transition_during_read():
+        day_service._set_cached_active_day(new_day)
+        return stale_day
 
-    day_service._move_tasks_to_current_day(previous_day_id, new_day_id)
+    mock_day_repo.get_active.side_effect = transition_during_read
 
-    mock_task_repo.get_all_by_day_id.assert_called_once_with(previous_day_id)
-    mock_task_repo.update_field.assert_not_called()
+    assert day_service.get_active() == stale_day
+    assert day_service.get_active() == new_day
+
+
+@pytest.mark.parametrize(
+    'previous_active_day_data, days, expected_day_data',
+    [
+        ({'year': 1, 'season': 'spring', 'number': 1}, 7, {'year': 1, 'season': 'spring', 'number': 8}),
+        ({'year': 1, 'season': 'spring', 'number': 25}, 7, {'year': 1, 'season': 'summer', 'number': 4}),
+        ({'year': 2, 'season': 'winter', 'number': 27}, 2, {'year': 3, 'season': 'spring', 'number': 1}),
+        ({'year': 2, 'season': 'autumn', 'number': 10}, 112, {'year': 3, 'season': 'autumn', 'number': 10}),
+        ({'year': 1, 'season': 'winter', 'number': 28}, 225, {'year': 4, 'season': 'spring', 'number': 1}),
+    ],
+    ids=['within_season', 'to_next_season', 'to_next_year', 'whole_year', 'several_years']
+)
+def test_advance_days(day_service, mock_day_repo, mock_task_repo, previous_active_day_data, days, expected_day_data):
+    previous_active_day = Day(**previous_active_day_data, active=True, day_id=7)
+    mock_day_repo.get_active.return_value = previous_active_day
+    mock_day_repo.get_by_ordinal.return_value = None
+
+    def set_id_on_insert(new_active_day: Day):
+        new_active_day.id = 8
+
+    mock_day_repo.insert.side_effect = set_id_on_insert
+
+    new_active_day = day_service.advance_days(days)
+
+    mock_day_repo.get_by_ordinal.assert_called_once_with(to_ordinal(**expected_day_data))
+    mock_day_repo.insert.assert_called_once()
+    _compare_day_objects_without_id(new_active_day, Day(**expected_day_data, active=True))
+    mock_task_repo.roll_over_tasks.assert_called_once_with(new_active_day.ordinal)
+    mock_day_repo.transaction.assert_called_once()
+
+
+@pytest.mark.parametrize('days', [0, -3, 1.5], ids=['zero', 'negative', 'not_integer'])
+def test_advance_days_invalid_input(day_service, mock_day_repo, days):
+    with pytest.raises(errors.InvalidDayError) as e_info:
+        day_service.advance_days(days)
+
+    assert 'Number of days must be a positive integer' in str(e_info.value)
+    mock_day_repo.get_active.assert_not_called()
+
+
+
+def test_moving_back_expires_tasks_due_in_previous_day(day_service, mock_day_repo, mock_task_repo):
+    previous_active_day = Day(year=2, season='summer', number=10, active=True, day_id=5)
+    mock_day_repo.get_active.return_value = previous_active_day
+    earlier_day = Day(year=1, season='spring', number=3, active=False, day_id=2)
+    mock_day_repo.get_by_ordinal.return_value = earlier_day
+
+    day_service.set_current_day(year=earlier_day.year, season=earlier_day.season, number=earlier_day.number)
+
+    mock_task_repo.roll_over_tasks.assert_called_once_with(previous_active_day.ordinal + 1)
+
+
+def test_invalidate_caches_rereads_active_day(day_service, mock_day_repo):
+    cached_day = Day(year=1, season='spring', number=1, active=True, day_id=1)
+    committed_day = Day(year=1, season='spring', number=2, active=True, day_id=2)
+    mock_day_repo.get_active.return_value = cached_day
+    day_service.get_active()
+    version = day_service.state_version.value
+
+    mock_day_repo.get_active.return_value = committed_day
+    day_service.invalidate_caches()
+
+    assert day_service.get_active() == committed_day
+    assert day_service.state_version.value == version + 1
+
+
+def test_group_without_state_changes_does_not_invalidate_caches(day_service, mock_day_repo):
+    version = day_service.state_version.value
+
+    day_service.begin_group()
+    day_service.finish_group()
+
+    assert day_service.state_version.value == version
+
+
+def test_group_changes_are_published_once_after_commit(day_service, mock_day_repo):
+    previous_active_day = Day(year=1, season='spring', number=1, active=True, day_id=1)
+    next_day = Day(year=1, season='spring', number=2, active=False, day_id=2)
+    mock_day_repo.get_active.return_value = previous_active_day
+    mock_day_repo.get_by_ordinal.return_value = next_day
+    version = day_service.state_version.value
+
+    day_service.begin_group()
+    day_service.set_next_day()
+    day_service.get_active()
+
+    assert day_service.state_version.value == version, 'Version changed before the group was committed'
+    assert day_service._active_day is None, 'Uncommitted active day was cached'
+    assert mock_day_repo.get_active.call_count == 2, 'Active day inside a group must be read from the database'
+    mock_day_repo.get_active.return_value = next_day
+    day_service.finish_group()
+    assert day_service.state_version.value == version + 1
+    assert day_service.get_active() == next_day
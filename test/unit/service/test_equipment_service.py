@@ -0,0 +1,127 @@
+import pytest
+from unittest.mock import MagicMock
+from src import errors
+from src.services.equipment_service import EquipmentService
+from src.entities.equipment_entities import Equipment
+from src.entities.day_entities import Day
+
+
+@pytest.fixture
+def mock_equipment_repo():
+    return MagicMock()
+
+
+@pytest.fixture
+def mock_day_service():
+    return MagicMock()
+
+
+@pytest.fixture
+def equipment_service(mock_equipment_repo, mock_day_service):
+    return EquipmentService(mock_equipment_repo, mock_day_service)
+
+
+@pytest.fixture
+def active_day():
+    return Day(year=1, season='spring', number=5, active=True, day_id=5)
+
+
+def test_create_equipment(equipment_service, mock_equipment_repo):
+    mock_equipment_repo.insert.side_effect = lambda equipment: equipment
+
+    equipment = equipment_service.create_equipment('Keg 1', 'keg')
+
+    assert equipment == Equipment(name='Keg 1', kind='keg')
+    mock_equipment_repo.insert.assert_called_once()
+
+
+def test_create_equipment_of_unknown_kind_fails(equipment_service, mock_equipment_repo):
+    with pytest.raises(errors.InvalidEquipmentStateException) as exc_info:
+        equipment_service.create_equipment('Furnace', 'furnace')
+
+    assert 'Equipment kind must be one of' in str(exc_info.value)
+    mock_equipment_repo.insert.assert_not_called()
+
+
+def test_start_stores_ready_ordinal(equipment_service, mock_equipment_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    expected_equipment = Equipment(name='Keg 1', kind='keg', ready_ordinal=active_day.ordinal + 7, equipment_id=1)
+    mock_equipment_repo.start.return_value = expected_equipment
+
+    equipment = equipment_service.start(1, 7)
+
+    assert equipment == expected_equipment
+    mock_equipment_repo.start.assert_called_once_with(1, active_day.ordinal + 7)
+
+
+def test_start_busy_equipment_fails(equipment_service, mock_equipment_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    mock_equipment_repo.start.return_value = None
+    mock_equipment_repo.get_by_id.return_value = Equipment(name='Keg 1', kind='keg',
+                                                           ready_ordinal=active_day.ordinal + 3, equipment_id=1)
+
+    with pytest.raises(errors.InvalidEquipmentStateException) as exc_info:
+        equipment_service.start(1, 7)
+
+    assert 'is already in use: 3 days left' in str(exc_info.value)
+
+
+def test_start_equipment_collected_concurrently_fails(equipment_service, mock_equipment_repo, mock_day_service,
+                                                     active_day):
+    mock_day_service.get_active.return_value = active_day
+    mock_equipment_repo.start.return_value = None
+    mock_equipment_repo.get_by_id.return_value = Equipment(name='Keg 1', kind='keg', ready_ordinal=None,
+                                                           equipment_id=1)
+
+    with pytest.raises(errors.InvalidEquipmentStateException) as exc_info:
+        equipment_service.start(1, 7)
+
+    assert 'was changed by another request' in str(exc_info.value)
+
+
+@pytest.mark.parametrize('days', [0, -1, 2.5], ids=['zero', 'negative', 'not_integer'])
+def test_start_with_invalid_days_fails(equipment_service, mock_equipment_repo, days):
+    with pytest.raises(errors.InvalidEquipmentStateException) as exc_info:
+        equipment_service.start(1, days)
+
+    assert 'Processing days must be a positive integer' in str(exc_info.value)
+    mock_equipment_repo.start.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    'ready_ordinal_shift, expected_error_message',
+    [(None, 'is empty'), (2, 'is not ready yet: 2 days left')],
+    ids=['empty', 'not_ready']
+)
+def test_collect_fails(equipment_service, mock_equipment_repo, mock_day_service, active_day, ready_ordinal_shift,
+                       expected_error_message):
+    mock_day_service.get_active.return_value = active_day
+    mock_equipment_repo.collect.return_value = None
+    ready_ordinal = None if ready_ordinal_shift is None else active_day.ordinal + ready_ordinal_shift
+    mock_equipment_repo.get_by_id.return_value = Equipment(name='Keg 1', kind='keg', ready_ordinal=ready_ordinal,
+                                                           equipment_id=1)
+
+    with pytest.raises(errors.InvalidEquipmentStateException) as exc_info:
+        equipment_service.collect(1)
+
+    assert expected_error_message in str(exc_info.value)
+    mock_equipment_repo.collect.assert_called_once_with(1, active_day.ordinal)
+
+
+def test_collect_non_existent_equipment_fails(equipment_service, mock_equipment_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    mock_equipment_repo.collect.return_value = None
+    mock_equipment_repo.get_by_id.return_value = None
+
+    with pytest.raises(errors.EquipmentNotFoundException) as exc_info:
+        equipment_service.collect(8)
+
+    assert 'Equipment with id 8 not found' in str(exc_info.value)
+
+
+def test_get_ready_uses_active_day(equipment_service, mock_equipment_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+
+    equipment_service.get_ready()
+
+    mock_equipment_repo.get_ready.assert_called_once_with(active_day.ordinal)
@@ -0,0 +1,89 @@
+import asyncio
+import gc
+import threading
+
+import pytest
+
+from src import errors
+from src.services.state_broadcaster import StateBroadcaster
+from src.services.state_version import StateVersion
+
+
+@pytest.fixture
+def state_version() -> StateVersion:
+    return StateVersion()
+
+
+@pytest.fixture
+def broadcaster(state_version: StateVersion) -> StateBroadcaster:
+    return StateBroadcaster(state_version, max_subscribers=2)
+
+
+def _bump_in_thread(state_version: StateVersion, times: int = 1):
+    thread = threading.Thread(target=lambda: [state_version.bump() for _ in range(times)])
+    thread.start()
+    thread.join()
+
+
+def test_subscriber_gets_current_version_first(broadcaster: StateBroadcaster, state_version: StateVersion):
+    state_version.bump()
+
+    async def scenario():
+        subscriber = broadcaster.subscribe()
+        return await subscriber.next_version(timeout=1)
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_subscriber_gets_version_bumped_in_other_thread(broadcaster: StateBroadcaster, state_version: StateVersion):
+    async def scenario():
+        subscriber = broadcaster.subscribe()
+        await subscriber.next_version(timeout=1)
+        _bump_in_thread(state_version)
+        return await subscriber.next_version(timeout=1)
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_slow_subscriber_gets_only_last_version(broadcaster: StateBroadcaster, state_version: StateVersion):
+    async def scenario():
+        subscriber = broadcaster.subscribe()
+        await subscriber.next_version(timeout=1)
+        _bump_in_thread(state_version, times=5)
+        await asyncio.sleep(0)
+        return await subscriber.next_version(timeout=1), await subscriber.next_version(timeout=0.05)
+
+    assert asyncio.run(scenario()) == (5, None)
+
+
+def test_unsubscribed_subscriber_is_not_notified(broadcaster: StateBroadcaster, state_version: StateVersion):
+    async def scenario():
+        subscriber = broadcaster.subscribe()
+        await subscriber.next_version(timeout=1)
+        broadcaster.unsubscribe(subscriber)
+        _bump_in_thread(state_version)
+        return await subscriber.next_version(timeout=0.05)
+
+    assert asyncio.run(scenario()) is None
+    assert broadcaster.subscribers_count == 0
+
+
+def test_too_many_subscribers_raises_exception(broadcaster: StateBroadcaster):
+    async def scenario():
+        subscribers = [broadcaster.subscribe(), broadcaster.subscribe()]
+        with pytest.raises(errors.TooManySubscribersException):
+            broadcaster.subscribe()
+        broadcaster.unsubscribe(subscribers[0])
+        broadcaster.subscribe()
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_subscriber_is_dropped(broadcaster: StateBroadcaster):
+    async def scenario():
+        broadcaster.subscribe()
+
+    asyncio.run(scenario())
+    gc.collect()
+
+    assert broadcaster.subscribers_count == 0
@@ -0,0 +1,89 @@
+from src.services.state_version import StateVersion
+
+
+def test_bump_increases_version():
+    state_version = StateVersion()
+
+    assert state_version.value == 0
+    assert state_version.bump() == 1
+    assert state_version.value == 1
+
+
+def test_snapshot_is_returned_for_its_version():
+    state_version = StateVersion()
+    state_version.store_snapshot('page', state_version.value, b'{}')
+
+    assert state_version.get_snapshot('page', state_version.value) == b'{}'
+    assert state_version.get_snapshot('count', state_version.value) is None
+
+
+def test_bump_drops_snapshots():
+    state_version = StateVersion()
+    version = state_version.value
+    state_version.store_snapshot('page', version, b'{}')
+
+    state_version.bump()
+
+    assert state_version.get_snapshot('page', version) is None
+    assert state_version.get_snapshot('page', state_version.value) is None
+
+
+def test_snapshot_of_outdated_version_is_not_stored():
+    state_version = StateVersion()
+    outdated_version = state_version.value
+    state_version.bump()
+
+    state_version.store_snapshot('page', outdated_version, b'{}')
+
+    assert state_version.get_snapshot('page', outdated_version) is None
+    assert state_version.get_snapshot('page', state_version.value) is None
+
+
+def test_etag_changes_with_version_and_epoch():
+    state_version = StateVersion()
+    restarted_state_version = StateVersion()
+    restarted_state_version.epoch = state_version.epoch + 1
+
+    assert state_version.etag(0) == state_version.etag(0)
+    assert state_version.etag(0) != state_version.etag(1)
+    assert state_version.etag(0) != restarted_state_version.etag(0)
+    assert state_version.etag(0).startswith('"') and state_version.etag(0).endswith('"')
+
+
+def test_listeners_get_bumped_version():
+    state_version = StateVersion()
+    versions = []
+    state_version.add_listener(versions.append)
+
+    state_version.bump()
+    state_version.remove_listener(versions.append)
+    state_version.bump()
+
+    assert versions == [1]
+
+
+def test_deferred_bumps_do_not_change_version():
+    state_version = StateVersion()
+    versions = []
+    state_version.add_listener(versions.append)
+
+    state_version.defer_bumps()
+    state_version.bump()
+
+    assert state_version.value == 0
+    assert versions == [], 'Listeners were notified before the changes were committed'
+    assert state_version.take_deferred_bumps() is True
+    assert state_version.take_deferred_bumps() is False
+    assert state_version.bump() == 1
+    assert versions == [1]
+
+
+def test_deferred_bumps_are_reset_by_next_deferral():
+    state_version = StateVersion()
+
+    state_version.defer_bumps()
+    state_version.bump()
+    state_version.defer_bumps()
+
+    assert state_version.take_deferred_bumps() is False
+    assert state_version.value == 0
@@ -77,76 +77,73 @@ def test_get_by_id_of_non_existent_task(task_service, mock_task_repo):
     mock_task_repo.get_by_id.assert_called_once_with(non_existent_task_id)
 
 
-def test_get_all_by_day_id(task_service, mock_task_repo):
+def test_get_active_by_day_id(task_service, mock_task_repo):
     day_id = 1
     expected_task_list = [
         Task(name='Task 1', day_id=day_id, type='one-time', status='active', task_id=1),
-        Task(name='Task 2', day_id=day_id, type='daily', status='active', task_id=2)
     ]
-    mock_task_repo.get_all_by_day_id.return_value = expected_task_list
+    mock_task_repo.get_active_by_day_id.return_value = expected_task_list
 
-    tasks = task_service.get_all_by_day_id(day_id)
+    tasks = task_service.get_active_by_day_id(day_id)
 
-    assert len(tasks) == len(expected_task_list)
     assert tasks == expected_task_list
-    mock_task_repo.get_all_by_day_id.assert_called_once_with(day_id)
+    mock_task_repo.get_active_by_day_id.assert_called_once_with(day_id)
 
 
-def test_get_all_by_day_id_empty_list(task_service, mock_task_repo):
-    non_existent_day_id = 88
-    mock_task_repo.get_all_by_day_id.return_value = []
-
-    tasks = task_service.get_all_by_day_id(non_existent_day_id)
-
-    assert len(tasks) == 0
-    assert tasks == []
-    mock_task_repo.get_all_by_day_id.assert_called_once_with(non_existent_day_id)
-
-
-def test_get_all_completed(task_service, mock_task_repo):
-    expected_completed_tasks = [
-        Task(name='Completed Task 1', day_id=1, type='one-time', status='completed', task_id=1),
-        Task(name='Completed Task 2', day_id=2, type='one-time', status='completed', task_id=2)
+@pytest.mark.parametrize(
+    'tasks_in_db_count, expected_tasks_count, expected_next_cursor',
+    [
+        (3, 2, 2),
+        (2, 2, None),
+        (0, 0, None),
+    ],
+    ids=['has_next_page', 'last_page', 'no_tasks']
+)
+def test_get_completed_page(task_service, mock_task_repo, tasks_in_db_count, expected_tasks_count,
+                            expected_next_cursor):
+    limit = 2
+    cursor = 5
+    mock_task_repo.get_completed_page.return_value = [
+        Task(name=f'Completed Task {task_id}', day_id=1, type='one-time', status='completed', task_id=task_id)
+        for task_id in range(1, tasks_in_db_count + 1)
     ]
-    mock_task_repo.get_all_completed.return_value = expected_completed_tasks
 
-    result_tasks = task_service.get_all_completed()
+    tasks, next_cursor = task_service.get_completed_page(cursor, limit)
 
-    assert len(result_tasks) == len(expected_completed_tasks)
-    assert result_tasks == expected_completed_tasks
-    mock_task_repo.get_all_completed.assert_called_once()
+    mock_task_repo.get_completed_page.assert_called_once_with(cursor, limit + 1)
+    assert len(tasks) == expected_tasks_count
+    assert next_cursor == expected_next_cursor
 
 
 def test_make_completed(task_service, mock_task_repo, mock_day_service, active_day):
     mock_day_service.get_active.return_value = active_day
     task_id = 1
-    active_task = Task(name='Test task to complete', day_id=active_day.id, type='one-time', status='active',
-                       task_id=task_id)
-    expected_completed_task = Task(name=active_task.name, day_id=active_task.id, type=active_task.type,
-                                   status='completed', task_id=active_task.id)
+    expected_completed_task = Task(name='Test task to complete', day_id=active_day.id, type='one-time',
+                                   status='completed', task_id=task_id)
 
-    mock_task_repo.get_by_id.side_effect = [active_task, expected_completed_task]
+    mock_task_repo.complete_in_day.return_value = expected_completed_task
 
     result_task = task_service.make_completed(task_id)
 
     mock_day_service.get_active.assert_called_once()
-    mock_task_repo.make_completed.assert_called_once_with(task_id)
+    mock_task_repo.complete_in_day.assert_called_once_with(task_id, active_day.id)
+    mock_task_repo.get_by_id.assert_not_called()
     assert result_task == expected_completed_task
 
 
 def test_make_active(task_service, mock_task_repo, mock_day_service, active_day):
     mock_day_service.get_active.return_value = active_day
     task_id = 1
-    completed_task = Task(name='Completed task', day_id=2, type='one-time', status='completed', task_id=task_id)
     expected_activ_task = Task(name='Completed task', day_id=active_day.id, type='one-time', status='active',
                                task_id=task_id)
 
-    mock_task_repo.get_by_id.side_effect = [completed_task, expected_activ_task]
+    mock_task_repo.activate_in_day.return_value = expected_activ_task
 
     result_task = task_service.make_active(task_id)
 
     mock_day_service.get_active.assert_called_once()
-    mock_task_repo.make_active.assert_called_once_with(task_id, active_day.id)
+    mock_task_repo.activate_in_day.assert_called_once_with(task_id, active_day.id)
+    mock_task_repo.get_by_id.assert_not_called()
     assert result_task == expected_activ_task
 
 
@@ -157,6 +154,7 @@ def test_make_active_already_active_task_in_current_day_raises_exception(task_se
     already_active_task = Task(name='Active task', day_id=active_day.id, type='one-time', status='active',
                                task_id=task_id)
 
+    mock_task_repo.activate_in_day.return_value = None
     mock_task_repo.get_by_id.return_value = already_active_task
 
     with pytest.raises(errors.InvalidTaskStateException) as exc_info:
@@ -164,37 +162,37 @@ def test_make_active_already_active_task_in_current_day_raises_exception(task_se
 
     mock_day_service.get_active.assert_called_once()
     assert f'Task with ID {task_id} is already active' in str(exc_info.value)
-    mock_task_repo.make_active.assert_not_called()
 
 
 def test_make_daily(task_service, mock_task_repo, mock_day_service, active_day):
     mock_day_service.get_active.return_value = active_day
     task_id = 1
-    one_time_task = Task(name='One-time task', day_id=active_day.id, type='one-time', status='active', task_id=task_id)
-    expected_daily_task = Task(name=one_time_task.name, day_id=one_time_task.day_id, type='daily',
-                               status=one_time_task.status, task_id=one_time_task.id)
+    expected_daily_task = Task(name='One-time task', day_id=active_day.id, type='daily', status='active',
+                               task_id=task_id)
 
-    mock_task_repo.get_by_id.side_effect = [one_time_task, expected_daily_task]
+    mock_task_repo.make_daily_in_day.return_value = expected_daily_task
 
     result_task = task_service.make_daily(task_id)
 
     mock_day_service.get_active.assert_called_once()
-    mock_task_repo.make_daily.assert_called_once_with(task_id)
+    mock_task_repo.make_daily_in_day.assert_called_once_with(task_id, active_day.id)
+    mock_task_repo.get_by_id.assert_not_called()
     assert result_task == expected_daily_task
 
 
 def test_make_one_time(task_service, mock_task_repo, mock_day_service, active_day):
     mock_day_service.get_active.return_value = active_day
     task_id = 1
-    daily_task = Task(name='Daily task', day_id=active_day.id, type='daily', status='active', task_id=task_id)
-    expected_one_time_task = Task(name=daily_task.name, day_id=daily_task.day_id, type='one-time', status=daily_task.status, task_id=daily_task.id)
+    expected_one_time_task = Task(name='Daily task', day_id=active_day.id, type='one-time', status='active',
+                                  task_id=task_id)
 
-    mock_task_repo.get_by_id.side_effect = [daily_task, expected_one_time_task]
+    mock_task_repo.make_one_time_in_day.return_value = expected_one_time_task
 
     result_task = task_service.make_one_time(task_id)
 
     mock_day_service.get_active.assert_called_once()
-    mock_task_repo.make_one_time.assert_called_once_with(task_id)
+    mock_task_repo.make_one_time_in_day.assert_called_once_with(task_id, active_day.id)
+    mock_task_repo.get_by_id.assert_not_called()
     assert result_task == expected_one_time_task
 
 
@@ -202,18 +200,40 @@ def test_edit_name(task_service, mock_task_repo, mock_day_service, active_day):
     mock_day_service.get_active.return_value = active_day
     task_id = 1
     new_name = 'New task name'
-    task = Task(name='Original task', day_id=active_day.id, type='one-time', status='active', task_id=task_id)
-    updated_task = Task(name=new_name, day_id=task.id, type=task.type, status=task.status, task_id=task.id)
+    updated_task = Task(name=new_name, day_id=active_day.id, type='one-time', status='active', task_id=task_id)
 
-    mock_task_repo.get_by_id.side_effect = [task, updated_task]
+    mock_task_repo.rename_in_day.return_value = updated_task
 
     result_task = task_service.edit_name(task_id, new_name)
 
     mock_day_service.get_active.assert_called_once()
-    mock_task_repo.edit_name.assert_called_once_with(task_id, new_name)
+    mock_task_repo.rename_in_day.assert_called_once_with(task_id, active_day.id, new_name)
+    mock_task_repo.get_by_id.assert_not_called()
     assert result_task == updated_task
 
 
+def _call_operation(task_service, operation, task_id):
+    if operation == 'make_completed':
+        return task_service.make_completed(task_id)
+    elif operation == 'make_daily':
+        return task_service.make_daily(task_id)
+    elif operation == 'make_one_time':
+        return task_service.make_one_time(task_id)
+    elif operation == 'edit_name':
+        return task_service.edit_name(task_id, 'New name')
+    elif operation == 'set_duration':
+        return task_service.set_duration(task_id, 3)
+
+
+_repository_methods = {
+    'make_completed': 'complete_in_day',
+    'make_daily': 'make_daily_in_day',
+    'make_one_time': 'make_one_time_in_day',
+    'edit_name': 'rename_in_day',
+    'set_duration': 'set_duration_in_day',
+}
+
+
 @pytest.mark.parametrize(
     'operation, task_type, task_status, expected_error_message',
     [
@@ -224,36 +244,26 @@ def test_edit_name(task_service, mock_task_repo, mock_day_service, active_day):
         ('make_daily', 'one-time', 'completed', 'is completed'),
         ('make_one_time', 'one-time', 'active', 'is already a one-time task'),
         ('edit_name', 'one-time', 'completed', 'is completed. To edit it, make it active first'),
+        ('set_duration', 'daily', 'active', 'is a daily task. Only \'one-time\' tasks have a duration'),
+        ('set_duration', 'one-time', 'completed', 'is completed'),
     ],
-    ids=['complete_daily', 'complete_already_completed', 'daily_already_daily', 'daily_completed', 'one_time_already_one_time', 'edit_completed']
+    ids=['complete_daily', 'complete_already_completed', 'daily_already_daily', 'daily_completed', 'one_time_already_one_time', 'edit_completed',
+         'duration_of_daily', 'duration_of_completed']
 )
 def test_task_operations_invalid_states(task_service, mock_task_repo, mock_day_service, active_day, operation, task_type, task_status, expected_error_message):
     mock_day_service.get_active.return_value = active_day
     task_id = 1
     invalid_task = Task(name='Invalid task', day_id=active_day.id, type=task_type, status=task_status, task_id=task_id)
 
+    getattr(mock_task_repo, _repository_methods[operation]).return_value = None
     mock_task_repo.get_by_id.return_value = invalid_task
 
     with pytest.raises(errors.InvalidTaskStateException) as exc_info:
-        if operation == 'make_completed':
-            task_service.make_completed(task_id)
-        elif operation == 'make_daily':
-            task_service.make_daily(task_id)
-        elif operation == 'make_one_time':
-            task_service.make_one_time(task_id)
-        elif operation == 'edit_name':
-            task_service.edit_name(task_id, 'New name')
+        _call_operation(task_service, operation, task_id)
 
     assert expected_error_message in str(exc_info.value)
-
-    if operation == 'make_completed':
-        mock_task_repo.make_completed.assert_not_called()
-    elif operation == 'make_daily':
-        mock_task_repo.make_daily.assert_not_called()
-    elif operation == 'make_one_time':
-        mock_task_repo.make_one_time.assert_not_called()
-    elif operation == 'edit_name':
-        mock_task_repo.edit_name.assert_not_called()
+    getattr(mock_task_repo, _repository_methods[operation]).assert_called_once()
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
 
 
 @pytest.mark.parametrize(
@@ -266,17 +276,230 @@ def test_task_operations_not_in_active_day(task_service, mock_task_repo, mock_da
     task_id = 1
     other_day_id = 88
     task_from_other_day = Task(name='Task from other day', day_id=other_day_id, type='one-time', status='active', task_id=task_id)
+    mock_day_service.get_by_id.return_value = Day(year=1, season='spring', number=5, active=False, day_id=other_day_id)
 
+    getattr(mock_task_repo, _repository_methods[operation]).return_value = None
     mock_task_repo.get_by_id.return_value = task_from_other_day
 
     with pytest.raises(errors.TaskNotInActiveDayError) as exc_info:
-        if operation == 'make_completed':
-            task_service.make_completed(task_id)
-        elif operation == 'make_daily':
-            task_service.make_daily(task_id)
-        elif operation == 'make_one_time':
-            task_service.make_one_time(task_id)
-        elif operation == 'edit_name':
-            task_service.edit_name(task_id, 'New name')
-
-    assert f'Task with ID {task_id} not found in active day {active_day.id}' in str(exc_info.value)
\ No newline at end of file
+        _call_operation(task_service, operation, task_id)
+
+    assert f'Task with ID {task_id} not found in active day {active_day.id}' in str(exc_info.value)
+
+
+# Многодневная задача относится ко всем дням своего срока, а не только к дню, в котором создана
+@pytest.mark.parametrize(
+    'task_day_number, due_ordinal, in_active_day',
+    [
+        (1, None, True),
+        (1, 116, True),
+        (1, 114, False),
+        (5, None, False),
+    ],
+    ids=['endless_from_earlier_day', 'lasts_until_later_day', 'expired', 'starts_in_later_day']
+)
+def test_multi_day_task_in_active_day(task_service, mock_day_service, task_day_number, due_ordinal, in_active_day):
+    active_day = Day(year=1, season='spring', number=3, active=True, day_id=3)
+    task_day = Day(year=1, season='spring', number=task_day_number, active=False, day_id=task_day_number + 10)
+    mock_day_service.get_by_id.return_value = task_day
+    task = Task(name='Build a barn', day_id=task_day.id, type='one-time', status='active', task_id=1,
+                duration=None if due_ordinal is None else due_ordinal - task_day.ordinal + 1, due_ordinal=due_ordinal)
+
+    assert task_service._is_in_day(task, active_day) == in_active_day
+
+
+@pytest.mark.parametrize(
+    'operation',
+    ['make_completed', 'make_daily', 'make_one_time', 'edit_name'],
+    ids=['complete', 'make_daily', 'make_one_time', 'edit_name']
+)
+def test_task_operations_of_non_existent_task(task_service, mock_task_repo, mock_day_service, active_day, operation):
+    mock_day_service.get_active.return_value = active_day
+    non_existent_task_id = 88
+
+    getattr(mock_task_repo, _repository_methods[operation]).return_value = None
+    mock_task_repo.get_by_id.return_value = None
+
+    with pytest.raises(errors.TaskNotFoundException) as exc_info:
+        _call_operation(task_service, operation, non_existent_task_id)
+
+    assert f'Task with id {non_existent_task_id} not found' in str(exc_info.value)
+
+
+def test_operation_on_concurrently_changed_task(task_service, mock_task_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    task_id = 1
+    task_valid_again = Task(name='Task', day_id=active_day.id, type='one-time', status='active', task_id=task_id)
+
+    mock_task_repo.complete_in_day.return_value = None
+    mock_task_repo.get_by_id.return_value = task_valid_again
+
+    with pytest.raises(errors.InvalidTaskStateException) as exc_info:
+        task_service.make_completed(task_id)
+
+    assert 'was changed by another request' in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    'operation',
+    ['make_completed', 'make_daily', 'make_one_time', 'edit_name'],
+    ids=['complete', 'make_daily', 'make_one_time', 'edit_name']
+)
+def test_successful_operation_bumps_state_version(task_service, mock_task_repo, mock_day_service, active_day, operation):
+    mock_day_service.get_active.return_value = active_day
+
+    _call_operation(task_service, operation, 1)
+
+    mock_day_service.state_version.bump.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    'operation',
+    ['make_completed', 'make_daily', 'make_one_time', 'edit_name'],
+    ids=['complete', 'make_daily', 'make_one_time', 'edit_name']
+)
+def test_failed_operation_does_not_bump_state_version(task_service, mock_task_repo, mock_day_service, active_day,
+                                                      operation):
+    mock_day_service.get_active.return_value = active_day
+    getattr(mock_task_repo, _repository_methods[operation]).return_value = None
+    mock_task_repo.get_by_id.return_value = None
+
+    with pytest.raises(errors.TaskNotFoundException):
+        _call_operation(task_service, operation, 1)
+
+    mock_day_service.state_version.bump.assert_not_called()
+
+
+def test_make_completed_many(task_service, mock_task_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    active_task = Task(name='Active task', day_id=1, type='one-time', status='active', task_id=1)
+    daily_task = Task(name='Daily task', day_id=1, type='daily', status='active', task_id=2)
+    other_day_task = Task(name='Other day task', day_id=2, type='one-time', status='active', task_id=3)
+    mock_day_service.get_by_id.return_value = Day(year=1, season='spring', number=5, active=False, day_id=2)
+    completed_task = Task(name='Active task', day_id=1, type='one-time', status='completed', task_id=1)
+    mock_task_repo.get_by_ids.return_value = [active_task, daily_task, other_day_task]
+    mock_task_repo.complete_many_in_day.return_value = [completed_task]
+
+    results = task_service.make_completed_many([1, 2, 3, 4, 1])
+
+    mock_task_repo.get_by_ids.assert_called_once_with([1, 2, 3, 4])
+    mock_task_repo.complete_many_in_day.assert_called_once_with([1, 2, 3], active_day.id)
+    mock_day_service.state_version.bump.assert_called_once()
+    assert [id for id, _, _ in results] == [1, 2, 3, 4]
+    assert results[0] == (1, completed_task, None)
+    assert isinstance(results[1][2], errors.InvalidTaskStateException)
+    assert isinstance(results[2][2], errors.TaskNotInActiveDayError)
+    assert isinstance(results[3][2], errors.TaskNotFoundException)
+
+
+def test_make_completed_many_without_eligible_tasks(task_service, mock_task_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    mock_task_repo.get_by_ids.return_value = []
+
+    results = task_service.make_completed_many([5])
+
+    mock_task_repo.complete_many_in_day.assert_not_called()
+    mock_day_service.state_version.bump.assert_not_called()
+    assert results[0][1] is None
+    assert isinstance(results[0][2], errors.TaskNotFoundException)
+
+
+def test_create_tasks(task_service, mock_task_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    created_task = Task(name='New task', day_id=active_day.id, type='one-time', status='active', task_id=5)
+    mock_task_repo.insert_many.return_value = [created_task, None]
+
+    results = task_service.create_tasks(['New task', 'Existing task'])
+
+    new_tasks = mock_task_repo.insert_many.call_args.args[0]
+    assert [(task.name, task.day_id, task.type, task.status) for task in new_tasks] == [
+        ('New task', active_day.id, 'one-time', 'active'),
+        ('Existing task', active_day.id, 'one-time', 'active'),
+    ]
+    mock_day_service.state_version.bump.assert_called_once()
+    assert results[0] == ('New task', created_task, None)
+    assert results[1][1] is None
+    assert isinstance(results[1][2], errors.DuplicateTaskNameException)
+
+
+def test_set_duration(task_service, mock_task_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    expected_task = Task(name='Build a barn', day_id=active_day.id, type='one-time', status='active', task_id=1,
+                         duration=5, due_ordinal=active_day.ordinal + 4)
+    mock_task_repo.set_duration_in_day.return_value = expected_task
+
+    updated_task = task_service.set_duration(1, 5)
+
+    assert updated_task == expected_task
+    mock_task_repo.set_duration_in_day.assert_called_once_with(1, active_day.id, 5)
+    mock_day_service.state_version.bump.assert_called_once()
+
+
+@pytest.mark.parametrize('duration', [0, -2, 1.5], ids=['zero', 'negative', 'not_integer'])
+def test_set_invalid_duration(task_service, mock_task_repo, duration):
+    with pytest.raises(errors.InvalidTaskStateException) as exc_info:
+        task_service.set_duration(1, duration)
+
+    assert 'Duration must be a positive integer or None' in str(exc_info.value)
+    mock_task_repo.set_duration_in_day.assert_not_called()
+
+
+def test_mark_daily_done(task_service, mock_task_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    daily_task = Task(name='Water the garden', day_id=88, type='daily', status='active', task_id=1)
+    mock_task_repo.add_daily_completion.return_value = True
+    mock_task_repo.get_by_id.return_value = daily_task
+
+    done_task = task_service.mark_daily_done(daily_task.id)
+
+    mock_task_repo.add_daily_completion.assert_called_once_with(daily_task.id, active_day.id)
+    assert done_task.day_id == active_day.id, 'Daily task must be returned in the current day'
+    mock_day_service.state_version.bump.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    'task_type, task_status, expected_error_message',
+    [
+        ('one-time', 'active', 'is not a daily task'),
+        ('daily', 'completed', 'is completed'),
+        ('daily', 'active', 'is already done today'),
+    ],
+    ids=['one_time_task', 'completed_task', 'already_done']
+)
+def test_mark_daily_done_invalid_states(task_service, mock_task_repo, mock_day_service, active_day, task_type,
+                                        task_status, expected_error_message):
+    mock_day_service.get_active.return_value = active_day
+    mock_task_repo.add_daily_completion.return_value = False
+    mock_task_repo.get_by_id.return_value = Task(name='Task', day_id=active_day.id, type=task_type,
+                                                 status=task_status, task_id=1)
+
+    with pytest.raises(errors.InvalidTaskStateException) as exc_info:
+        task_service.mark_daily_done(1)
+
+    assert expected_error_message in str(exc_info.value)
+    mock_day_service.state_version.bump.assert_not_called()
+
+
+def test_unmark_daily_done_of_not_done_task_raises_exception(task_service, mock_task_repo, mock_day_service,
+                                                             active_day):
+    mock_day_service.get_active.return_value = active_day
+    mock_task_repo.get_by_id.return_value = Task(name='Task', day_id=1, type='daily', status='active', task_id=1)
+    mock_task_repo.remove_daily_completion.return_value = False
+
+    with pytest.raises(errors.InvalidTaskStateException) as exc_info:
+        task_service.unmark_daily_done(1)
+
+    assert 'is not done today' in str(exc_info.value)
+    mock_day_service.state_version.bump.assert_not_called()
+
+
+def test_daily_task_from_previous_day_can_be_renamed(task_service, mock_task_repo, mock_day_service, active_day):
+    mock_day_service.get_active.return_value = active_day
+    daily_task = Task(name='Water the garden', day_id=88, type='daily', status='active', task_id=1)
+    mock_task_repo.rename_in_day.return_value = None
+    mock_task_repo.get_by_id.return_value = daily_task
+
+    with pytest.raises(errors.InvalidTaskStateException) as exc_info:
+        task_service.edit_name(daily_task.id, 'New name')
+
+    assert 'was changed by another request' in str(exc_info.value), 'Daily task belongs to every day'